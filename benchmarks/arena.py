@@ -0,0 +1,100 @@
+"""
+Cost of the garbage collector in training loops, with and without an Arena per step: time per
+step, collections and pause time, nodes allocated per step, cycles left for the collector, and
+peak memory, for scalar Value models (fused and unfused) and a Tensor model.
+
+Run from the repository root:
+    python -m benchmarks.arena
+"""
+
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+
+from microtorch import nn, Optimizers, Loss
+from microtorch.arena import Arena
+
+
+class GCTimer :
+
+    """
+    Times the garbage collections of a loop that runs without an Arena.
+    """
+
+    def __init__(self):
+        self.pauses = []
+        self._start = None
+
+    def __call__(self, phase, info):
+        if phase == 'start':
+            self._start = time.perf_counter()
+        else:
+            self.pauses.append(time.perf_counter() - self._start)
+
+
+def build(tensor, fused):
+    np.random.seed(0)
+    return nn.Sequential(
+        nn.Layer(8, 32, tensor=tensor, fused=fused),
+        nn.Layer(32, 32, tensor=tensor, fused=fused),
+        nn.Layer(32, 1, activation='linear', tensor=tensor, fused=fused),
+    )
+
+
+def train(n, xs, ys, epochs, arena=None):
+    optimizer = Optimizers.SGD(n.parameters, 0.01)
+    gc.collect()
+
+    start = time.perf_counter()
+    for epoch in range(epochs):
+        if arena is None:
+            loss = Loss.MSELoss(ys, n(xs))
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+        else:
+            with arena:
+                loss = Loss.MSELoss(ys, n(xs))
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+    elapsed = (time.perf_counter() - start) / epochs
+
+    del loss
+    return elapsed, gc.collect()
+
+
+def peak_memory(tensor, fused, xs, ys, arena):
+    n = build(tensor, fused)
+    tracemalloc.start()
+    train(n, xs, ys, 3, arena)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    xs = rng.normal(size=(128, 8))
+    ys = np.sin(xs.sum(axis=1))
+
+    print(f"{'model':14s} {'mode':7s} {'step':>10s} {'nodes/step':>11s} {'collections':>12s} {'GC pause/step':>14s} "
+          f"{'max pause':>10s} {'cycles left':>12s} {'peak memory':>12s}")
+    for name, tensor, fused, epochs in [ ('Value unfused', False, False, 10), ('Value fused', False, True, 10), ('Tensor', True, False, 200) ]:
+        timer = GCTimer()
+        gc.callbacks.append(timer)
+        elapsed, cycles = train(build(tensor, fused), xs, ys, epochs)
+        gc.callbacks.remove(timer)
+        pauses = np.array(timer.pauses) * 1e3
+        peak = peak_memory(tensor, fused, xs, ys, None)
+        print(f"{name:14s} {'eager':7s} {elapsed * 1e3:8.2f}ms {'':>11s} {len(pauses):12d} {pauses.sum() / epochs:12.2f}ms "
+              f"{pauses.max(initial=0.0):8.2f}ms {cycles:12d} {peak / 2 ** 20:10.1f}MB")
+
+        arena = Arena()
+        elapsed, cycles = train(build(tensor, fused), xs, ys, epochs, arena)
+        s = arena.stats()
+        peak = peak_memory(tensor, fused, xs, ys, Arena())
+        print(f"{name:14s} {'arena':7s} {elapsed * 1e3:8.2f}ms {s['nodes_per_step']:11.0f} {s['gc_collections']:12d} "
+              f"{s['gc_pause_per_step_ms']:12.2f}ms {s['max_gc_pause_ms']:8.2f}ms {cycles:12d} {peak / 2 ** 20:10.1f}MB")
@@ -0,0 +1,55 @@
+"""
+Checkpoint save and load times against model size, loading into an existing model and
+rebuilding the model from the checkpoint alone.
+
+Run from the repository root:
+    python -m benchmarks.checkpoint
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from microtorch import nn, checkpoint
+
+
+def timed(fn, repeats=3):
+
+    """
+    Return the best wall time of 'fn' over a few runs, and its last result.
+    """
+
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    xs = np.random.normal(size=(1, 64))
+
+    print(f"{'parameters':>12s} {'file MB':>9s} {'save ms':>9s} {'load ms':>9s} {'mmap ms':>9s} {'mmap+predict ms':>16s} "
+          f"{'rebuild ms':>11s} {'rebuild mmap ms':>16s}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model.ck')
+
+        for width in (64, 256, 1024, 2048):
+            n = nn.Sequential(nn.Layer(64, width, tensor=True), nn.Layer(width, width, tensor=True), nn.Layer(width, 1, tensor=True))
+            size = sum(p.data.size for p in n.parameters())
+
+            save_time, _ = timed(lambda: checkpoint.save(n, path))
+            load_time, _ = timed(lambda: checkpoint.load(path, model=n, mmap_mode=None))
+            mmap_time, _ = timed(lambda: checkpoint.load(path, model=n, mmap_mode='r'))
+            first_time, _ = timed(lambda: checkpoint.load(path, model=n, mmap_mode='r').predict(xs))
+
+            # Without a model, the layers are rebuilt from the manifest around the stored arrays
+            rebuild_time, _ = timed(lambda: checkpoint.load(path, mmap_mode=None))
+            rebuild_mmap_time, _ = timed(lambda: checkpoint.load(path, mmap_mode='r'))
+
+            print(f"{size:12d} {os.path.getsize(path) / 1e6:9.2f} {save_time * 1e3:9.3f} {load_time * 1e3:9.3f} "
+                  f"{mmap_time * 1e3:9.3f} {first_time * 1e3:16.3f} {rebuild_time * 1e3:11.3f} {rebuild_mmap_time * 1e3:16.3f}")
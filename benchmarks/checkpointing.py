@@ -0,0 +1,77 @@
+"""
+Peak memory and step time of gradient checkpointing on a deep, narrow MLP, and the relative
+difference (in norm) between the parameter gradients of every variant and those without
+checkpointing.
+
+The checkpointed forward pass of a segment runs on float arrays (NumPy dot products and
+activations) while its recomputation during backward builds the graph; the two round
+differently in the last bits, and through 48 layers the gradients of Value models drift apart
+by about 1e-12 in norm (up to 1e-8 relative for the smallest single gradients). Gradients count
+as the same within rtol 1e-8, atol 1e-10.
+
+Run from the repository root:
+    python -m benchmarks.checkpointing
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+from microtorch import nn, Loss
+
+
+def build(tensor, depth, width, **checkpointing):
+    np.random.seed(0)
+    layers = [ nn.Layer(width, width, tensor=tensor) for _ in range(depth) ] + [ nn.Layer(width, 1, activation='', tensor=tensor) ]
+    if checkpointing:
+        layers = nn.checkpoint_sequential(layers, **checkpointing)
+    return nn.Sequential(*layers)
+
+
+def step(n, xs, ys):
+    loss = Loss.MSELoss(ys, n(xs))
+    loss.backward()
+    return n
+
+
+def gradients(n):
+    return np.concatenate([ np.ravel(p.grad) for p in n.parameters() ])
+
+
+if __name__ == '__main__':
+    depth, width, batch = 48, 8, 64
+    rng = np.random.default_rng(0)
+    xs = rng.normal(size=(batch, width))
+    ys = rng.normal(size=batch)
+
+    for tensor in (False, True):
+        reference = None
+        variants = [
+            ('no checkpointing', {}),
+            ('sqrt(depth) segments', { 'segments': int(np.sqrt(depth)) }),
+            ('16 segments', { 'segments': 16 }),
+            ('budget 1 MB', { 'memory_budget': 2 ** 20, 'batch_size': batch }),
+        ]
+
+        print(f"{'Tensor' if tensor else 'Value'} MLP, depth {depth}, width {width}, batch {batch}")
+        for name, checkpointing in variants:
+            n = build(tensor, depth, width, **checkpointing)
+
+            tracemalloc.start()
+            step(n, xs, ys)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            grads = gradients(n)
+            reference = grads if reference is None else reference
+            same = np.allclose(grads, reference, rtol=1e-8, atol=1e-10)
+            drift = np.linalg.norm(grads - reference) / np.linalg.norm(reference)
+
+            n = build(tensor, depth, width, **checkpointing)
+            start = time.perf_counter()
+            step(n, xs, ys)
+            elapsed = time.perf_counter() - start
+
+            print(f"  {name:22s} segments {len(n.layers):3d}  peak {peak / 1e6:8.2f} MB  step {elapsed * 1e3:9.2f} ms  "
+                  f"same gradients {same} (rel. diff {drift:.1e})")
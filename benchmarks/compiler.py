@@ -0,0 +1,67 @@
+"""
+Training step of an MLP interpreted by Value.backward versus compiled by compiler.compile, with
+the cost of the first compilation and of loading the cached module.
+
+Run from the repository root:
+    python -m benchmarks.compiler
+"""
+
+import tempfile
+import time
+
+import numpy as np
+
+from microtorch import nn, Loss, compiler
+
+
+def build(fused, sizes=(8, 16, 16, 1)):
+    np.random.seed(0)
+    return nn.Sequential(*[ nn.Layer(sizes[i-1], sizes[i], activation='tanh' if i < len(sizes) - 1 else '', fused=fused)
+                            for i in range(1, len(sizes)) ])
+
+
+def eager_step(n, xs, ys):
+    loss = Loss.MSELoss(ys, n(xs))
+    loss.backward()
+    return loss.data
+
+
+def best(fn, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    batch = 32
+    rng = np.random.default_rng(0)
+    xs = rng.normal(size=(batch, 8))
+    ys = rng.normal(size=batch)
+    cache = tempfile.mkdtemp()
+
+    for fused in (True, False):
+        n = build(fused)
+        eager_step(n, xs, ys)
+        reference = [ p.grad for p in n.parameters() ]
+
+        for p in n.parameters():
+            p.grad = 0.0
+        start = time.perf_counter()
+        step = compiler.compile(n, xs, cache_dir=cache)
+        first = time.perf_counter() - start
+        step(xs, ys)
+        identical = [ p.grad for p in n.parameters() ] == reference
+
+        start = time.perf_counter()
+        compiler.compile(n, xs, cache_dir=cache)
+        cached = time.perf_counter() - start
+
+        eager = best(lambda: eager_step(n, xs, ys))
+        compiled = best(lambda: step(xs, ys))
+
+        print(f"{'fused' if fused else 'unfused'} MLP 8-16-16-1, batch {batch}")
+        print(f"  compile {first * 1e3:9.2f} ms   load cached {cached * 1e3:7.2f} ms   identical gradients {identical}")
+        print(f"  eager step {eager * 1e3:9.2f} ms   compiled step {compiled * 1e3:9.2f} ms   speedup {eager / compiled:5.1f}x")
@@ -0,0 +1,57 @@
+"""
+Construction time of dense models against their parameter count: bulk initialization (one
+sampled array per layer) versus sampling neuron by neuron, and lazy initialization.
+
+Run from the repository root:
+    python -m benchmarks.construction
+"""
+
+import time
+
+import numpy as np
+
+from microtorch import nn
+from microtorch.Value import Value
+
+
+def sample(size):
+    values = np.empty(size, dtype=object)
+    values[:] = [ Value(v) for v in np.random.normal(0, 1, size).tolist() ]
+    return values
+
+
+def per_neuron(nin, nout):
+    # The construction path before bulk initialization: every neuron samples its own weights,
+    # then the layer stacks them into its weight matrix
+    neurons = [ (sample(nin), sample(1)) for _ in range(nout) ]
+    return np.stack([ w for w, _ in neurons ], axis=1), np.concatenate([ b for _, b in neurons ])
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    sizes = [ [16, 16, 1], [64, 64, 1], [128, 128, 10], [256, 256, 10], [784, 256, 10], [784, 512, 512, 10] ]
+    xs = np.random.default_rng(0).normal(size=(1, 784))
+
+    print(f"{'sizes':22s} {'parameters':>10s} {'per neuron':>11s} {'bulk':>9s} {'he, seeded':>11s} {'tensor':>9s} {'lazy':>9s} {'+ forward':>10s}")
+    for s in sizes:
+        count = sum((s[i-1] + 1) * s[i] for i in range(1, len(s)))
+        layers = lambda **kwargs: [ nn.Layer(s[i-1], s[i], **kwargs) for i in range(1, len(s)) ]
+
+        legacy = timed(lambda: [ per_neuron(s[i-1], s[i]) for i in range(1, len(s)) ])
+        bulk = timed(lambda: nn.Sequential(*layers()))
+        seeded = timed(lambda: nn.Sequential(*layers(init='he', rng=0)))
+        tensor = timed(lambda: nn.Sequential(*layers(tensor=True)))
+
+        # Lazy layers are free to build; their parameters are created by the first forward pass
+        start = time.perf_counter()
+        n = nn.Sequential(*[ nn.Layer(None, s[i]) for i in range(1, len(s)) ])
+        lazy = time.perf_counter() - start
+        first = timed(lambda: n.predict(xs[:, :s[0]]))
+
+        print(f"{str(s):22s} {count:10d} {legacy * 1e3:9.1f}ms {bulk * 1e3:7.1f}ms {seeded * 1e3:9.1f}ms "
+              f"{tensor * 1e3:7.2f}ms {lazy * 1e3:7.3f}ms {first * 1e3:8.1f}ms")
@@ -0,0 +1,81 @@
+"""
+Throughput of the im2col convolution and pooling layers on small images (CPU).
+
+Run from the repository root:
+    python -m benchmarks.conv
+"""
+
+import time
+
+import numpy as np
+
+from microtorch import nn, Optimizers, Loss
+from microtorch.autograd import no_grad
+
+
+def best(fn, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def cnn(channels, classes=10):
+    np.random.seed(0)
+    return nn.Sequential(
+        nn.Conv2d(channels, 16, 3, padding=1),
+        nn.MaxPool2d(2),
+        nn.Conv2d(16, 32, 3, padding=1),
+        nn.MaxPool2d(2),
+        nn.Conv2d(32, 32, 3, stride=2, padding=1),
+        nn.AvgPool2d(2),
+        nn.Flatten(),
+        nn.Layer(32 * 2 * 2, classes, activation='', tensor=True),
+    )
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+
+    print("single layers, batch 32, forward + backward")
+    layers = [
+        ('Conv2d 3->16 k3 32x32', nn.Conv2d(3, 16, 3, padding=1), (32, 3, 32, 32)),
+        ('Conv2d 16->32 k3 s2 16x16', nn.Conv2d(16, 32, 3, stride=2, padding=1), (32, 16, 16, 16)),
+        ('Conv2d 16->16 k3 d2 16x16', nn.Conv2d(16, 16, 3, padding=2, dilation=2), (32, 16, 16, 16)),
+        ('Conv1d 8->16 k5 L128', nn.Conv1d(8, 16, 5, padding=2), (32, 8, 128)),
+        ('MaxPool2d 2 16x32x32', nn.MaxPool2d(2), (32, 16, 32, 32)),
+        ('AvgPool2d 3 s2 16x32x32', nn.AvgPool2d(3, stride=2, padding=1), (32, 16, 32, 32)),
+    ]
+    for name, layer, shape in layers:
+        xs = rng.normal(size=shape)
+
+        def step():
+            out = layer(xs)
+            (out * out).sum().backward()
+
+        def infer():
+            with no_grad():
+                layer(xs)
+
+        train, inference = best(step), best(infer)
+        print(f"  {name:28s} train {shape[0] / train:10.0f} samples/s   inference {shape[0] / inference:10.0f} samples/s")
+
+    for channels, size in ((1, 28), (3, 32)):
+        batch = 64
+        n = cnn(channels)
+        optimizer = Optimizers.SGD(n.parameters, 0.01)
+        xs = rng.normal(size=(batch, channels, size, size))
+        ys = rng.integers(0, 10, size=batch)
+
+        def step():
+            loss = Loss.CrossEntropyLoss(ys, n(xs))
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+        train = best(step)
+        inference = best(lambda: n.predict(xs))
+        print(f"small CNN on {channels}x{size}x{size} images, batch {batch}: "
+              f"train {batch / train:8.0f} images/s   inference {batch / inference:8.0f} images/s")
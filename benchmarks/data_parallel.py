@@ -0,0 +1,75 @@
+"""
+Scaling of DataParallelTrainer with 1, 2, 4 and 8 worker processes on CPU.
+
+Run from the repository root:
+    python -m benchmarks.data_parallel
+"""
+
+import os
+import time
+
+import numpy as np
+
+from microtorch import nn, Optimizers, Loss
+from microtorch.parallel import DataParallelTrainer
+
+
+class MLP(nn.Model):
+    def __init__(self, sizes):
+        self.layers = [ nn.Layer(sizes[i-1], sizes[i]) for i in range(1, len(sizes)) ]
+
+    def forward(self, x):
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+
+def make_data(batch=256, nin=8):
+    rng = np.random.default_rng(0)
+    xs = rng.normal(size=(batch, nin))
+    ys = np.tanh(xs @ rng.normal(size=nin))
+    return xs, ys
+
+
+def serial(xs, ys, steps):
+    np.random.seed(0)
+    n = MLP([xs.shape[1], 32, 32, 1])
+    optimizer = Optimizers.SGD(n.parameters, 0.05)
+
+    def step():
+        loss = Loss.MSELoss(ys, n(xs))
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+        return loss
+
+    step()  # same warm-up step as the parallel runs, so the losses are comparable
+    start = time.perf_counter()
+    for _ in range(steps):
+        loss = step()
+    return (time.perf_counter() - start) / steps, loss.data
+
+
+def parallel(xs, ys, steps, workers):
+    np.random.seed(0)
+    n = MLP([xs.shape[1], 32, 32, 1])
+    optimizer = Optimizers.SGD(n.parameters, 0.05)
+
+    with DataParallelTrainer(n, Loss.MSELoss, optimizer, workers=workers) as trainer:
+        trainer.step(xs, ys)  # warm up the workers
+        start = time.perf_counter()
+        for _ in range(steps):
+            loss = trainer.step(xs, ys)
+        return (time.perf_counter() - start) / steps, loss
+
+
+if __name__ == '__main__':
+    xs, ys = make_data()
+    steps = 5
+
+    base, base_loss = serial(xs, ys, steps)
+    print(f"cpus: {os.cpu_count()}")
+    print(f"serial     : {base * 1e3:9.1f} ms/step  loss {base_loss:.6f}")
+    for workers in (1, 2, 4, 8):
+        elapsed, loss = parallel(xs, ys, steps, workers)
+        print(f"workers={workers:<3d}: {elapsed * 1e3:9.1f} ms/step  loss {loss:.6f}  speedup {base / elapsed:5.2f}x")
@@ -0,0 +1,56 @@
+"""
+Inference latency and memory of a Model with and without graph construction.
+
+Run from the repository root:
+    python -m benchmarks.inference
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+from microtorch import nn
+from microtorch.autograd import no_grad
+
+
+class MLP(nn.Model):
+    def __init__(self, sizes, tensor=False):
+        self.layers = [ nn.Layer(sizes[i-1], sizes[i], tensor=tensor) for i in range(1, len(sizes)) ]
+
+    def forward(self, x):
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+
+def measure(fn, repeats=5):
+
+    """
+    Return the mean wall time and the peak traced memory of 'fn'.
+    """
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats, peak
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    xs = np.random.normal(size=(64, 16))
+
+    for tensor in (False, True):
+        n = MLP([16, 32, 32, 1], tensor=tensor)
+        graph_time, graph_peak = measure(lambda: n(xs))
+        infer_time, infer_peak = measure(lambda: n.predict(xs))
+
+        name = 'Tensor' if tensor else 'Value'
+        print(f"{name:6s} graph    : {graph_time * 1e3:9.3f} ms  {graph_peak / 1e6:9.3f} MB")
+        print(f"{name:6s} no_grad  : {infer_time * 1e3:9.3f} ms  {infer_peak / 1e6:9.3f} MB")
+        print(f"{name:6s} speedup  : {graph_time / infer_time:9.1f}x  memory {graph_peak / infer_peak:.1f}x less")
@@ -0,0 +1,84 @@
+"""
+Accuracy and speed of training under the float64, float32 and mixed (float32 parameters with
+float64 master weights) dtype policies: the demo network on the demo data, then a wider MLP on
+a synthetic regression task where the array operations dominate.
+
+Run from the repository root:
+    python -m benchmarks.precision
+"""
+
+import time
+
+import numpy as np
+
+from microtorch import nn, Optimizers, Loss, precision
+
+
+xs = [
+  [2.0, 3.0, -1.0],
+  [3.0, -1.0, 0.5],
+  [0.5, 1.0, 1.0],
+  [1.0, 1.0, -1.0],
+]
+ys = [1.0, -1.0, -1.0, 1.0]
+
+
+class SimpleNeuralNetwork(nn.Model):
+    def __init__(self, nin, nhl, nout=1):
+        super().__init__()
+        self.size = [ nin ] + nhl + [nout]
+        self.layers = np.array([nn.Layer(self.size[i-1], self.size[i], activation="tanh", tensor=True) for i in range(1, len(self.size))])
+
+    def forward(self, x):
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+    def parameters(self):
+        return np.concatenate([n.parameters() for n in self.layers])
+
+
+def train(mode, build, xs, ys, epochs, learning_rate):
+    with precision.policy(mode):
+        np.random.seed(0)
+        n = build()
+        optimizer = Optimizers.Adam(n.parameters, learning_rate=learning_rate)
+
+        start = time.perf_counter()
+        for epoch in range(epochs):
+            loss = Loss.MSELoss(ys, n(xs))
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+        elapsed = (time.perf_counter() - start) / epochs
+
+        # Parameters, gradients and the optimizer buffers (master copy, gradient, two moments)
+        params = sum(p.data.nbytes + p.grad.nbytes for p in n.parameters())
+        state = optimizer.buffer.data.nbytes * 4 if optimizer.buffer._copied else optimizer.buffer.data.nbytes * 2
+        return elapsed, float(loss.data), n.predict(xs), params + state
+
+
+def report(title, build, xs, ys, epochs, learning_rate):
+    print(title)
+    print(f"{'policy':8s} {'epoch':>9s} {'final loss':>12s} {'max |y - y64|':>14s} {'memory':>10s}")
+    reference = None
+    for mode in ['float64', 'float32', 'mixed']:
+        elapsed, loss, pred, memory = train(mode, build, xs, ys, epochs, learning_rate)
+        reference = pred if reference is None else reference
+        drift = np.abs(pred.astype(np.float64) - reference).max()
+        print(f"{mode:8s} {elapsed * 1e3:7.3f}ms {loss:12.3e} {drift:14.2e} {memory / 1024:8.1f}KB")
+    print()
+
+
+if __name__ == '__main__':
+    report("demo network (3-4-3-1, 4 samples)", lambda: SimpleNeuralNetwork(3, [4, 3], 1), np.array(xs), ys, 500, 0.01)
+
+    rng = np.random.default_rng(0)
+    xw = rng.normal(size=(512, 64))
+    yw = np.tanh(xw[:, :8].sum(axis=1) / 4)
+    wide = lambda: nn.Sequential(
+        nn.Layer(64, 512, activation='tanh', init='xavier', tensor=True),
+        nn.Layer(512, 512, activation='tanh', init='xavier', tensor=True),
+        nn.Layer(512, 1, activation='linear', init='xavier', tensor=True),
+    )
+    report("wide MLP (64-512-512-1, 512 samples)", wide, xw, yw, 50, 0.001)
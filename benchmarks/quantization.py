@@ -0,0 +1,81 @@
+"""
+Post-training int8 quantization of a trained MLP: parameter bytes, inference time against the
+float64 and float32 models at several batch sizes, and the drift of the outputs and of the
+accuracy, with static (calibrated) and dynamic input quantization.
+
+Run from the repository root:
+    python -m benchmarks.quantization
+"""
+
+import time
+
+import numpy as np
+
+from microtorch import nn, Optimizers, Loss, precision, quantization
+
+
+def make_data(rng, samples, nin, classes):
+    # Classes defined by a random linear map of Gaussian inputs followed by a nonlinearity
+    xs = rng.normal(size=(samples, nin))
+    w = rng.normal(size=(nin, classes))
+    ys = np.tanh(xs @ w / np.sqrt(nin) * 2).argmax(axis=1)
+    return xs, ys
+
+
+def build(nin, hidden, classes):
+    return nn.Sequential(
+        nn.Layer(nin, hidden, activation='relu', init='he', rng=0, tensor=True),
+        nn.Layer(hidden, hidden, activation='relu', init='he', rng=1, tensor=True),
+        nn.Layer(hidden, classes, activation='linear', init='xavier', rng=2, tensor=True),
+    )
+
+
+def train(n, xs, ys, epochs, batch_size=128):
+    optimizer = Optimizers.Adam(n.parameters, learning_rate=0.001)
+    for epoch in range(epochs):
+        for start in range(0, len(xs), batch_size):
+            loss = Loss.CrossEntropyLoss(ys[start:start + batch_size], n(xs[start:start + batch_size]))
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+    return n
+
+
+def timed(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    nin, hidden, classes = 256, 1024, 10
+    xs, ys = make_data(rng, 6000, nin, classes)
+    x_train, y_train, x_test, y_test = xs[:5000], ys[:5000], xs[5000:], ys[5000:]
+
+    n = train(build(nin, hidden, classes), x_train, y_train, epochs=3)
+    with precision.policy('float32'):
+        n32 = build(nin, hidden, classes)
+    for p, p32 in zip(n.parameters(), n32.parameters()):
+        p32.data[...] = p.data
+
+    static = quantization.quantize(n, calibration=x_train[:1000])
+    dynamic = quantization.quantize(n)
+
+    print(f"model {nin}-{hidden}-{hidden}-{classes}, trained 3 epochs on {len(x_train)} samples\n")
+    print(f"{'model':10s} {'accuracy':>9s} {'agreement':>10s} {'max |dy|':>9s} {'rel. error':>11s} {'parameters':>11s}")
+    print(f"{'float64':10s} {np.mean(n.predict(x_test).argmax(axis=1) == y_test):9.4f} {'':>10s} {'':>9s} {'':>11s} "
+          f"{sum(p.data.nbytes for p in n.parameters()) / 2 ** 20:9.2f}MB")
+    for name, q in [ ('int8', static), ('int8 dyn.', dynamic) ]:
+        r = quantization.drift_report(n, q, x_test, y_test)
+        print(f"{name:10s} {r['quantized_accuracy']:9.4f} {r['agreement']:10.4f} {r['max_abs_error']:9.4f} "
+              f"{r['relative_error']:11.2e} {r['quantized_bytes'] / 2 ** 20:9.2f}MB")
+
+    print(f"\n{'batch':>6s} {'float64':>10s} {'float32':>10s} {'int8':>10s} {'int8 dyn.':>10s}")
+    for batch in [ 1, 16, 256 ]:
+        x = x_test[:batch]
+        repeat = max(5, 2000 // batch)
+        times = [ timed(lambda: model.predict(x), repeat) for model in (n, n32, static, dynamic) ]
+        print(f"{batch:6d} " + ' '.join(f"{t * 1e3:8.3f}ms" for t in times))
@@ -0,0 +1,57 @@
+"""
+Peak memory and time of a training step of the recurrent layers with full versus truncated
+backpropagation through time, and of padded versus packed variable-length batches.
+
+Run from the repository root:
+    python -m benchmarks.rnn
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+from microtorch import nn, Loss
+
+
+def build(cls, hidden):
+    np.random.seed(0)
+    return nn.Sequential(cls(8, hidden), nn.Layer(hidden, 1, activation='', tensor=True))
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == '__main__':
+    batch, steps, hidden = 16, 1024, 64
+    rng = np.random.default_rng(0)
+    xs = rng.normal(size=(batch, steps, 8))
+    ys = rng.normal(size=(batch, steps, 1))
+
+    for cls in (nn.RNN, nn.GRU, nn.LSTM):
+        print(f"{cls.__name__}, batch {batch}, {steps} steps, hidden {hidden}")
+        for window in (steps, 256, 64, 16):
+            n = build(cls, hidden)
+            elapsed, peak = measure(lambda: nn.truncated_bptt(n, xs, ys, Loss.MSELoss, window))
+            name = 'full BPTT' if window == steps else f"window {window}"
+            print(f"  {name:12s} peak {peak / 1e6:8.2f} MB   step {elapsed * 1e3:9.1f} ms")
+
+    # Half of the sequences are short: packing skips their padding instead of computing it
+    batch, steps = 512, 256
+    xs = rng.normal(size=(batch, steps, 8))
+    ys = rng.normal(size=(batch, steps, 1))
+    lengths = np.where(np.arange(batch) % 2 == 0, steps, steps // 8)
+
+    n = build(nn.LSTM, hidden)
+    padded, _ = measure(lambda: Loss.MSELoss(ys, n(xs)).backward())
+    n.layers[0].lengths = lengths
+    packed, _ = measure(lambda: Loss.MSELoss(ys, n(xs)).backward())
+    print(f"LSTM, batch {batch}, {steps} steps, half of the sequences {steps // 8} steps long: "
+          f"padded {padded * 1e3:.1f} ms   packed {packed * 1e3:.1f} ms")
@@ -0,0 +1,75 @@
+"""
+Latency and throughput of the dynamic-batching InferenceServer under an in-process load generator.
+
+Closed loop: a fixed number of clients, each sending its next request as soon as the previous
+one is answered. Open loop: requests arrive at a fixed average rate (Poisson arrivals) whatever
+the server does, which exposes queueing when the server cannot keep up.
+
+Run from the repository root:
+    python -m benchmarks.serving
+"""
+
+import asyncio
+
+import numpy as np
+
+from microtorch import nn
+from microtorch.serving import InferenceServer
+
+
+async def closed_loop(server, samples, clients, requests):
+    async def client(i):
+        for j in range(requests // clients):
+            await server.predict(samples[(i + j * clients) % len(samples)])
+    await asyncio.gather(*[ client(i) for i in range(clients) ])
+
+
+async def open_loop(server, samples, rate, requests, rng):
+    # Send every request at its scheduled arrival time (sleeping only until the next one is due,
+    # as the event loop cannot sleep for less than a fraction of a millisecond reliably)
+    loop = asyncio.get_running_loop()
+    arrivals = loop.time() + np.cumsum(rng.exponential(1 / rate, requests))
+    pending = []
+    for i, arrival in enumerate(arrivals):
+        delay = arrival - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        pending.append(asyncio.ensure_future(server.predict(samples[i % len(samples)])))
+    await asyncio.gather(*pending)
+
+
+async def run(model, samples, load, **config):
+    server = InferenceServer(model, **config)
+    async with server:
+        await load(server)
+    return server.stats()
+
+
+def report(name, s):
+    print(f"  {name:34s} {s['throughput']:9.0f} req/s   p50 {s['p50_ms']:7.2f} ms   p99 {s['p99_ms']:7.2f} ms   "
+          f"mean batch {s['mean_batch_size']:5.1f}")
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    model = nn.Sequential(nn.Layer(32, 128, tensor=True), nn.Layer(128, 128, tensor=True), nn.Layer(128, 1, activation='', tensor=True))
+    rng = np.random.default_rng(0)
+    samples = rng.normal(size=(1024, 32))
+    requests = 4000
+
+    configs = [
+        ('no batching', { 'max_batch_size': 1 }),
+        ('batch <= 16, wait <= 1 ms', { 'max_batch_size': 16, 'max_wait': 0.001 }),
+        ('batch <= 64, wait <= 2 ms', { 'max_batch_size': 64, 'max_wait': 0.002 }),
+        ('batch <= 256, wait <= 5 ms', { 'max_batch_size': 256, 'max_wait': 0.005 }),
+    ]
+
+    for clients in (1, 16, 256):
+        print(f"closed loop, {clients} clients")
+        for name, config in configs:
+            report(name, asyncio.run(run(model, samples, lambda s: closed_loop(s, samples, clients, requests), **config)))
+
+    for rate in (1000, 5000, 20000):
+        print(f"open loop, {rate} requests/s")
+        for name, config in configs:
+            report(name, asyncio.run(run(model, samples, lambda s: open_loop(s, samples, rate, requests, np.random.default_rng(1)), **config)))
@@ -0,0 +1,95 @@
+"""
+Per-epoch cost of eager training versus a captured StaticGraph on the demo network, and the
+effect of the graph optimizer pass on an unfused network.
+
+Run from the repository root:
+    python -m benchmarks.static_graph
+"""
+
+import time
+
+import numpy as np
+
+from microtorch import nn, Optimizers, Loss
+from microtorch.graph import capture
+
+
+xs = [
+  [2.0, 3.0, -1.0],
+  [3.0, -1.0, 0.5],
+  [0.5, 1.0, 1.0],
+  [1.0, 1.0, -1.0],
+]
+ys = [1.0, -1.0, -1.0, 1.0]
+
+
+class SimpleNeuralNetwork(nn.Model):
+    def __init__(self, nin, nhl, nout=1, fused=True):
+        super().__init__()
+        self.size = [ nin ] + nhl + [nout]
+        self.layers = np.array([nn.Layer(self.size[i-1], self.size[i], activation="tanh", fused=fused) for i in range(1, len(self.size))])
+
+    def forward(self, x):
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+    def parameters(self):
+        return np.concatenate([n.parameters() for n in self.layers])
+
+
+def train_eager(epochs):
+    np.random.seed(0)
+    n = SimpleNeuralNetwork(3, [4, 3], 1)
+    optimizer = Optimizers.SGD(n.parameters, 0.2)
+
+    start = time.perf_counter()
+    for epoch in range(epochs):
+        loss = Loss.MSELoss(ys, n(xs))
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+    return (time.perf_counter() - start) / epochs, loss.data
+
+
+def loss_fn(n):
+    # Mean squared error written with scalar ops, as a user would without Loss.MSELoss
+    def fn(x, y):
+        errors = [ (p - t) * (p - t) for p, t in zip(n(x), y) ]
+        return sum(errors) / len(errors)
+    return fn
+
+
+def train_static(epochs, fused=True, optimize=False):
+    np.random.seed(0)
+    n = SimpleNeuralNetwork(3, [4, 3], 1, fused=fused)
+    optimizer = Optimizers.SGD(n.parameters, 0.2)
+    step = capture(loss_fn(n) if not fused else lambda x, y: Loss.MSELoss(y, n(x)), xs, ys)
+    counts = step.optimize() if optimize else None
+
+    start = time.perf_counter()
+    for epoch in range(epochs):
+        loss = step(xs, ys)
+        optimizer.zero_grad()
+        step.backward()
+        optimizer.step()
+    return (time.perf_counter() - start) / epochs, loss.data, counts
+
+
+if __name__ == '__main__':
+    epochs = 500
+    eager, eager_loss = train_eager(epochs)
+    static, static_loss, _ = train_static(epochs)
+
+    print(f"eager  : {eager * 1e3:8.3f} ms/epoch  final loss {eager_loss:.6f}")
+    print(f"static : {static * 1e3:8.3f} ms/epoch  final loss {static_loss:.6f}")
+    print(f"speedup: {eager / static:8.2f}x")
+
+    unfused, unfused_loss, _ = train_static(epochs, fused=False)
+    optimized, optimized_loss, counts = train_static(epochs, fused=False, optimize=True)
+
+    print()
+    print(f"unfused static    : {unfused * 1e3:8.3f} ms/epoch  final loss {unfused_loss:.6f}")
+    print(f"unfused optimized : {optimized * 1e3:8.3f} ms/epoch  final loss {optimized_loss:.6f}")
+    print(f"nodes before      : {sum(counts['before'].values()):5d}  {dict(counts['before'])}")
+    print(f"nodes after       : {sum(counts['after'].values()):5d}  {dict(counts['after'])}")
@@ -0,0 +1,288 @@
+"""
+Benchmark suite with JSON results and regression tracking.
+
+Run every case and write the results, with environment metadata, to a JSON file:
+    python -m benchmarks.suite run -o results.json
+
+Compare a run against a stored baseline (exits with status 1 if a case regressed):
+    python -m benchmarks.suite compare baseline.json results.json --threshold 0.1
+
+Use --quick for smaller sizes and --filter to run only the cases whose name contains a string.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from microtorch import nn, Optimizers, Loss
+from microtorch.Tensor import Tensor
+from microtorch.Value import Value
+
+
+class MLP(nn.Model):
+    def __init__(self, sizes, tensor=False):
+        self.layers = [ nn.Layer(sizes[i-1], sizes[i], tensor=tensor) for i in range(1, len(sizes)) ]
+
+    def forward(self, x):
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+
+# Cases: each one is a setup function taking the case parameters and returning the function to
+# time and the number of work units (ops, nodes, samples, ...) one call of it processes.
+
+def value_ops(ops):
+    a, b = Value(0.5), Value(1.5)
+
+    def run():
+        v = a
+        for _ in range(ops // 2):
+            v = v * b + a
+        return v
+    return run, ops
+
+
+def backward(nodes):
+    np.random.seed(0)
+    leaves = [ Value(x) for x in np.random.normal(size=64).tolist() ]
+
+    # A long chain of '*' and '+' nodes mixing in the leaves
+    v = leaves[0]
+    for i in range(nodes // 2):
+        v = v * 0.5 + leaves[i % len(leaves)]
+
+    return v.backward, nodes
+
+
+def neuron(nin, tensor, batch=16):
+    np.random.seed(0)
+    unit = nn.Neuron(nin, tensor=tensor)
+    xs = np.random.normal(size=(batch, nin))
+    ys = np.zeros(batch)
+
+    def run():
+        out = unit(xs)
+        loss = Loss.MSELoss(ys, out[:, 0] if tensor else out)
+        loss.backward()
+    return run, batch
+
+
+def layer(nin, nout, tensor, batch=16):
+    np.random.seed(0)
+    unit = nn.Layer(nin, nout, tensor=tensor)
+    xs = np.random.normal(size=(batch, nin))
+    ys = np.zeros((batch, nout))
+
+    def run():
+        loss = Loss.MSELoss(ys, unit(xs))
+        loss.backward()
+    return run, batch
+
+
+def training_epoch(samples, tensor, batch=32):
+    np.random.seed(0)
+    n = MLP([8, 32, 32, 1], tensor=tensor)
+    optimizer = Optimizers.SGD(n.parameters, 0.05)
+    xs = np.random.normal(size=(samples, 8))
+    ys = np.tanh(xs @ np.random.normal(size=8))
+
+    def run():
+        for start in range(0, samples, batch):
+            loss = Loss.MSELoss(ys[start:start + batch], n(xs[start:start + batch]))
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+    return run, samples
+
+
+def sgd_step(parameters, tensor):
+    np.random.seed(0)
+    if tensor:
+        params = [ Tensor(np.random.normal(size=parameters)) ]
+    else:
+        params = [ Value(x) for x in np.random.normal(size=parameters).tolist() ]
+
+    optimizer = Optimizers.SGD(lambda: params, 0.01, momentum=0.9)
+    optimizer.buffer.grad[:] = np.random.normal(size=parameters)
+    optimizer.buffer.push_grad()
+    return optimizer.step, parameters
+
+
+def cases(quick=False):
+
+    """
+    Return the (name, setup, parameters) of every case.
+    """
+
+    graph_sizes = (10 ** 3, 10 ** 4) if quick else (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+    param_sizes = (10 ** 3, 10 ** 4) if quick else (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+
+    yield 'value_ops', value_ops, { 'ops': 10 ** 4 if quick else 10 ** 5 }
+
+    for nodes in graph_sizes:
+        yield 'backward', backward, { 'nodes': nodes }
+
+    for tensor in (False, True):
+        for nin in (4, 32, 256):
+            yield 'neuron', neuron, { 'nin': nin, 'tensor': tensor }
+        for nin in (4, 32, 256):
+            for nout in (4, 32):
+                yield 'layer', layer, { 'nin': nin, 'nout': nout, 'tensor': tensor }
+
+    for tensor in (False, True):
+        yield 'training_epoch', training_epoch, { 'samples': 64 if quick else 256, 'tensor': tensor }
+
+    for parameters in param_sizes:
+        yield 'sgd_step', sgd_step, { 'parameters': parameters, 'tensor': True }
+        if parameters <= 10 ** 5:
+            yield 'sgd_step', sgd_step, { 'parameters': parameters, 'tensor': False }
+
+
+def case_key(result):
+
+    """
+    Return the key identifying a case across runs, e.g. 'layer[nin=4,nout=32,tensor=True]'.
+    """
+
+    params = ','.join(f"{k}={v}" for k, v in sorted(result['params'].items()))
+    return f"{result['name']}[{params}]"
+
+
+def measure(setup, params, repeats):
+
+    """
+    Time one case and measure its peak traced memory.
+
+    Returns:
+        dict: Median and minimum seconds per call, units per second and peak bytes (setup included).
+    """
+
+    # Peak memory of building the case and running it once
+    tracemalloc.start()
+    fn, units = setup(**params)
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    median = float(np.median(times))
+    return {
+        'median_s': median,
+        'min_s': float(np.min(times)),
+        'units_per_s': units / median,
+        'peak_bytes': int(peak),
+        'repeats': repeats,
+    }
+
+
+def environment():
+
+    """
+    Return metadata describing the machine and the code being benchmarked.
+    """
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'commit': commit,
+    }
+
+
+def run(output, quick=False, repeats=5, pattern=''):
+    results = []
+    for name, setup, params in cases(quick):
+        if pattern not in name:
+            continue
+
+        result = { 'name': name, 'params': params }
+        result.update(measure(setup, params, repeats))
+        results.append(result)
+        print(f"{case_key(result):50s} {result['median_s'] * 1e3:11.3f} ms {result['units_per_s']:14.0f} /s "
+              f"{result['peak_bytes'] / 1e6:9.2f} MB", flush=True)
+
+    with open(output, 'w') as f:
+        json.dump({ 'environment': environment(), 'results': results }, f, indent=2)
+    print(f"results written to {output}")
+
+
+def compare(baseline, current, threshold=0.1, memory_floor=64 * 1024):
+
+    """
+    Compare two result files case by case.
+
+    A case regresses when its median time or its peak memory grows by more than 'threshold'
+    (a fraction, 0.1 = 10%) relative to the baseline. Memory growth below 'memory_floor' bytes
+    is ignored, as small cases vary by a few allocations from run to run.
+
+    Returns:
+        list: The keys of the regressed cases.
+    """
+
+    with open(baseline) as f:
+        old = { case_key(r): r for r in json.load(f)['results'] }
+    with open(current) as f:
+        new = { case_key(r): r for r in json.load(f)['results'] }
+
+    regressions = []
+    print(f"{'case':50s} {'time':>9s} {'memory':>9s}")
+    for key, result in new.items():
+        if key not in old:
+            print(f"{key:50s} {'new':>9s}")
+            continue
+
+        time_ratio = result['median_s'] / old[key]['median_s']
+        memory_ratio = result['peak_bytes'] / max(old[key]['peak_bytes'], 1)
+        memory_growth = result['peak_bytes'] - old[key]['peak_bytes']
+        regressed = time_ratio > 1 + threshold or (memory_ratio > 1 + threshold and memory_growth > memory_floor)
+        if regressed:
+            regressions.append(key)
+
+        print(f"{key:50s} {time_ratio:8.2f}x {memory_ratio:8.2f}x{'  REGRESSION' if regressed else ''}")
+
+    print(f"{len(regressions)} regression(s) over {threshold:.0%}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the suite and write the results to JSON')
+    run_parser.add_argument('-o', '--output', default='benchmark_results.json')
+    run_parser.add_argument('--quick', action='store_true', help='smaller sizes')
+    run_parser.add_argument('--repeats', type=int, default=5)
+    run_parser.add_argument('--filter', default='', help='only run the cases whose name contains this string')
+
+    compare_parser = commands.add_parser('compare', help='flag regressions against a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args.output, quick=args.quick, repeats=args.repeats, pattern=args.filter)
+    else:
+        sys.exit(1 if compare(args.baseline, args.current, args.threshold) else 0)
@@ -0,0 +1,63 @@
+"""
+Memory and construction speed of scalar Value nodes during an nn.Layer forward pass.
+
+Reports the bytes allocated per graph node and the number of nodes created per second.
+
+Run from the repository root:
+    python -m benchmarks.value_memory
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+from microtorch import nn
+
+
+def reachable(roots):
+
+    """
+    Return the set of nodes reachable from 'roots' through their operands.
+    """
+
+    seen = set()
+    stack = list(roots)
+    while stack:
+        v = stack.pop()
+        if v not in seen:
+            seen.add(v)
+            stack.extend(v._prev)
+    return seen
+
+
+def run(nin=64, nout=32, batch=8, repeats=5):
+    np.random.seed(0)
+    layer = nn.Layer(nin, nout)
+    xs = np.random.normal(size=(batch, nin))
+
+    # Nodes that already existed before the forward pass (the parameters) are not counted
+    existing = reachable(layer.parameters())
+
+    # Bytes per node: trace the allocations of one forward pass over the batch
+    tracemalloc.start()
+    outs = [ layer(x) for x in xs ]
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    nodes = len(reachable(np.concatenate(outs)) - existing)
+    del outs
+
+    # Nodes per second: time the same forward pass without tracing
+    start = time.perf_counter()
+    for _ in range(repeats):
+        outs = [ layer(x) for x in xs ]
+    elapsed = (time.perf_counter() - start) / repeats
+
+    return nodes, allocated / nodes, nodes / elapsed
+
+
+if __name__ == '__main__':
+    nodes, bytes_per_node, nodes_per_second = run()
+    print(f"nodes per forward : {nodes}")
+    print(f"bytes per node    : {bytes_per_node:10.1f}")
+    print(f"nodes per second  : {nodes_per_second:10.0f}")
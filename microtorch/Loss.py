@@ -1,33 +1,154 @@
 import numpy as np
 
+from microtorch.Optimizers import Optimizer
+from microtorch.Tensor import Tensor
+from microtorch.utils import ParameterBuffer
+from microtorch.Value import LITERAL, Value, reduction
+
+
+# Loss kernels: each one maps the float predictions (and constant targets) to the loss value and
+# its gradient with respect to every prediction, in one vectorized pass.
+
+def _mse(x, y, n):
+    diff = x - y
+    return np.sum(diff ** 2) / n, 2 * diff / n
+
+def _l2(x, alpha):
+    return alpha * np.sum(x ** 2), 2 * alpha * x
+
+def _softmax_cross_entropy(x, t):
+    # log-softmax through log-sum-exp, shifted by the row maximum for numerical stability
+    shifted = x - np.max(x, axis=-1, keepdims=True)
+    log_sum_exp = np.log(np.sum(np.exp(shifted), axis=-1, keepdims=True))
+    log_probs = shifted - log_sum_exp
+    n = x.size // x.shape[-1]
+    return -np.sum(t * log_probs) / n, (np.exp(log_probs) * np.sum(t, axis=-1, keepdims=True) - t) / n
+
+def _bce_with_logits(x, y):
+    # max(x, 0) - x * y + log(1 + exp(-|x|)) never overflows
+    n = x.size
+    e = np.exp(-np.abs(x))
+    loss = np.maximum(x, 0) - x * y + np.log1p(e)
+    sigmoid = np.where(x >= 0, 1, e) / (1 + e)
+    return np.sum(loss) / n, (sigmoid - y) / n
+
+def _huber(x, y, delta):
+    n = x.size
+    diff = x - y
+    small = np.abs(diff) <= delta
+    loss = np.where(small, 0.5 * diff ** 2, delta * (np.abs(diff) - 0.5 * delta))
+    return np.sum(loss) / n, np.clip(diff, -delta, delta) / n
+
+
+def _single(kernel):
+
+    """
+    Adapt a loss kernel to the list-of-inputs signature of Tensor.fused.
+    """
+
+    def func(datas, *args):
+        value, grad = kernel(datas[0], *args)
+        return value, [grad]
+    return func
+
+
+def _fused_loss(kernel, y_pred, *args, name='loss'):
+
+    """
+    Build a loss as a single reduction node over the predictions.
+
+    Args:
+        kernel (callable): kernel(x, *args) -> (value, gradient) over the float predictions.
+        y_pred: A Tensor, an array-like of Value objects or an array-like of numbers.
+        args: Constant arguments of the kernel (e.g. the targets).
+        name (str): Name of the operation.
+
+    Returns:
+        Tensor or Value: The loss. Plain numbers give a Value leaf (no graph to backpropagate through).
+    """
+
+    if isinstance(y_pred, Tensor):
+        return Tensor.fused([y_pred], _single(kernel), *args, _op=name)
+
+    y_pred = np.asarray(y_pred)
+    if args and isinstance(args[0], np.ndarray) and args[0].dtype == object:
+        # Value targets (e.g. traced inputs of a StaticGraph) are operands of the node so that a
+        # replay reads their new data; they are treated as constants and get no gradient
+        return reduction(np.stack([_as_values(y_pred), args[0]]), _with_targets(kernel), *args[1:])
+
+    if y_pred.dtype != object:
+        return Value(float(kernel(y_pred.astype(np.float64), *args)[0]))
+
+    return reduction(y_pred, kernel, *args)
+
+
+def _with_targets(kernel):
+
+    """
+    Adapt a loss kernel to predictions and targets stacked along a leading axis.
+    """
+
+    def func(x, *args):
+        value, grad = kernel(x[0], x[1], *args)
+        return value, np.stack([grad, np.zeros_like(grad)])
+    return func
+
+
+def _as_values(x):
+
+    """
+    Wrap plain numbers into Value leaves, leaving Value objects untouched.
+    """
+
+    values = np.empty(x.shape, dtype=object)
+    for index, v in np.ndenumerate(x):
+        values[index] = v if isinstance(v, Value) else Value(float(v), _const=LITERAL)
+    return values
+
+
+def _targets(y_true, shape):
+
+    """
+    Convert targets to a float array of the given shape (an object array if they hold Values).
+    """
+
+    y_true = np.asarray(y_true)
+    if y_true.dtype == object and any(isinstance(v, Value) for v in y_true.ravel()):
+        return _as_values(y_true).reshape(shape)
+    return y_true.astype(np.float64).reshape(shape)
+
+
 def MSELoss(y_true, y_pred):
 
     """
     Calculate the mean squared error (MSE) loss.
 
+    The loss is a single graph node whose gradient, 2 * (y_pred - y_true) / n, is computed in one
+    vectorized pass.
+
     Args:
         y_true (numpy.ndarray): Array containing the true labels.
-        y_pred (numpy.ndarray): Array containing the predicted values.
+        y_pred (numpy.ndarray or Tensor): Array containing the predicted values.
 
     Returns:
-        float: The mean squared error (MSE).
+        Value or Tensor: The mean squared error (MSE).
     """
 
-    y_true = np.array(y_true)
-    y_pred = np.array(y_pred)
-    loss = np.sum((y_true - y_pred) ** 2) / len(y_true)
-
-    return loss
+    shape = y_pred.shape if isinstance(y_pred, Tensor) else np.shape(y_pred)
+    return _fused_loss(_mse, y_pred, _targets(y_true, shape), len(y_true), name='mse')
 
 def MSELossL2(y_true, y_pred, parameters, alpha):
-    
+
     """
     Compute the Mean Squared Error (MSE) loss augmented with L2 regularization.
 
+    The L2 term is a single node over all the parameters at once instead of one node per weight.
+
     Args:
         y_true (numpy.ndarray): The true values or ground truth.
         y_pred (numpy.ndarray): The predicted values.
-        parameters (callable): A function that provides the model parameters.
+        parameters: A function that provides the model parameters, or the ParameterBuffer or the
+            Optimizer that holds them (which spares collecting the parameters on every call).
         alpha (float): The regularization parameter, controlling the strength of the L2 regularization.
 
     Returns:
@@ -36,8 +157,107 @@ def MSELossL2(y_true, y_pred, parameters, alpha):
 
     mse_loss = MSELoss(y_true, y_pred)
 
-    l2_regularization_term = alpha * sum(p ** 2 for p in parameters())
+    l2_regularization_term = L2(parameters() if callable(parameters) else parameters, alpha)
 
     combined_loss = mse_loss + l2_regularization_term
 
     return combined_loss
+
+def L2(parameters, alpha):
+
+    """
+    Compute the L2 regularization term alpha * sum(p ** 2) as a single fused node.
+
+    Args:
+        parameters: The model parameters (Value objects, or Tensor objects), or the ParameterBuffer
+            or the Optimizer that holds them.
+        alpha (float): The regularization strength.
+
+    Returns:
+        Value or Tensor: The regularization term.
+    """
+
+    if isinstance(parameters, Optimizer):
+        parameters = parameters.buffer
+    if isinstance(parameters, ParameterBuffer):
+        # The buffer already holds its Value parameters as one object array
+        if len(parameters.values) == len(parameters.parameters):
+            return reduction(parameters.values, _l2, alpha)
+        parameters = parameters.parameters
+
+    parameters = list(parameters)
+
+    if parameters and isinstance(parameters[0], Tensor):
+        def func(datas, alpha):
+            return alpha * sum(np.sum(d ** 2) for d in datas), [ 2 * alpha * d for d in datas ]
+        return Tensor.fused(parameters, func, alpha, _op='l2')
+
+    values = np.empty(len(parameters), dtype=object)
+    values[:] = parameters
+    return reduction(values, _l2, alpha)
+
+def CrossEntropyLoss(y_true, y_pred):
+
+    """
+    Compute the softmax cross-entropy loss from unnormalized scores (logits).
+
+    The softmax is never formed explicitly: log-probabilities are computed with the log-sum-exp
+    trick, which stays finite for arbitrarily large logits. The gradient is softmax - targets.
+
+    Args:
+        y_true (numpy.ndarray): Class indices of shape (batch,), or target probabilities (e.g. one-hot)
+            of shape (batch, classes). A single sample takes one class index or a (classes,) vector.
+        y_pred (numpy.ndarray or Tensor): Logits of shape (batch, classes), or (classes,) for a
+            single sample.
+
+    Returns:
+        Value or Tensor: The mean cross-entropy over the batch.
+    """
+
+    shape = y_pred.shape if isinstance(y_pred, Tensor) else np.shape(y_pred)
+    y_true = np.asarray(y_true)
+
+    if y_true.ndim == len(shape) - 1:
+        # Class indices: expand to one-hot targets
+        classes = y_true.astype(int).ravel()
+        if np.any((classes < 0) | (classes >= shape[-1])):
+            raise ValueError(f"class indices must be in [0, {shape[-1]}), got {y_true}")
+        targets = np.zeros(shape, dtype=np.float64)
+        targets.reshape(-1, shape[-1])[np.arange(len(classes)), classes] = 1.0
+    else:
+        targets = _targets(y_true, shape)
+
+    return _fused_loss(_softmax_cross_entropy, y_pred, targets, name='cross_entropy')
+
+def BCEWithLogitsLoss(y_true, y_pred):
+
+    """
+    Compute the binary cross-entropy loss from logits, fused with the sigmoid.
+
+    Args:
+        y_true (numpy.ndarray): Binary targets (0 or 1), shaped like the predictions.
+        y_pred (numpy.ndarray or Tensor): Logits.
+
+    Returns:
+        Value or Tensor: The mean binary cross-entropy.
+    """
+
+    shape = y_pred.shape if isinstance(y_pred, Tensor) else np.shape(y_pred)
+    return _fused_loss(_bce_with_logits, y_pred, _targets(y_true, shape), name='bce_with_logits')
+
+def HuberLoss(y_true, y_pred, delta=1.0):
+
+    """
+    Compute the Huber loss: quadratic for errors smaller than 'delta', linear beyond.
+
+    Args:
+        y_true (numpy.ndarray): The true values.
+        y_pred (numpy.ndarray or Tensor): The predicted values.
+        delta (float): The threshold between the quadratic and the linear regime.
+
+    Returns:
+        Value or Tensor: The mean Huber loss.
+    """
+
+    shape = y_pred.shape if isinstance(y_pred, Tensor) else np.shape(y_pred)
+    return _fused_loss(_huber, y_pred, _targets(y_true, shape), delta, name='huber')
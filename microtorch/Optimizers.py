@@ -1,10 +1,22 @@
+import numpy as np
 
+from microtorch.utils import ParameterBuffer
 
-class SGD:
-    def __init__(self, parameters, learning_rate=0.01):
+
+class Optimizer :
+
+    """
+    Base class of the optimizers.
+
+    The parameters are registered once, on first use, into a flat ParameterBuffer. zero_grad is
+    then a single fill of the gradient buffer and step is a vectorized update of the whole data
+    buffer. Optimizer state (momentum, running averages) is stored as arrays of the same shape.
+    """
+
+    def __init__(self, parameters, learning_rate):
 
         """
-        Initialize the SGD optimizer.
+        Initialize the optimizer.
 
         Args:
             parameters (callable): A function that returns the model parameters.
@@ -13,6 +25,18 @@ class SGD:
 
         self.learning_rate = learning_rate
         self.parameters = parameters
+        self._buffer = None
+
+    @property
+    def buffer(self):
+
+        """
+        The flat buffer of the parameters, built the first time it is needed.
+        """
+
+        if self._buffer is None:
+            self._buffer = ParameterBuffer(self.parameters())
+        return self._buffer
 
     def zero_grad(self):
 
@@ -20,14 +44,223 @@ class SGD:
         Clear the gradients of all model parameters.
         """
 
-        for p in self.parameters():
-            p.grad = 0.0
+        self.buffer.zero_grad()
+
+    def step(self, grad_scale=None):
+
+        """
+        Update model parameters from their current gradients.
+
+        Args:
+            grad_scale (float): The factor the gradients were scaled by (e.g. by a loss scaler), or
+                None. The gradients are divided by it, and the step is skipped if any of them is
+                then not finite.
+
+        Returns:
+            bool: Whether the step was taken.
+        """
+
+        buffer = self.buffer
+        # Parameters may have been written since the last step (e.g. by checkpoint.load)
+        buffer.pull_data()
+        buffer.pull_grad()
+
+        if grad_scale is not None:
+            buffer.grad *= 1.0 / grad_scale
+            if not np.all(np.isfinite(buffer.grad)):
+                return False
+
+        self._update(buffer.data, buffer.grad)
+        buffer.push_data()
+        return True
+
+    def _update(self, data, grad):
+
+        """
+        Update the flat parameter array 'data' in place from the flat gradient array 'grad'.
+        """
+
+        raise NotImplementedError
+
+
+class SGD(Optimizer) :
+
+    """
+    Stochastic gradient descent, optionally with (Nesterov) momentum and L2 weight decay.
+    """
+
+    def __init__(self, parameters, learning_rate=0.01, momentum=0.0, nesterov=False, weight_decay=0.0):
+
+        """
+        Initialize the SGD optimizer.
+
+        Args:
+            parameters (callable): A function that returns the model parameters.
+            learning_rate (float): The learning rate for the optimizer.
+            momentum (float): The momentum factor (0 disables momentum).
+            nesterov (bool): Whether to use Nesterov momentum.
+            weight_decay (float): The L2 penalty added to the gradients.
+        """
+
+        super().__init__(parameters, learning_rate)
+        self.momentum = momentum
+        self.nesterov = nesterov
+        self.weight_decay = weight_decay
+        self.velocity = None
 
-    def step(self):
+    def _update(self, data, grad):
 
         """
         Update model parameters using SGD.
         """
-        
-        for p in self.parameters():
-            p.data += -self.learning_rate * p.grad
+
+        if self.weight_decay:
+            grad = grad + self.weight_decay * data
+
+        if self.momentum:
+            if self.velocity is None:
+                self.velocity = np.zeros_like(data)
+            self.velocity *= self.momentum
+            self.velocity += grad
+            grad = grad + self.momentum * self.velocity if self.nesterov else self.velocity
+
+        data -= self.learning_rate * grad
+
+
+class RMSProp(Optimizer) :
+
+    """
+    RMSProp: scale each step by a running average of the squared gradients.
+    """
+
+    def __init__(self, parameters, learning_rate=0.01, alpha=0.99, eps=1e-8, momentum=0.0):
+
+        """
+        Initialize the RMSProp optimizer.
+
+        Args:
+            parameters (callable): A function that returns the model parameters.
+            learning_rate (float): The learning rate for the optimizer.
+            alpha (float): The smoothing constant of the squared-gradient average.
+            eps (float): Term added to the denominator for numerical stability.
+            momentum (float): The momentum factor (0 disables momentum).
+        """
+
+        super().__init__(parameters, learning_rate)
+        self.alpha = alpha
+        self.eps = eps
+        self.momentum = momentum
+        self.square_avg = None
+        self.velocity = None
+
+    def _update(self, data, grad):
+
+        """
+        Update model parameters using RMSProp.
+        """
+
+        if self.square_avg is None:
+            self.square_avg = np.zeros_like(data)
+            self.velocity = np.zeros_like(data)
+
+        self.square_avg *= self.alpha
+        self.square_avg += (1 - self.alpha) * grad * grad
+        step = grad / (np.sqrt(self.square_avg) + self.eps)
+
+        if self.momentum:
+            self.velocity *= self.momentum
+            self.velocity += step
+            step = self.velocity
+
+        data -= self.learning_rate * step
+
+
+class Adam(Optimizer) :
+
+    """
+    Adam: adaptive moment estimation with bias correction, optionally with L2 weight decay.
+    """
+
+    def __init__(self, parameters, learning_rate=0.001, betas=(0.9, 0.999), eps=1e-8, weight_decay=0.0):
+
+        """
+        Initialize the Adam optimizer.
+
+        Args:
+            parameters (callable): A function that returns the model parameters.
+            learning_rate (float): The learning rate for the optimizer.
+            betas (tuple): The decay rates of the first and second moment estimates.
+            eps (float): Term added to the denominator for numerical stability.
+            weight_decay (float): The L2 penalty added to the gradients.
+        """
+
+        super().__init__(parameters, learning_rate)
+        self.betas = betas
+        self.eps = eps
+        self.weight_decay = weight_decay
+        self.m = None
+        self.v = None
+        self.t = 0
+
+    def _moments_step(self, grad):
+
+        """
+        Update the moment estimates and return the bias-corrected step direction.
+        """
+
+        beta1, beta2 = self.betas
+        if self.m is None:
+            self.m = np.zeros_like(grad)
+            self.v = np.zeros_like(grad)
+
+        self.t += 1
+        self.m *= beta1
+        self.m += (1 - beta1) * grad
+        self.v *= beta2
+        self.v += (1 - beta2) * grad * grad
+
+        m_hat = self.m / (1 - beta1 ** self.t)
+        v_hat = self.v / (1 - beta2 ** self.t)
+        return m_hat / (np.sqrt(v_hat) + self.eps)
+
+    def _update(self, data, grad):
+
+        """
+        Update model parameters using Adam.
+        """
+
+        if self.weight_decay:
+            grad = grad + self.weight_decay * data
+
+        data -= self.learning_rate * self._moments_step(grad)
+
+
+class AdamW(Adam) :
+
+    """
+    AdamW: Adam with weight decay decoupled from the gradient.
+    """
+
+    def __init__(self, parameters, learning_rate=0.001, betas=(0.9, 0.999), eps=1e-8, weight_decay=0.01):
+
+        """
+        Initialize the AdamW optimizer.
+
+        Args:
+            parameters (callable): A function that returns the model parameters.
+            learning_rate (float): The learning rate for the optimizer.
+            betas (tuple): The decay rates of the first and second moment estimates.
+            eps (float): Term added to the denominator for numerical stability.
+            weight_decay (float): The decoupled weight decay factor.
+        """
+
+        super().__init__(parameters, learning_rate, betas, eps, weight_decay)
+
+    def _update(self, data, grad):
+
+        """
+        Update model parameters using AdamW.
+        """
+
+        data *= 1 - self.learning_rate * self.weight_decay
+        data -= self.learning_rate * self._moments_step(grad)
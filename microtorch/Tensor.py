@@ -0,0 +1,648 @@
+import numpy as np
+
+from microtorch import autograd
+
+class Tensor :
+
+    """
+    A class representing an n-dimensional array in a computational graph with support for automatic differentiation.
+
+    Unlike Value, which wraps a single float, a Tensor stores its data and gradient as contiguous
+    numpy arrays, so one graph node stands for a whole array operation and the backward pass of
+    each operation is a handful of vectorized numpy calls.
+    """
+
+    # Make numpy defer to Tensor's reflected operators (e.g. ndarray - Tensor -> Tensor.__rsub__)
+    __array_ufunc__ = None
+
+
+    def __init__(self, data, _op='', _prev=(), label=''):
+
+        """
+        Initialize a Tensor object.
+
+        Args:
+            data: The data, anything accepted by numpy.asarray.
+            _op: The operation performed on this tensor (optional).
+            _prev: A tuple of previous Tensor objects that influenced this tensor (optional), used to keep track of the computational graph.
+            label: A label for this tensor (optional).
+        """
+
+        if isinstance(data, Tensor):
+            # If data is a Tensor object, copy its attributes
+            self.data = data.data
+            self._op = data._op
+            self._prev = data._prev
+            self.label = data.label
+            self.grad = data.grad
+            self._backward = data._backward
+        else:
+            # Otherwise, initialize attributes (float arrays keep their dtype, anything else becomes float64)
+            dtype = data.dtype if isinstance(data, np.ndarray) and data.dtype.kind == 'f' else np.float64
+            self.data = np.asarray(data, dtype=dtype, order='C')
+            self._prev = set(_prev) if autograd._state.grad_enabled else set()
+            self._op = _op
+            self.label = label
+
+            # Initialize gradient to zero (not needed when graph construction is disabled). np.zeros
+            # gets zeroed pages from the system lazily, so large parameters (e.g. memory-mapped
+            # ones) do not pay for writing a gradient they may never use
+            self.grad = np.zeros(self.data.shape, dtype=self.data.dtype) if autograd._state.grad_enabled else None
+            # Initialize backward function to a default empty lambda function
+            self._backward = lambda: None
+
+            # Record the node in the arena of the current training step
+            arena = autograd._state.arena
+            if arena is not None:
+                arena.tensors.append(self)
+
+
+    def __repr__(self):
+
+        """
+        Return a string representation of the Tensor object.
+        """
+
+        return f"Tensor(data={self.data})"
+
+
+    @property
+    def shape(self):
+
+        """
+        Return the shape of the underlying data array.
+        """
+
+        return self.data.shape
+
+
+    @property
+    def ndim(self):
+
+        """
+        Return the number of dimensions of the underlying data array.
+        """
+
+        return self.data.ndim
+
+
+    @staticmethod
+    def _unbroadcast(grad, shape):
+
+        """
+        Reduce a gradient back to the shape of an operand that was broadcast in the forward pass.
+
+        Args:
+            grad (numpy.ndarray): The gradient with the broadcast (output) shape.
+            shape (tuple): The shape of the operand.
+
+        Returns:
+            numpy.ndarray: The gradient summed over the broadcast axes.
+        """
+
+        # Sum over the leading axes that broadcasting prepended
+        while grad.ndim > len(shape):
+            grad = grad.sum(axis=0)
+
+        # Sum over the axes that were stretched from size 1
+        for axis, size in enumerate(shape):
+            if size == 1 and grad.shape[axis] != 1:
+                grad = grad.sum(axis=axis, keepdims=True)
+
+        return grad
+
+
+    def __add__(self, other):
+
+        """
+        Perform broadcasting addition between two Tensor objects.
+
+        Args:
+            other: The other Tensor (or array-like) to add.
+
+        Returns:
+            A new Tensor object representing the result of the addition.
+        """
+
+        # Convert 'other' to a Tensor instance if it's not already
+        other = other if isinstance(other, Tensor) else Tensor(other)
+
+        out = Tensor(self.data + other.data, _op='+', _prev=(self, other))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            self.grad += Tensor._unbroadcast(out.grad, self.data.shape)
+            other.grad += Tensor._unbroadcast(out.grad, other.data.shape)
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def __radd__(self, other):
+
+        """
+        Perform addition operation with the Tensor object on the right side.
+        """
+
+        return self + other
+
+
+    def __neg__(self):
+
+        """
+        Negate the Tensor object.
+        """
+
+        return self * -1
+
+
+    def __sub__(self, other):
+
+        """
+        Perform subtraction operation between two Tensor objects.
+        """
+
+        return self + (-other)
+
+
+    def __rsub__(self, other):
+
+        """
+        Perform subtraction operation with the Tensor object on the right side (other - self).
+        """
+
+        return (-self) + other
+
+
+    def __mul__(self, other):
+
+        """
+        Perform broadcasting element-wise multiplication between two Tensor objects.
+
+        Args:
+            other: The other Tensor (or array-like) to multiply.
+
+        Returns:
+            A new Tensor object representing the result of the multiplication.
+        """
+
+        # Convert 'other' to a Tensor instance if it's not already
+        other = other if isinstance(other, Tensor) else Tensor(other)
+
+        out = Tensor(self.data * other.data, _op='*', _prev=(self, other))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            self.grad += Tensor._unbroadcast(other.data * out.grad, self.data.shape)
+            other.grad += Tensor._unbroadcast(self.data * out.grad, other.data.shape)
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def __rmul__(self, other):
+
+        """
+        Perform multiplication operation with the Tensor object on the right side.
+        """
+
+        return self * other
+
+
+    def __pow__(self, pow):
+
+        """
+        Raise every element of the Tensor object to the power of 'pow'.
+
+        Args:
+            pow: The exponent to raise the elements to.
+
+        Returns:
+            A new Tensor object representing the result of the exponentiation.
+        """
+
+        assert isinstance(pow, (int, float)), "only supporting int/float powers for now"
+
+        out = Tensor(self.data ** pow, _op=f'**{pow}', _prev=(self, ))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            self.grad += pow * (self.data ** (pow - 1)) * out.grad
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def __truediv__(self, other):
+
+        """
+        Perform element-wise true division between two Tensor objects.
+        """
+
+        other = other if isinstance(other, Tensor) else Tensor(other)
+
+        return self * (other ** -1)
+
+
+    def __rtruediv__(self, other):
+
+        """
+        Perform true division operation with the Tensor object on the right side (other / self).
+        """
+
+        return (self ** -1) * other
+
+
+    def __matmul__(self, other):
+
+        """
+        Perform matrix multiplication between two Tensor objects.
+
+        Args:
+            other: The other Tensor (or array-like) to multiply with.
+
+        Returns:
+            A new Tensor object representing the result of the matrix multiplication.
+        """
+
+        # Convert 'other' to a Tensor instance if it's not already
+        other = other if isinstance(other, Tensor) else Tensor(other)
+
+        out = Tensor(self.data @ other.data, _op='@', _prev=(self, other))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            a, b, g = self.data, other.data, out.grad
+
+            # Promote vectors to matrices so that a single rule covers every case
+            a2 = a.reshape(1, -1) if a.ndim == 1 else a
+            b2 = b.reshape(-1, 1) if b.ndim == 1 else b
+            g2 = g
+            if a.ndim == 1:
+                g2 = np.expand_dims(g2, -2)
+            if b.ndim == 1:
+                g2 = np.expand_dims(g2, -1)
+
+            ga = g2 @ np.swapaxes(b2, -1, -2)
+            gb = np.swapaxes(a2, -1, -2) @ g2
+
+            self.grad += Tensor._unbroadcast(ga, a2.shape).reshape(a.shape)
+            other.grad += Tensor._unbroadcast(gb, b2.shape).reshape(b.shape)
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def __rmatmul__(self, other):
+
+        """
+        Perform matrix multiplication with the Tensor object on the right side (other @ self).
+        """
+
+        return Tensor(other) @ self
+
+
+    def __getitem__(self, index):
+
+        """
+        Select elements of the Tensor object using numpy indexing.
+
+        Args:
+            index: Any index accepted by numpy arrays.
+
+        Returns:
+            A new Tensor object holding the selected elements.
+        """
+
+        out = Tensor(self.data[index], _op='getitem', _prev=(self, ))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            np.add.at(self.grad, index, out.grad)
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def reshape(self, *shape):
+
+        """
+        Return a Tensor object with the same data viewed under a new shape.
+
+        Args:
+            shape: The new shape.
+
+        Returns:
+            A new Tensor object with the requested shape.
+        """
+
+        out = Tensor(self.data.reshape(*shape), _op='reshape', _prev=(self, ))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            self.grad += out.grad.reshape(self.data.shape)
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def astype(self, dtype):
+
+        """
+        Return a Tensor object with the data converted to another float dtype.
+
+        Args:
+            dtype: The new dtype, e.g. numpy.float32.
+
+        Returns:
+            A new Tensor object; its gradient is converted back to the dtype of this one.
+        """
+
+        out = Tensor(self.data.astype(dtype), _op='astype', _prev=(self, ))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            self.grad += out.grad
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    @staticmethod
+    def concatenate(tensors, axis=0):
+
+        """
+        Join a sequence of Tensor objects along an existing axis.
+
+        Args:
+            tensors: The Tensor objects to join.
+            axis (int): The axis along which the tensors are joined.
+
+        Returns:
+            A new Tensor object representing the concatenation.
+        """
+
+        tensors = [t if isinstance(t, Tensor) else Tensor(t) for t in tensors]
+        out = Tensor(np.concatenate([t.data for t in tensors], axis=axis), _op='cat', _prev=tensors)
+
+        # Define the backward function for computing gradients
+        def _backward():
+            splits = np.cumsum([t.data.shape[axis] for t in tensors])[:-1]
+            for t, g in zip(tensors, np.split(out.grad, splits, axis=axis)):
+                t.grad += g
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    @staticmethod
+    def fused(tensors, func, *args, _op='fused'):
+
+        """
+        Combine Tensor objects through a fused function with an analytic gradient.
+
+        'func' computes the result and the gradient of the result with respect to each input in one
+        vectorized call, so a whole loss or regularization term is a single graph node.
+
+        Args:
+            tensors: The input Tensor objects.
+            func (callable): func(datas, *args) -> (value, grads), where 'datas' is the list of input
+                arrays and 'grads' a list of gradients of the (scalar) value, shaped like the inputs.
+            args: Extra constant arguments passed to 'func'.
+            _op (str): Name of the operation (optional).
+
+        Returns:
+            A new Tensor object holding the value.
+        """
+
+        tensors = [ t if isinstance(t, Tensor) else Tensor(t) for t in tensors ]
+        value, grads = func([ t.data for t in tensors ], *args)
+        out = Tensor(value, _op=_op, _prev=tensors)
+
+        # Define the backward function for computing gradients
+        def _backward():
+            for t, g in zip(tensors, grads):
+                t.grad += g * out.grad
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    @staticmethod
+    def checkpoint(fn, x):
+
+        """
+        Run a segment of a network without keeping its internal graph, recomputing it during backward.
+
+        The forward pass runs 'fn' on the data of 'x' under no_grad, so the output is a single node
+        whose only operand is 'x'. Its backward function runs 'fn' again on a detached copy of 'x'
+        with the graph enabled, backpropagates the output gradient through this temporary graph
+        (into the parameters used by 'fn' and the copy of 'x') and releases it.
+
+        Args:
+            fn (callable): The segment. It must accept both float arrays (under no_grad) and Tensor
+                objects, like Layer and Model do.
+            x (Tensor): The input of the segment.
+
+        Returns:
+            A new Tensor object holding the output of 'fn'.
+        """
+
+        x = x if isinstance(x, Tensor) else Tensor(x)
+        with autograd.no_grad():
+            data = fn(x.data)
+        out = Tensor(data, _op='checkpoint', _prev=(x, ))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            with autograd.enable_grad():
+                leaf = Tensor(x.data)
+                y = fn(leaf)
+            topo = autograd.topological_sort(y)
+            y.grad = out.grad.copy()
+            autograd.backpropagate(topo)
+            x.grad += leaf.grad
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def sum(self, axis=None, keepdims=False, **kwargs):
+
+        """
+        Sum the elements of the Tensor object over the given axis.
+
+        Args:
+            axis: The axis or axes to sum over (default is all of them).
+            keepdims (bool): Whether to keep the reduced axes with size 1.
+
+        Returns:
+            A new Tensor object representing the sum.
+        """
+
+        out = Tensor(self.data.sum(axis=axis, keepdims=keepdims), _op='sum', _prev=(self, ))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            g = out.grad
+            if not keepdims and axis is not None:
+                g = np.expand_dims(g, axis)
+            self.grad += np.broadcast_to(g, self.data.shape)
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def mean(self, axis=None, keepdims=False, **kwargs):
+
+        """
+        Average the elements of the Tensor object over the given axis.
+
+        Args:
+            axis: The axis or axes to average over (default is all of them).
+            keepdims (bool): Whether to keep the reduced axes with size 1.
+
+        Returns:
+            A new Tensor object representing the mean.
+        """
+
+        # Count the elements that are averaged into each output element
+        if axis is None:
+            count = self.data.size
+        else:
+            axes = axis if isinstance(axis, tuple) else (axis, )
+            count = int(np.prod([self.data.shape[a] for a in axes]))
+
+        return self.sum(axis=axis, keepdims=keepdims) * (1.0 / count)
+
+
+    def relu(self):
+
+        """
+        Apply the rectified linear unit (ReLU) activation function element-wise.
+        """
+
+        out = Tensor(np.maximum(self.data, 0), _op='relu', _prev=(self, ))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            self.grad += (self.data > 0) * out.grad
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def log(self):
+
+        """
+        Apply the natural logarithm function element-wise.
+        """
+
+        out = Tensor(np.log(self.data), _op='log', _prev=(self, ))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            self.grad += out.grad / self.data
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def exp(self):
+
+        """
+        Apply the exponential function element-wise.
+        """
+
+        out = Tensor(np.exp(self.data), _op='exp', _prev=(self, ))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            self.grad += out.data * out.grad
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def tanh(self):
+
+        """
+        Apply the hyperbolic tangent (tanh) function element-wise.
+        """
+
+        out = Tensor(np.tanh(self.data), _op='tanh', _prev=(self, ))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            self.grad += (1 - out.data ** 2) * out.grad
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def sigmoid(self):
+
+        """
+        Apply the sigmoid function element-wise.
+        """
+
+        out = Tensor(1 / (1 + np.exp(-self.data)), _op='sigmoid', _prev=(self, ))
+
+        # Define the backward function for computing gradients
+        def _backward():
+            self.grad += (1 - out.data) * out.data * out.grad
+
+        if autograd._state.grad_enabled:
+            out._backward = _backward
+
+        return out
+
+
+    def backward(self, retain_graph=True) :
+
+        """
+        Perform backpropagation to compute gradients for each Tensor object in the computation graph.
+
+        Args:
+            retain_graph (bool): If False, release each node's operands and backward function as soon as
+                its gradient has been propagated, which lowers peak memory but prevents a second backward pass.
+        """
+
+        # Topologically sort the nodes in the computation graph (iteratively, so depth is unbounded)
+        topo = autograd.topological_sort(self)
+
+        # Seed the gradient of the output Tensor with ones (d out / d out)
+        self.grad = np.ones_like(self.data)
+
+        # Backpropagate gradients through the computation graph in reverse topological order
+        autograd.backpropagate(topo, retain_graph=retain_graph)
@@ -1,22 +1,62 @@
 import math
 
+import numpy as np
+
+from microtorch import autograd
+
+# Opcodes identifying the operation that produced a Value (indices into _FORWARD and _BACKWARD)
+OP_LEAF = 0
+OP_ADD = 1
+OP_MUL = 2
+OP_POW = 3
+OP_RELU = 4
+OP_LOG = 5
+OP_EXP = 6
+OP_TANH = 7
+OP_SIGMOID = 8
+OP_AFFINE = 9
+OP_REDUCE = 10
+OP_SEGMENT = 11
+OP_SEGMENT_OUTPUT = 12
+OP_NEG = 13
+OP_SUB = 14
+OP_DIV = 15
+OP_RELEASED = 16
+
+# Human readable name of every opcode
+OP_NAMES = ('', '+', '*', '**', 'relu', 'log', 'exp', 'tanh', 'sigmoid', 'affine', 'reduce', 'checkpoint', 'checkpoint_output',
+            'neg', '-', '/', 'released')
+
+# Saved constant of the leaves wrapping a plain number used as an operand (e.g. the 2 of 'x * 2' or
+# the -1 of a negation). Graph optimizations may fold these; other leaves, such as inputs and
+# parameters, are never treated as constants.
+LITERAL = 'literal'
+
 class Value :
 
     """
     A class representing a value in a computational graph with support for automatic differentiation.
+
+    Nodes are kept compact: attributes live in __slots__, the operands are a tuple and the operation
+    is an integer opcode (plus an optional saved constant such as the exponent of '**'). The backward
+    pass looks the gradient rule up in a dispatch table keyed on the opcode instead of calling a
+    closure stored on every node.
     """
 
+    __slots__ = ('data', 'grad', '_op', '_prev', '_const', 'label')
 
-    def __init__(self, data, _op='', _prev=(), label=''):
+
+    def __init__(self, data, _op=OP_LEAF, _prev=(), label='', _const=None):
 
         """
         Initialize a Value object.
 
         Args:
             data: The data value.
-            _op: The operation performed on this value (optional).
+            _op: The opcode of the operation performed on this value (optional).
             _prev: A tuple of previous Value objects that influenced this value (optional), used to keep track of the computational graph.
             label: A label for this value (optional).
+            _const: A constant saved by the operation for its backward pass, e.g. the exponent of '**' (optional).
         """
 
         if isinstance(data, Value):
@@ -24,20 +64,34 @@ class Value :
             self.data = data.data
             self._op = data._op
             self._prev = data._prev
+            self._const = data._const
             self.label = data.label
             self.grad = data.grad
-            self._backward = data._backward
         else:
             # Otherwise, initialize attributes
             self.data = data
-            self._prev = set(_prev)
-            self._op = _op
+            if autograd._state.grad_enabled:
+                self._prev = _prev if type(_prev) is tuple else tuple(_prev)
+                self._op = _op
+            else:
+                # Graph construction is disabled: keep the result as a detached leaf
+                self._prev = ()
+                self._op = OP_LEAF
+            self._const = _const
             self.label = label
 
             # Initialize gradient to zero
             self.grad = 0.0
-            # Initialize backward function to a default empty lambda function
-            self._backward = lambda: None
+
+            # Record the node and its ordered operands when a graph is being captured
+            tape = autograd._state.tape
+            if tape is not None:
+                tape.append((self, self._prev))
+
+            # Hand the node to the arena of the current training step
+            arena = autograd._state.arena
+            if arena is not None:
+                arena.values.append(self)
 
 
     def __repr__(self):
@@ -47,6 +101,27 @@ class Value :
         """
 
         return f"Value(data={self.data})"
+
+
+    @property
+    def op(self):
+
+        """
+        Return the name of the operation that produced this value, e.g. '+', 'tanh' or '**2'.
+        """
+
+        if self._op == OP_POW:
+            return f"**{self._const}"
+        return OP_NAMES[self._op]
+
+
+    def _backward(self):
+
+        """
+        Propagate the gradient of this value to its operands using the rule of its opcode.
+        """
+
+        _BACKWARD[self._op](self)
     
 
 
@@ -63,20 +138,10 @@ class Value :
         """
 
         # Convert 'other' to a Value instance if it's not already
-        other = other if isinstance(other, Value) else Value(other)
+        other = other if isinstance(other, Value) else Value(other, _const=LITERAL)
 
         # Create a new Value object representing the result of the addition
-        out = Value(self.data + other.data, _op='+', _prev=(self, other))
-
-        # Define the backward function for computing gradients
-        def _backward():
-            self.grad += out.grad
-            other.grad += out.grad
-
-        # Assign the backward function to the '_backward' attribute of the output Value
-        out._backward = _backward
-
-        return out
+        return Value(self.data + other.data, OP_ADD, (self, other))
 
         
     def __radd__(self,other):
@@ -136,8 +201,8 @@ class Value :
             A new Value object representing the result of the subtraction.
         """
 
-        # Delegate subtraction to __sub__ method and return the result
-        return self - other
+        # Add 'other' to the negated value and return the result
+        return (-self) + other
 
     
     def __mul__(self, other):
@@ -153,20 +218,10 @@ class Value :
         """
 
         # Convert 'other' to a Value instance if it's not already
-        other = other if isinstance(other, Value) else Value(other)
+        other = other if isinstance(other, Value) else Value(other, _const=LITERAL)
         
         # Calculate the product of the two values and create a new Value object
-        out = Value(self.data * other.data, _op='*', _prev=(self, other))
-
-        # Define the backward function for computing gradients
-        def _backward():
-            self.grad += other.data * out.grad
-            other.grad += self.data * out.grad
-
-        # Assign the backward function to the '_backward' attribute of the output Value
-        out._backward = _backward
-
-        return out
+        return Value(self.data * other.data, OP_MUL, (self, other))
 
 
     def __rmul__(self, other):
@@ -201,16 +256,7 @@ class Value :
         assert isinstance(pow, (int, float)), "only supporting int/float powers for now"
 
         # Calculate the result of raising the value to the power of 'pow' and create a new Value object
-        out = Value(self.data ** pow, _op=f'**{pow}', _prev=(self, ))
-
-        # Define the backward function for computing gradients
-        def _backward():
-            self.grad += pow * (self.data ** (pow - 1)) * out.grad
-
-        # Assign the backward function to the '_backward' attribute of the output Value
-        out._backward = _backward
-
-        return out
+        return Value(self.data ** pow, OP_POW, (self, ), _const=pow)
 
 
     def __rpow__(self, other):
@@ -225,8 +271,19 @@ class Value :
             A new Value object representing the result of the exponentiation.
         """
 
-        # Calculate the result of raising 'other' to the power of the value and return it
-        return other ** self.data
+        # c ** a = exp(a * log(c)), so the gradient flows back to the exponent
+        if other > 0:
+            return (self * math.log(other)).exp()
+
+        # 0 ** a is 0 for every positive a: the gradient of the exponent is zero
+        if other == 0:
+            return self * 0.0 + other ** self.data
+
+        # A negative base has a real power only for integer exponents, where the sign is constant:
+        # c ** a = (-1) ** a * exp(a * log(-c))
+        if not float(self.data).is_integer():
+            raise ValueError(f"{other} ** {self.data} is not a real number")
+        return (self * math.log(-other)).exp() * (-1) ** int(self.data)
 
 
     def __truediv__(self, other):
@@ -261,8 +318,12 @@ class Value :
             A new Value object representing the result of the division.
         """
 
-        # Delegate division to __truediv__ method and return the result
-        return other / self
+        # Check if the divisor is zero
+        if self.data == 0:
+            raise ValueError("Division by zero is not allowed.")
+
+        # Multiply 'other' by the reciprocal of the value and return the result
+        return other * self ** -1
 
 
     # order
@@ -280,7 +341,7 @@ class Value :
         """
 
         # Convert 'other' to a Value instance if it's not already and perform the comparison
-        other = other if isinstance(other, Value) else Value(other)
+        other = other if isinstance(other, Value) else Value(other, _const=LITERAL)
 
         return self.data < other.data
 
@@ -298,7 +359,7 @@ class Value :
         """
 
         # Convert 'other' to a Value instance if it's not already and perform the comparison
-        other = other if isinstance(other, Value) else Value(other)
+        other = other if isinstance(other, Value) else Value(other, _const=LITERAL)
 
         return self.data <= other.data
 
@@ -316,7 +377,7 @@ class Value :
         """
 
         # Convert 'other' to a Value instance if it's not already and perform the comparison
-        other = other if isinstance(other, Value) else Value(other)
+        other = other if isinstance(other, Value) else Value(other, _const=LITERAL)
 
         return self.data > other.data
 
@@ -334,7 +395,7 @@ class Value :
         """
 
         # Convert 'other' to a Value instance if it's not already and perform the comparison
-        other = other if isinstance(other, Value) else Value(other)
+        other = other if isinstance(other, Value) else Value(other, _const=LITERAL)
 
         return self.data >= other.data
 
@@ -349,16 +410,7 @@ class Value :
         """
 
         # Create a new Value object based on the ReLU function applied to the current value
-        out = Value(self.data, _op='relu', _prev=[self]) if self.data > 0 else Value(0, _op='relu', _prev=[self])
-
-        # Define the backward function for computing gradients
-        def _backward():
-            self.grad += out.grad if self.data > 0 else 0
-
-        # Assign the backward function to the '_backward' attribute of the output Value
-        out._backward = _backward
-
-        return out
+        return Value(self.data if self.data > 0 else 0, OP_RELU, (self, ))
 
 
     def log(self):
@@ -371,16 +423,7 @@ class Value :
         """
 
         # Calculate the natural logarithm of the current value and create a new Value object
-        out = Value(math.log(self.data), _op='log', _prev=[self])
-
-        # Define the backward function for computing gradients
-        def _backward():
-            self.grad += (1 / self.data) * out.grad
-
-        # Assign the backward function to the '_backward' attribute of the output Value
-        out._backward = _backward
-
-        return out
+        return Value(math.log(self.data), OP_LOG, (self, ))
 
     
     def exp(self):
@@ -393,16 +436,7 @@ class Value :
         """
 
         # Calculate the exponential function of the current value and create a new Value object
-        out = Value(math.exp(self.data), _op='exp', _prev=(self))
-
-        # Define the backward function for computing gradients
-        def _backward():
-            self.grad += out.data * out.grad
-
-        # Assign the backward function to the '_backward' attribute of the output Value
-        out._backward = _backward
-
-        return out
+        return Value(math.exp(self.data), OP_EXP, (self, ))
 
 
     def tanh(self):
@@ -417,16 +451,7 @@ class Value :
         # Calculate the hyperbolic tangent of the current value and create a new Value object
         x = self.data
         t = (math.exp(2*x) - 1)/(math.exp(2*x) + 1)
-        out = Value(t, _op='tanh', _prev=[self])
-
-        # Define the backward function for computing gradients
-        def _backward():
-            self.grad += (1 - t ** 2) * out.grad
-
-        # Assign the backward function to the '_backward' attribute of the output Value
-        out._backward = _backward
-
-        return out
+        return Value(t, OP_TANH, (self, ))
 
 
     def sigmoid(self):
@@ -441,44 +466,342 @@ class Value :
         # Calculate the sigmoid of the current value and create a new Value object
         data = self.data
         exp = math.exp(-data)
-        out = Value(1 / (exp + 1), _op='sigmoid', _prev=[self])
-
-        # Define the backward function for computing gradients
-        def _backward():
-            self.grad += (1 - out.data) * out.data * out.grad
-
-        # Assign the backward function to the '_backward' attribute of the output Value
-        out._backward = _backward
-
-        return out
+        return Value(1 / (exp + 1), OP_SIGMOID, (self, ))
 
         
         
         
-    def backward(self) :
+    def backward(self, retain_graph=True) :
     
         """
         Perform backpropagation to compute gradients for each Value object in the computation graph.
+
+        Args:
+            retain_graph (bool): If False, release each node's operands as soon as its gradient has
+                been propagated, which lowers peak memory but prevents a second backward pass.
         """
         
-        # implimentation of Topological sort         
-        topo = []
-        visited = set()
-
-        def topological_sort(v):
-          if isinstance(v,Value) and v not in visited:
-            visited.add(v)
-            for child in v._prev:
-              topological_sort(child)
-            topo.append(v)
-        
-        # Topologically sort the nodes in the computation graph
-        topological_sort(self)
+        # Topologically sort the nodes in the computation graph (iteratively, so depth is unbounded)
+        topo = autograd.topological_sort(self)
         
         # Set the gradient of the output Value to 1 (assuming loss function already set)
         self.grad = 1
 
         # Backpropagate gradients through the computation graph in reverse topological order
-        for v in reversed(topo) : 
-            v._backward()
-        
+        backpropagate(topo, retain_graph)
+
+
+def backpropagate(topo, retain_graph=True):
+
+    """
+    Apply the gradient rule of every node's opcode in reverse topological order.
+
+    Args:
+        topo (list): The Value nodes in topological order, as returned by autograd.topological_sort.
+            The list is consumed when 'retain_graph' is False.
+        retain_graph (bool): If False, drop each node's operands and constant as soon as its
+            gradient has been propagated, and mark it released (OP_RELEASED).
+    """
+
+    backward = _BACKWARD
+    if retain_graph:
+        for v in reversed(topo) :
+            backward[v._op](v)
+        return
+
+    # Pop the nodes off the order so that nothing but the graph itself keeps them alive
+    while topo :
+        v = topo.pop()
+        backward[v._op](v)
+        if v._prev :
+            # Mark the node released, so that a later backward through it fails instead of
+            # silently stopping there (leaves, e.g. parameters, stay usable)
+            v._op = OP_RELEASED
+            v._prev = ()
+            v._const = None
+
+
+def affine(x, w, b, activation=''):
+
+    """
+    Compute activation(x . w + b) as a single fused graph node.
+
+    The unfused expression builds about 2 * len(x) scalar '*' and '+' nodes plus an activation node.
+    The fused node has the weights, the bias and the inputs as operands and an analytic backward
+    for all of them, so the graph holds one node per neuron output regardless of fan-in.
+
+    Args:
+        x: The inputs, a sequence of Value objects or of numbers (treated as constants).
+        w: The weights, a sequence of Value objects of the same length as 'x'.
+        b (Value): The bias.
+        activation (str): 'tanh', 'relu', 'sigmoid' or anything else for the identity.
+
+    Returns:
+        A new Value object representing the activated output.
+    """
+
+    w = tuple(w)
+    x = list(x)
+
+    if len(x) != len(w):
+        raise ValueError(f"expected {len(w)} inputs, got {len(x)}")
+
+    if x and isinstance(x[0], Value):
+        # Inputs are graph nodes: they are operands and receive gradients too
+        x = tuple(v if isinstance(v, Value) else Value(v, _const=LITERAL) for v in x)
+        prev = w + (b, ) + x
+        const = (activation, len(w), None)
+    else:
+        # Inputs are constants: keep their floats on the node instead of wrapping them in leaves
+        prev = w + (b, )
+        const = (activation, len(w), tuple(float(v) for v in x))
+
+    return Value(_forward_affine(prev, const), OP_AFFINE, prev, _const=const)
+
+
+
+def reduction(values, func, *args):
+
+    """
+    Reduce an array of Value objects to a single fused graph node.
+
+    'func' works on the float data of the whole array at once and returns both the result and its
+    gradient with respect to every element, so a loss over n predictions is one node with an
+    analytic, vectorized backward instead of O(n) scalar nodes.
+
+    Args:
+        values: An array-like of Value objects (numbers are wrapped as constants).
+        func (callable): func(x, *args) -> (value, gradient), where x is a float array shaped like
+            'values' and gradient has the same shape as x.
+        args: Extra constant arguments passed to 'func' (e.g. the targets).
+
+    Returns:
+        A new Value object representing the reduction.
+    """
+
+    values = np.asarray(values, dtype=object)
+    prev = tuple(v if isinstance(v, Value) else Value(v, _const=LITERAL) for v in values.ravel().tolist())
+    const = (func, values.shape, args)
+
+    return Value(_forward_reduce(prev, const), OP_REDUCE, prev, _const=const)
+
+
+
+class _Segment :
+
+    """
+    State shared by a checkpointed segment node and its outputs.
+    """
+
+    __slots__ = ('fn', 'shape', 'data', 'grad')
+
+    def __init__(self, fn, shape):
+        self.fn = fn
+        self.shape = shape
+        self.data = None
+        self.grad = None
+
+
+def checkpoint(fn, x):
+
+    """
+    Run a segment of a network without keeping its internal graph, recomputing it during backward.
+
+    The forward pass runs 'fn' under no_grad, so only the inputs and the outputs of the segment stay
+    in the graph: the outputs are attached to one segment node whose operands are the inputs. When
+    backward reaches that node, 'fn' is run again on detached copies of the inputs with the graph
+    enabled, the gradients of the outputs are backpropagated through this temporary graph (into the
+    parameters used by 'fn' and the input copies) and the graph is released at once.
+
+    Args:
+        fn (callable): The segment, mapping an array to an array. It must accept both float arrays
+            (under no_grad) and object arrays of Value objects, like Layer and Model do.
+        x: An array-like of Value objects (numbers are wrapped as constants).
+
+    Returns:
+        numpy.ndarray: Object array of Value objects, the outputs of 'fn'.
+    """
+
+    x = np.asarray(x, dtype=object)
+    prev = tuple(v if isinstance(v, Value) else Value(v, _const=LITERAL) for v in x.ravel().tolist())
+    segment = _Segment(fn, x.shape)
+
+    node = Value(_forward_segment(prev, segment), OP_SEGMENT, prev, _const=segment)
+
+    outputs = np.empty(segment.data.shape, dtype=object)
+    outputs.ravel()[:] = [ Value(d, OP_SEGMENT_OUTPUT, (node, ), _const=i) for i, d in enumerate(segment.data.ravel().tolist()) ]
+    return outputs
+
+
+
+# Backward rules, one per opcode: each one adds the gradient of 'out' to its operands
+
+def _backward_leaf(out):
+    pass
+
+def _released(out, *args):
+    raise RuntimeError(autograd.RELEASED_MESSAGE)
+
+def _backward_add(out):
+    a, b = out._prev
+    a.grad += out.grad
+    b.grad += out.grad
+
+def _backward_mul(out):
+    a, b = out._prev
+    a.grad += b.data * out.grad
+    b.grad += a.data * out.grad
+
+def _backward_pow(out):
+    a, = out._prev
+    a.grad += out._const * (a.data ** (out._const - 1)) * out.grad
+
+def _backward_relu(out):
+    a, = out._prev
+    a.grad += out.grad if a.data > 0 else 0
+
+def _backward_log(out):
+    a, = out._prev
+    a.grad += (1 / a.data) * out.grad
+
+def _backward_exp(out):
+    a, = out._prev
+    a.grad += out.data * out.grad
+
+def _backward_tanh(out):
+    a, = out._prev
+    a.grad += (1 - out.data ** 2) * out.grad
+
+def _backward_sigmoid(out):
+    a, = out._prev
+    a.grad += (1 - out.data) * out.data * out.grad
+
+# Derivative of each fused activation, expressed in terms of its output
+_ACTIVATION_GRAD = {
+    'tanh': lambda y: 1 - y ** 2,
+    'relu': lambda y: 1 if y > 0 else 0,
+    'sigmoid': lambda y: (1 - y) * y,
+}
+
+def _backward_affine(out):
+    activation, nin, xconst = out._const
+    prev = out._prev
+    grad = _ACTIVATION_GRAD[activation](out.data) * out.grad if activation in _ACTIVATION_GRAD else out.grad
+    if grad == 0:
+        return
+    prev[nin].grad += grad
+    if xconst is None:
+        for w, x in zip(prev[:nin], prev[nin + 1:]):
+            w.grad += x.data * grad
+            x.grad += w.data * grad
+    else:
+        for w, x in zip(prev, xconst):
+            w.grad += x * grad
+
+def _backward_reduce(out):
+    func, shape, args = out._const
+    _, grad = func(_reduce_input(out._prev, shape), *args)
+    for v, g in zip(out._prev, (grad * out.grad).ravel().tolist()):
+        v.grad += g
+
+def _backward_segment_output(out):
+    segment = out._prev[0]._const
+    segment.grad.flat[out._const] += out.grad
+
+def _backward_segment(out):
+    segment = out._const
+    if not segment.grad.any():
+        return
+
+    # Recompute the segment from detached copies of the inputs, with the graph enabled
+    leaves = np.empty(len(out._prev), dtype=object)
+    leaves[:] = [ Value(v.data) for v in out._prev ]
+    with autograd.enable_grad():
+        outputs = segment.fn(leaves.reshape(segment.shape))
+        root = reduction(outputs, _seed, segment.grad)
+
+    # Backpropagate the output gradients through the temporary graph, which is released on return
+    root.backward()
+    for v, leaf in zip(out._prev, leaves):
+        v.grad += leaf.grad
+    segment.grad = np.zeros_like(segment.grad)
+
+def _backward_neg(out):
+    a, = out._prev
+    a.grad -= out.grad
+
+def _backward_sub(out):
+    a, b = out._prev
+    a.grad += out.grad
+    b.grad -= out.grad
+
+def _backward_div(out):
+    a, b = out._prev
+    a.grad += out.grad / b.data
+    b.grad -= out.grad * a.data / b.data ** 2
+
+def _seed(x, grad):
+    return float(np.sum(x * grad)), grad
+
+_BACKWARD = (
+    _backward_leaf, _backward_add, _backward_mul, _backward_pow, _backward_relu,
+    _backward_log, _backward_exp, _backward_tanh, _backward_sigmoid, _backward_affine,
+    _backward_reduce, _backward_segment, _backward_segment_output, _backward_neg, _backward_sub,
+    _backward_div, _released,
+)
+
+
+# Forward rules, one per opcode: each one recomputes the data of a node from its operands
+# (used to replay a captured graph on new inputs)
+
+def _tanh(x):
+    return (math.exp(2*x) - 1)/(math.exp(2*x) + 1)
+
+# Fused activations over floats, matching the Value methods of the same name
+_ACTIVATION_FORWARD = {
+    'tanh': _tanh,
+    'relu': lambda z: z if z > 0 else 0,
+    'sigmoid': lambda z: 1 / (math.exp(-z) + 1),
+}
+
+def _reduce_input(a, shape):
+    return np.fromiter((v.data for v in a), dtype=np.float64, count=len(a)).reshape(shape)
+
+def _forward_reduce(a, k):
+    func, shape, args = k
+    return float(func(_reduce_input(a, shape), *args)[0])
+
+def _forward_segment(a, k):
+    with autograd.no_grad():
+        k.data = np.asarray(k.fn(_reduce_input(a, k.shape)), dtype=np.float64)
+    k.grad = np.zeros_like(k.data)
+    return 0.0
+
+def _forward_affine(a, k):
+    activation, nin, xconst = k
+    if xconst is None:
+        z = sum([ w.data * x.data for w, x in zip(a[:nin], a[nin + 1:]) ])
+    else:
+        z = sum([ w.data * x for w, x in zip(a, xconst) ])
+    z = z + a[nin].data
+    return _ACTIVATION_FORWARD[activation](z) if activation in _ACTIVATION_FORWARD else z
+
+_FORWARD = (
+    None,
+    lambda a, k: a[0].data + a[1].data,
+    lambda a, k: a[0].data * a[1].data,
+    lambda a, k: a[0].data ** k,
+    lambda a, k: a[0].data if a[0].data > 0 else 0,
+    lambda a, k: math.log(a[0].data),
+    lambda a, k: math.exp(a[0].data),
+    lambda a, k: _tanh(a[0].data),
+    lambda a, k: 1 / (math.exp(-a[0].data) + 1),
+    _forward_affine,
+    _forward_reduce,
+    _forward_segment,
+    lambda a, k: float(a[0]._const.data.flat[k]),
+    lambda a, k: -a[0].data,
+    lambda a, k: a[0].data - a[1].data,
+    lambda a, k: a[0].data / a[1].data,
+    _released,
+)
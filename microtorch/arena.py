@@ -0,0 +1,179 @@
+import gc
+import time
+
+import numpy as np
+
+from microtorch import autograd
+from microtorch.Value import OP_RELEASED
+
+
+class Arena :
+
+    """
+    Owner of the graph nodes created during a training step, with control of the cyclic garbage collector.
+
+    Every epoch of a training loop builds a new graph and drops it, which costs more than the
+    nodes themselves:
+      - CPython's cyclic garbage collector runs every time enough container objects have been
+        allocated, so building a graph of millions of Value nodes runs it hundreds of times, and
+        each run walks the nodes still alive (the older generations walk every live object).
+      - The backward closure of a Tensor refers to the Tensor itself, so the graph of a Tensor
+        step is a set of reference cycles that only the collector can free.
+      - The graph of a step stays alive through the loss until the next loss replaces it, so the
+        forward pass of the next step runs with two graphs in memory.
+
+    Each 'with arena:' block is one step. Inside it the collector is paused and every Value and
+    Tensor node created is owned by the arena. When the block exits, the arena cuts the links
+    between its nodes (operands, backward closures), so the whole graph is freed at once by
+    reference counting, before the collector is restored and with nothing left for it to find.
+    The freed memory goes back to Python's allocator, which hands the same blocks to the nodes of
+    the next step. Only the data of the nodes still referenced (e.g. the loss) survives.
+
+    An arena step owns the nodes created by the thread that entered it (nodes created meanwhile by
+    other threads, e.g. an inference worker, are left alone), but pausing the collector affects
+    the whole process.
+
+    Because the arena holds its nodes until the end of the step, nodes are not freed during the
+    step (backward(retain_graph=False) and gradient checkpointing save no memory within it), the
+    nodes of a step cannot be backpropagated through after the step, and a StaticGraph should not
+    be captured inside a step.
+
+    Example:
+        arena = Arena()
+        for epoch in range(epochs):
+            with arena:
+                loss = Loss.MSELoss(ys, n(xs))
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+        print(arena.stats())
+
+    Attributes:
+        pause_gc (bool): Whether the cyclic garbage collector is paused during a step.
+        steps (list): Metrics of every step: time, nodes allocated (Value and Tensor), time to
+            release them, and the number and duration of the garbage collections during the step.
+        values (list): The Value nodes created in the current step.
+        tensors (list): The Tensor nodes created in the current step.
+    """
+
+    def __init__(self, pause_gc=True):
+
+        """
+        Initialize an Arena.
+
+        Args:
+            pause_gc (bool): Whether to pause the cyclic garbage collector during each step. Default is True.
+        """
+
+        self.pause_gc = pause_gc
+        self.steps = []
+        self.values = []
+        self.tensors = []
+
+        self._collections = []
+        self._gc_start = None
+
+
+    def _on_gc(self, phase, info):
+
+        """
+        Garbage collector callback: time every collection that runs during a step.
+        """
+
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            self._collections.append(time.perf_counter() - self._gc_start)
+            self._gc_start = None
+
+
+    def __enter__(self):
+        if autograd._state.arena is not None:
+            raise RuntimeError("an Arena step is already active")
+
+        self._collections = []
+        gc.callbacks.append(self._on_gc)
+
+        self._gc_was_enabled = gc.isenabled()
+        if self.pause_gc:
+            gc.disable()
+
+        autograd._state.arena = self
+        self._start = time.perf_counter()
+        return self
+
+
+    def __exit__(self, *exc):
+        autograd._state.arena = None
+        elapsed = time.perf_counter() - self._start
+        values, tensors = len(self.values), len(self.tensors)
+
+        self.release()
+        released = time.perf_counter() - self._start - elapsed
+
+        if self._gc_was_enabled:
+            gc.enable()
+        gc.callbacks.remove(self._on_gc)
+
+        self.steps.append({
+            'time_ms': elapsed * 1e3,
+            'release_ms': released * 1e3,
+            'nodes': values + tensors,
+            'values': values,
+            'tensors': tensors,
+            'gc_collections': len(self._collections),
+            'gc_pause_ms': sum(self._collections) * 1e3,
+            'max_gc_pause_ms': max(self._collections, default=0.0) * 1e3,
+        })
+        return False
+
+
+    def release(self):
+
+        """
+        Detach every node owned by the arena from the graph and drop the arena's references to them.
+
+        Nodes referenced from elsewhere (e.g. the loss) keep their data and gradient, but a backward
+        pass through them raises a RuntimeError; the leaves created in the step stay usable.
+        """
+
+        for v in self.values:
+            if v._prev:
+                v._prev = ()
+                v._op = OP_RELEASED
+                v._const = None
+        for t in self.tensors:
+            if t._prev:
+                t._backward = autograd._released
+                t._prev = set()
+
+        # Dropping the lists frees the graph by reference counting
+        self.values = []
+        self.tensors = []
+
+
+    def stats(self):
+
+        """
+        Summarize the recorded steps.
+
+        Returns:
+            dict: Number of steps, mean step and release time, mean nodes allocated per step, and
+            the total number of garbage collections, the total GC pause, the mean GC pause per
+            step and the longest single collection.
+        """
+
+        if not self.steps:
+            return { 'steps': 0 }
+
+        pauses = np.array([ s['gc_pause_ms'] for s in self.steps ])
+        return {
+            'steps': len(self.steps),
+            'mean_time_ms': float(np.mean([ s['time_ms'] for s in self.steps ])),
+            'mean_release_ms': float(np.mean([ s['release_ms'] for s in self.steps ])),
+            'nodes_per_step': float(np.mean([ s['nodes'] for s in self.steps ])),
+            'gc_collections': int(sum(s['gc_collections'] for s in self.steps)),
+            'gc_pause_ms': float(pauses.sum()),
+            'gc_pause_per_step_ms': float(pauses.mean()),
+            'max_gc_pause_ms': float(max(s['max_gc_pause_ms'] for s in self.steps)),
+        }
@@ -0,0 +1,196 @@
+"""
+Global state shared by the autograd engine.
+"""
+
+import threading
+
+import numpy as np
+
+
+class _State(threading.local) :
+
+    """
+    Per-thread state of the autograd engine.
+
+    Every thread starts with graph construction enabled, no capture and no arena step in progress,
+    so a no_grad block, a graph capture or an arena step on one thread (e.g. an inference worker)
+    never affects the others.
+
+    Attributes:
+        grad_enabled (bool): Whether operations record the computational graph (switched off by no_grad).
+        tape (list): The tape that new Value nodes are appended to while a graph is being captured
+            (None otherwise). Each entry is a (node, operands) pair, so the tape is already in
+            topological order.
+        arena (Arena): The arena of the training step in progress (None otherwise); new Value and
+            Tensor nodes are appended to it, and it releases them all when the step ends.
+    """
+
+    grad_enabled = True
+    tape = None
+    arena = None
+
+
+_state = _State()
+
+
+def is_grad_enabled():
+
+    """
+    Return True if operations currently record the computational graph in the calling thread.
+    """
+
+    return _state.grad_enabled
+
+
+class no_grad :
+
+    """
+    Context manager that disables graph construction in the calling thread.
+
+    Inside the block, Value and Tensor operations return plain results without operands or backward
+    functions, and nn layers compute directly on the underlying float data, so nothing is kept
+    alive for a backward pass that will never happen.
+
+    Example:
+        with no_grad():
+            y_pred = model(xs)
+    """
+
+    def __enter__(self):
+        self._previous = _state.grad_enabled
+        _state.grad_enabled = False
+        return self
+
+    def __exit__(self, *exc):
+        _state.grad_enabled = self._previous
+        return False
+
+
+class enable_grad :
+
+    """
+    Context manager that enables graph construction in the calling thread, e.g. inside a no_grad block.
+    """
+
+    def __enter__(self):
+        self._previous = _state.grad_enabled
+        _state.grad_enabled = True
+        return self
+
+    def __exit__(self, *exc):
+        _state.grad_enabled = self._previous
+        return False
+
+
+class outside_graph :
+
+    """
+    Context manager for creating nodes that do not belong to the graph being built.
+
+    Inside the block, in the calling thread, graph construction is enabled (so Tensors get a
+    gradient array), and new nodes are neither recorded by a graph capture nor owned by an arena
+    step. Layers use it to create their parameters lazily during their first forward pass, so the
+    parameters are ordinary leaves wherever that pass runs (under no_grad, while capturing, ...).
+    """
+
+    def __enter__(self):
+        self._previous = (_state.grad_enabled, _state.tape, _state.arena)
+        _state.grad_enabled, _state.tape, _state.arena = True, None, None
+        return self
+
+    def __exit__(self, *exc):
+        _state.grad_enabled, _state.tape, _state.arena = self._previous
+        return False
+
+
+# Error raised when backpropagating through a node that has been released
+RELEASED_MESSAGE = ("the graph has already been freed (it was backpropagated with retain_graph=False or released "
+                    "by an arena step); pass retain_graph=True to backward through it again")
+
+
+def _released():
+
+    """
+    Backward function of the Tensor nodes whose graph has been released.
+    """
+
+    raise RuntimeError(RELEASED_MESSAGE)
+
+
+def topological_sort(root):
+
+    """
+    Order the nodes of a computational graph so that every node comes after its operands.
+
+    The graph is walked with an explicit stack instead of recursion, so the depth of the
+    graph is only bounded by memory and not by Python's recursion limit.
+
+    Args:
+        root: The output node (a Value or Tensor) the graph is walked from.
+
+    Returns:
+        list: The nodes reachable from 'root' in topological order, ending with 'root'.
+    """
+
+    topo = []
+    visited = {root}
+
+    # Each stack entry is a node and an iterator over the operands still to visit
+    stack = [(root, iter(root._prev))]
+    while stack:
+        node, operands = stack[-1]
+        for child in operands:
+            if child not in visited:
+                visited.add(child)
+                stack.append((child, iter(child._prev)))
+                break
+        else:
+            # Every operand has been emitted, so the node itself can follow
+            stack.pop()
+            topo.append(node)
+
+    return topo
+
+
+def allocate_grads(topo):
+
+    """
+    Give a zero gradient to the Tensor nodes of a graph that have none: the leaves created while
+    graph construction was disabled (e.g. parameters built under no_grad) and later used in a graph.
+    """
+
+    for v in topo:
+        if v.grad is None:
+            v.grad = np.zeros(v.data.shape, dtype=v.data.dtype)
+
+
+def backpropagate(topo, retain_graph=True):
+
+    """
+    Run the backward function of every node in reverse topological order.
+
+    Args:
+        topo (list): The nodes in topological order, as returned by topological_sort.
+            The list is consumed when 'retain_graph' is False.
+        retain_graph (bool): If False, drop each node's operands and backward closure as soon
+            as its gradient has been propagated, so intermediate nodes can be freed during the
+            sweep instead of after it. The graph cannot be backpropagated through again: a
+            later backward reaching a released node raises a RuntimeError.
+    """
+
+    allocate_grads(topo)
+
+    if retain_graph:
+        for v in reversed(topo):
+            v._backward()
+        return
+
+    # Pop the nodes off the order so that nothing but the graph itself keeps them alive
+    while topo:
+        v = topo.pop()
+        v._backward()
+        if v._prev:
+            # Mark the node released, so that a later backward through it fails instead of
+            # silently stopping there (leaves, e.g. parameters, stay usable)
+            v._backward = _released
+            v._prev = ()
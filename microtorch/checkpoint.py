@@ -0,0 +1,187 @@
+import json
+import struct
+
+import numpy as np
+
+from microtorch import nn
+from microtorch.Tensor import Tensor
+
+# File layout: magic, format version, manifest length, JSON manifest, zero padding up to a
+# multiple of _ALIGNMENT bytes, then every parameter as one flat little-endian float64 array.
+_MAGIC = b'MTORCHCK'
+_VERSION = 1
+_HEADER = struct.Struct('<8sIQ')
+_ALIGNMENT = 64
+
+
+def _layer_arrays(layer):
+
+    """
+    Return the parameter arrays of a layer, in the order they are stored.
+
+    Args:
+        layer (Layer): A layer holding a weight matrix 'w' and a bias vector 'b'.
+
+    Returns:
+        list: (name, array) pairs, where the array is a Tensor or an object array of Value objects.
+    """
+
+    return [ ('w', layer.w), ('b', layer.b) ]
+
+
+def _layer_config(layer):
+
+    """
+    Return the constructor arguments needed to rebuild a layer.
+    """
+
+    if not isinstance(layer, nn.Layer):
+        raise TypeError(f"cannot checkpoint a layer of type {type(layer).__name__}")
+    if not hasattr(layer, 'w'):
+        raise RuntimeError("cannot checkpoint a lazily initialized layer before its first forward pass")
+
+    nin, nout = np.shape(layer.w)
+    return {
+        'type': 'Layer',
+        'nin': int(nin),
+        'nout': int(nout),
+        'activation': layer.activation,
+        'tensor': bool(layer.tensor),
+        'fused': bool(layer.fused),
+    }
+
+
+def save(model, path):
+
+    """
+    Save the parameters of a model to a checkpoint file.
+
+    The file holds a small JSON manifest describing the layers and the offset and shape of every
+    parameter array, followed by all the parameters as one flat float64 array. No Value or Tensor
+    object is pickled.
+
+    Args:
+        model (Model): The model to save; its 'layers' must be Layer objects.
+        path (str): Path of the checkpoint file.
+    """
+
+    layers = []
+    arrays = []
+    offset = 0
+    for layer in model.layers:
+        config = _layer_config(layer)
+        config['parameters'] = []
+        for name, array in _layer_arrays(layer):
+            data = nn._data(array)
+            config['parameters'].append({ 'name': name, 'offset': offset, 'shape': list(data.shape) })
+            arrays.append(data.ravel())
+            offset += data.size
+        layers.append(config)
+
+    manifest = json.dumps({ 'dtype': '<f8', 'size': offset, 'layers': layers }).encode('utf-8')
+
+    # Pad the header so the parameter data starts on an aligned boundary
+    header_size = _HEADER.size + len(manifest)
+    padding = -header_size % _ALIGNMENT
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, len(manifest)))
+        f.write(manifest)
+        f.write(b'\0' * padding)
+        for data in arrays:
+            data.astype('<f8', copy=False).tofile(f)
+
+
+def _read_manifest(path):
+
+    """
+    Read the manifest of a checkpoint file.
+
+    Returns:
+        tuple: The manifest (dict) and the byte offset of the parameter data.
+    """
+
+    with open(path, 'rb') as f:
+        magic, version, length = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a microtorch checkpoint")
+        if version != _VERSION:
+            raise ValueError(f"unsupported checkpoint version {version}")
+        manifest = json.loads(f.read(length).decode('utf-8'))
+
+    header_size = _HEADER.size + length
+    return manifest, header_size + (-header_size % _ALIGNMENT)
+
+
+def load(path, model=None, mmap_mode='r'):
+
+    """
+    Load a checkpoint file.
+
+    With mmap_mode set, the parameter data is memory-mapped instead of read: Tensor parameters
+    become views of the file, so a large model is ready to serve at once and its pages are only
+    read from disk when they are first used. Value parameters are always copied into their floats.
+    Tensor parameters loaded with mmap_mode='r' are read-only until an optimizer registers them
+    (it copies them into its own buffer); use mmap_mode='c' for writable copy-on-write views.
+
+    Loading into a model whose optimizer already exists is safe: parameters registered with an
+    optimizer are overwritten in place (without zero-copy), and the optimizer reads the loaded
+    values of its Value parameters at its next step. The optimizer state (momentum, moments) is
+    not part of the checkpoint and is kept.
+
+    Args:
+        path (str): Path of the checkpoint file.
+        model (Model): A model with the same layers to load the parameters into. If None, a
+            Sequential model is rebuilt from the manifest, with layers built around the stored
+            arrays (no parameter is sampled first).
+        mmap_mode (str): 'r' or 'c' to memory-map the parameters (see numpy.memmap), or None to
+            read them into memory.
+
+    Returns:
+        Model: The model holding the loaded parameters.
+    """
+
+    manifest, offset = _read_manifest(path)
+    size = manifest['size']
+
+    if mmap_mode:
+        data = np.memmap(path, dtype=manifest['dtype'], mode=mmap_mode, offset=offset, shape=(size, )) if size else np.zeros(0)
+    else:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = np.fromfile(f, dtype=manifest['dtype'], count=size)
+
+    def stored(record):
+        shape = tuple(record['shape'])
+        return data[record['offset']:record['offset'] + int(np.prod(shape))].reshape(shape)
+
+    if model is None:
+        # Build the layers around the stored arrays directly, without initializing them first
+        layers = []
+        for c in manifest['layers']:
+            arrays = { record['name']: stored(record) for record in c['parameters'] }
+            layers.append(nn.Layer.from_parameters(arrays['w'], arrays['b'], activation=c['activation'], tensor=c['tensor'], fused=c['fused']))
+        return nn.Sequential(*layers)
+
+    if len(model.layers) != len(manifest['layers']):
+        raise ValueError(f"the checkpoint has {len(manifest['layers'])} layers, the model has {len(model.layers)}")
+
+    for layer, config in zip(model.layers, manifest['layers']):
+        for (name, array), record in zip(_layer_arrays(layer), config['parameters']):
+            shape = tuple(record['shape'])
+            if np.shape(array) != shape:
+                raise ValueError(f"parameter '{name}' has shape {np.shape(array)}, the checkpoint has {shape}")
+
+            values = stored(record)
+            if isinstance(array, Tensor) and getattr(array, '_buffer', None) is not None and array._buffer() is not None:
+                # Registered with an optimizer: write into the arrays that its buffer updates
+                array.data[...] = values
+            elif isinstance(array, Tensor):
+                # Zero-copy: the tensor reads straight from the (memory-mapped) buffer, unless it
+                # is stored in another precision than float64
+                array.data = values if array.data.dtype == values.dtype else values.astype(array.data.dtype)
+            else:
+                for v, d in zip(array.flat, values.ravel().tolist()):
+                    v.data = d
+
+    return model
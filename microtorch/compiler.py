@@ -0,0 +1,502 @@
+import builtins
+import hashlib
+import inspect
+import json
+import marshal
+import math
+import os
+import sys
+import tempfile
+import types
+
+import numpy as np
+
+from microtorch import autograd, Loss
+from microtorch.Value import Value
+from microtorch.Value import (OP_ADD, OP_MUL, OP_POW, OP_RELU, OP_LOG, OP_EXP, OP_TANH, OP_SIGMOID,
+                              OP_AFFINE, OP_NEG, OP_SUB, OP_DIV, OP_NAMES)
+
+# Bumped whenever the generated code changes, so stale cache entries are not loaded
+_CODEGEN_VERSION = 1
+
+# Directory of the generated modules (overridden by the MICROTORCH_CACHE environment variable)
+_DEFAULT_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'microtorch', 'compiled')
+
+
+def _literal(v):
+
+    """
+    Return Python source reproducing the number 'v' exactly.
+    """
+
+    if isinstance(v, float) and not math.isfinite(v):
+        return f"float('{v}')"
+    return repr(v)
+
+
+# Source of each activation, matching Value.tanh, Value.relu, Value.sigmoid and their fused versions
+_ACTIVATION_SOURCE = {
+    'tanh': lambda z: f"(_exp(2*{z}) - 1)/(_exp(2*{z}) + 1)",
+    'relu': lambda z: f"{z} if {z} > 0 else 0",
+    'sigmoid': lambda z: f"1 / (_exp(-{z}) + 1)",
+}
+
+# Source of the derivative of each activation, in terms of its output
+_ACTIVATION_GRAD_SOURCE = {
+    'tanh': lambda y: f"(1 - {y} ** 2)",
+    'relu': lambda y: f"(1 if {y} > 0 else 0)",
+    'sigmoid': lambda y: f"((1 - {y}) * {y})",
+}
+
+
+class _CodeGenerator :
+
+    """
+    Emit straight-line Python source for the forward and backward passes of a traced graph.
+
+    Every node becomes one local variable and one assignment, in topological order, and its
+    gradient rule becomes a few assignments, in reverse topological order. The expressions are the
+    ones Value evaluates, in the same order, so the results are identical to Value.backward.
+    """
+
+    def __init__(self, topo, inputs, parameters):
+        self.topo = topo
+        self.names = {}
+        self.kinds = {}
+
+        for i, v in enumerate(inputs):
+            self.names[v] = f"x{i}"
+            self.kinds[v] = 'input'
+        for j, v in enumerate(parameters):
+            self.names[v] = f"p{j}"
+            self.kinds[v] = 'parameter'
+
+        k = 0
+        for v in topo:
+            if v in self.names:
+                continue
+            if not v._prev:
+                # A leaf created while tracing, e.g. a wrapped number
+                self.names[v] = _literal(v.data)
+                self.kinds[v] = 'constant'
+            else:
+                self.names[v] = f"v{k}"
+                self.kinds[v] = 'node'
+                k += 1
+
+        # Names of the gradients that have been assigned so far
+        self._assigned = set()
+
+
+    def forward(self):
+
+        """
+        Return the lines computing every node.
+        """
+
+        lines = []
+        for v in self.topo:
+            if self.kinds[v] != 'node':
+                continue
+            lines.append(f"{self.names[v]} = {self._expression(v)}")
+        return lines
+
+
+    def _expression(self, v):
+        op = v._op
+        a = [ self.names[u] for u in v._prev ]
+
+        if op == OP_ADD:
+            return f"{a[0]} + {a[1]}"
+        if op == OP_MUL:
+            return f"{a[0]} * {a[1]}"
+        if op == OP_POW:
+            return f"{a[0]} ** {_literal(v._const)}"
+        if op == OP_RELU:
+            return f"{a[0]} if {a[0]} > 0 else 0"
+        if op == OP_LOG:
+            return f"_log({a[0]})"
+        if op == OP_EXP:
+            return f"_exp({a[0]})"
+        if op == OP_TANH:
+            return _ACTIVATION_SOURCE['tanh'](a[0])
+        if op == OP_SIGMOID:
+            return _ACTIVATION_SOURCE['sigmoid'](a[0])
+        if op == OP_NEG:
+            return f"-{a[0]}"
+        if op == OP_SUB:
+            return f"{a[0]} - {a[1]}"
+        if op == OP_DIV:
+            return f"{a[0]} / {a[1]}"
+        if op == OP_AFFINE:
+            activation, nin, xconst = v._const
+            w, b = a[:nin], a[nin]
+            x = a[nin + 1:] if xconst is None else [ _literal(c) for c in xconst ]
+            z = f"({' + '.join(f'{wi} * {xi}' for wi, xi in zip(w, x)) or '0'}) + {b}"
+            if activation not in _ACTIVATION_SOURCE:
+                return z
+            return f"_{activation}({z})"
+
+        raise NotImplementedError(f"cannot compile the operation '{OP_NAMES[op]}'")
+
+
+    def _grad(self, v):
+
+        """
+        Return the name of the gradient variable of 'v', or None if 'v' needs no gradient.
+        """
+
+        kind = self.kinds[v]
+        if kind == 'node':
+            return 'g' + self.names[v][1:]
+        if kind == 'parameter':
+            return 'q' + self.names[v][1:]
+        return None
+
+
+    def _accumulate(self, lines, v, expression, sign='+'):
+
+        """
+        Emit 'grad(v) += expression' (or -=), as a plain assignment for the first contribution.
+        """
+
+        g = self._grad(v)
+        if g is None:
+            return
+        if g in self._assigned:
+            lines.append(f"{g} {sign}= {expression}")
+        else:
+            lines.append(f"{g} = {expression}" if sign == '+' else f"{g} = -({expression})")
+            self._assigned.add(g)
+
+
+    def backward(self, outputs):
+
+        """
+        Return the lines propagating the gradients seeded on 'outputs' down to the parameters.
+        """
+
+        lines = []
+        for i, v in enumerate(outputs):
+            self._accumulate(lines, v, f"seed[{i}]")
+
+        for v in reversed(self.topo):
+            if self.kinds[v] != 'node':
+                continue
+            g = self._grad(v)
+            if g not in self._assigned:
+                # No gradient reached this node
+                continue
+
+            op, prev, out = v._op, v._prev, self.names[v]
+            a = [ self.names[u] for u in prev ]
+
+            if op == OP_ADD:
+                self._accumulate(lines, prev[0], g)
+                self._accumulate(lines, prev[1], g)
+            elif op == OP_MUL:
+                self._accumulate(lines, prev[0], f"{a[1]} * {g}")
+                self._accumulate(lines, prev[1], f"{a[0]} * {g}")
+            elif op == OP_POW:
+                k = v._const
+                self._accumulate(lines, prev[0], f"{_literal(k)} * ({a[0]} ** {_literal(k - 1)}) * {g}")
+            elif op == OP_RELU:
+                self._accumulate(lines, prev[0], f"({g} if {a[0]} > 0 else 0)")
+            elif op == OP_LOG:
+                self._accumulate(lines, prev[0], f"(1 / {a[0]}) * {g}")
+            elif op == OP_EXP:
+                self._accumulate(lines, prev[0], f"{out} * {g}")
+            elif op == OP_TANH:
+                self._accumulate(lines, prev[0], f"(1 - {out} ** 2) * {g}")
+            elif op == OP_SIGMOID:
+                self._accumulate(lines, prev[0], f"(1 - {out}) * {out} * {g}")
+            elif op == OP_NEG:
+                self._accumulate(lines, prev[0], g, sign='-')
+            elif op == OP_SUB:
+                self._accumulate(lines, prev[0], g)
+                self._accumulate(lines, prev[1], g, sign='-')
+            elif op == OP_DIV:
+                self._accumulate(lines, prev[0], f"{g} / {a[1]}")
+                self._accumulate(lines, prev[1], f"{g} * {a[0]} / {a[1]} ** 2", sign='-')
+            elif op == OP_AFFINE:
+                activation, nin, xconst = v._const
+                if activation in _ACTIVATION_GRAD_SOURCE:
+                    lines.append(f"t = {_ACTIVATION_GRAD_SOURCE[activation](out)} * {g}")
+                else:
+                    lines.append(f"t = {g}")
+                self._accumulate(lines, prev[nin], 't')
+                if xconst is None:
+                    for w, x in zip(prev[:nin], prev[nin + 1:]):
+                        self._accumulate(lines, w, f"{self.names[x]} * t")
+                        self._accumulate(lines, x, f"{self.names[w]} * t")
+                else:
+                    for w, c in zip(prev, xconst):
+                        self._accumulate(lines, w, f"{_literal(c)} * t")
+            else:
+                raise NotImplementedError(f"cannot compile the gradient of '{OP_NAMES[op]}'")
+
+        return lines
+
+
+def _structure_key(model, input_shape):
+
+    """
+    Hash the structure of a model: its class and forward source, its layers and the input shape.
+    """
+
+    try:
+        source = inspect.getsource(type(model).forward)
+    except (OSError, TypeError):
+        source = type(model).__qualname__
+
+    layers = []
+    for layer in model.layers:
+        layers.append({
+            'type': type(layer).__name__,
+            'shape': list(np.shape(layer.w)) if hasattr(layer, 'w') else None,
+            'activation': getattr(layer, 'activation', None),
+            'fused': getattr(layer, 'fused', None),
+            'tensor': getattr(layer, 'tensor', None),
+        })
+
+    description = json.dumps({
+        'version': _CODEGEN_VERSION,
+        'model': type(model).__qualname__,
+        'forward': source,
+        'layers': layers,
+        'input_shape': list(input_shape),
+    }, sort_keys=True)
+    return hashlib.sha256(description.encode('utf-8')).hexdigest()[:24]
+
+
+def _generate(model, example_input):
+
+    """
+    Trace the model on Value leaves and return the source of the generated module.
+    """
+
+    x = np.asarray(example_input, dtype=np.float64)
+    leaves = np.empty(x.size, dtype=object)
+    leaves[:] = [ Value(v) for v in x.ravel().tolist() ]
+    parameters = list(model.parameters())
+
+    with autograd.enable_grad():
+        outs = np.asarray(model(leaves.reshape(x.shape)), dtype=object)
+        outputs = list(outs.ravel())
+
+        # Visit the graph from the outputs in order, as the backward pass of a loss over them does
+        root = Value(0.0, _prev=tuple(outputs))
+    topo = autograd.topological_sort(root)[:-1]
+
+    generator = _CodeGenerator(topo, list(leaves), parameters)
+    forward = generator.forward()
+    backward = generator.backward(outputs)
+
+    inputs = ', '.join(generator.names[v] for v in leaves) + ','
+    params = ', '.join(generator.names[v] for v in parameters) + ','
+    results = '[' + ', '.join(generator.names[v] for v in outputs) + ']'
+    grads = '[' + ', '.join((g if g in generator._assigned else '0.0') for g in (f"q{j}" for j in range(len(parameters)))) + ']'
+
+    def body(lines):
+        return '\n'.join('    ' + line for line in lines)
+
+    return f'''"""
+Generated by microtorch.compiler for {type(model).__qualname__}. Do not edit.
+"""
+
+from math import exp as _exp, log as _log
+
+INPUT_SHAPE = {tuple(x.shape)!r}
+OUTPUT_SHAPE = {tuple(outs.shape)!r}
+NUM_PARAMETERS = {len(parameters)}
+
+
+def _tanh(z):
+    return {_ACTIVATION_SOURCE['tanh']('z')}
+
+def _relu(z):
+    return {_ACTIVATION_SOURCE['relu']('z')}
+
+def _sigmoid(z):
+    return {_ACTIVATION_SOURCE['sigmoid']('z')}
+
+
+def forward(x, p):
+    {inputs} = x
+    {params} = p
+{body(forward)}
+    return {results}
+
+
+def forward_backward(x, p, loss):
+    {inputs} = x
+    {params} = p
+{body(forward)}
+    value, seed = loss({results})
+{body(backward)}
+    return value, {grads}
+'''
+
+
+def _write(path, data, mode='w'):
+
+    """
+    Write a cache file atomically, so concurrent runs never read a partial file.
+    """
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, mode) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _load(path, name, generate):
+
+    """
+    Load a generated module, generating its source and bytecode first if they are not cached.
+
+    The bytecode is cached next to the source, per interpreter version, as compiling the long
+    generated functions takes far longer than running them and Python's own bytecode cache may
+    be disabled (PYTHONDONTWRITEBYTECODE).
+
+    Returns:
+        tuple: The module and whether its source was already cached.
+    """
+
+    bytecode = f"{path[:-3]}.{sys.implementation.cache_tag}.bin"
+    cached = os.path.exists(path)
+
+    if cached and os.path.exists(bytecode):
+        with open(bytecode, 'rb') as f:
+            code = marshal.load(f)
+    else:
+        if cached:
+            with open(path) as f:
+                source = f.read()
+        else:
+            source = generate()
+            _write(path, source)
+        code = builtins.compile(source, path, 'exec')
+        _write(bytecode, marshal.dumps(code), 'wb')
+
+    module = types.ModuleType(name)
+    module.__file__ = path
+    exec(code, module.__dict__)
+    return module, cached
+
+
+class CompiledModel :
+
+    """
+    A Model compiled into generated straight-line Python code for a fixed input shape.
+
+    Calling it runs the forward pass, the loss and the backward pass without creating a single
+    Value node, and adds the gradients to the parameters of the model, so it drops into a training
+    loop in place of 'loss = loss_fn(ys, model(xs)); loss.backward()'.
+
+    Example:
+        step = compile(n, xs)
+        for epoch in range(epochs):
+            optimizer.zero_grad()
+            loss = step(xs, ys)
+            optimizer.step()
+    """
+
+    def __init__(self, model, module, loss, path, cached):
+        self.model = model
+        self.module = module
+        self.loss = loss
+        self.path = path
+        self.cached = cached
+        self.parameters = list(model.parameters())
+
+        if len(self.parameters) != module.NUM_PARAMETERS:
+            raise ValueError(f"the compiled module expects {module.NUM_PARAMETERS} parameters, the model has {len(self.parameters)}")
+
+
+    def _inputs(self, xs):
+        xs = np.asarray(xs, dtype=np.float64)
+        if xs.shape != self.module.INPUT_SHAPE:
+            raise ValueError(f"the model was compiled for inputs of shape {self.module.INPUT_SHAPE}, got {xs.shape}")
+        return xs.ravel().tolist(), [ p.data for p in self.parameters ]
+
+
+    def forward(self, xs):
+
+        """
+        Compute the outputs of the model.
+
+        Args:
+            xs (numpy.ndarray): Inputs of the compiled shape.
+
+        Returns:
+            numpy.ndarray: The outputs, shaped like those of the model.
+        """
+
+        x, p = self._inputs(xs)
+        return np.array(self.module.forward(x, p)).reshape(self.module.OUTPUT_SHAPE)
+
+
+    def __call__(self, xs, ys):
+
+        """
+        Run forward, loss and backward, and add the gradients to the parameters.
+
+        Args:
+            xs (numpy.ndarray): Inputs of the compiled shape.
+            ys (numpy.ndarray): Targets of the loss.
+
+        Returns:
+            float: The loss.
+        """
+
+        def loss(outputs):
+            # The loss is a single fused node over leaves holding the outputs
+            leaves = np.empty(len(outputs), dtype=object)
+            leaves[:] = [ Value(o) for o in outputs ]
+            value = self.loss(ys, leaves.reshape(self.module.OUTPUT_SHAPE))
+            value.backward()
+            return value.data, [ v.grad for v in leaves ]
+
+        x, p = self._inputs(xs)
+        value, grads = self.module.forward_backward(x, p, loss)
+
+        for v, g in zip(self.parameters, grads):
+            v.grad += g
+        return value
+
+
+def compile(model, example_input, loss=Loss.MSELoss, cache_dir=None):
+
+    """
+    Compile a Model and a loss into generated straight-line Python code.
+
+    The model is traced once on 'example_input'; every node of the graph becomes one line of a
+    generated module with a forward function and a forward + backward function. The module is
+    cached on disk under a key derived from the model structure (class, forward source, layers)
+    and the input shape, so later runs load it without tracing or generating anything. Gradients
+    are identical to those of Value.backward.
+
+    Args:
+        model (Model): A model of scalar Value layers.
+        example_input (numpy.ndarray): An input batch; the compiled code only accepts this shape.
+        loss (callable): A loss with the signature loss(y_true, y_pred), e.g. Loss.MSELoss.
+        cache_dir (str): Directory of the generated modules (default is $MICROTORCH_CACHE or
+            ~/.cache/microtorch/compiled).
+
+    Returns:
+        CompiledModel: The compiled model.
+    """
+
+    if any(getattr(layer, 'tensor', False) for layer in model.layers):
+        raise TypeError("only models of scalar Value layers can be compiled")
+
+    cache_dir = cache_dir or os.environ.get('MICROTORCH_CACHE', _DEFAULT_CACHE)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    key = _structure_key(model, np.shape(example_input))
+    name = f"microtorch_compiled_{key}"
+    path = os.path.join(cache_dir, name + '.py')
+
+    module, cached = _load(path, name, lambda: _generate(model, example_input))
+    return CompiledModel(model, module, loss, path, cached)
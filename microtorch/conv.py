@@ -0,0 +1,262 @@
+import numpy as np
+
+from microtorch import autograd
+from microtorch.Tensor import Tensor
+
+
+def _pair(v):
+
+    """
+    Return a (height, width) pair from an int or a pair.
+    """
+
+    return (v, v) if isinstance(v, int) else tuple(v)
+
+
+def _output_size(size, kernel, stride, padding, dilation):
+    return (size + 2 * padding - dilation * (kernel - 1) - 1) // stride + 1
+
+
+def im2col(x, kernel, stride=1, padding=0, dilation=1, pad_value=0.0):
+
+    """
+    Unfold the sliding windows of a batch of images into columns.
+
+    Column l of sample n holds the C * kh * kw input elements under the l-th window position, so a
+    convolution becomes one matrix product between the flattened kernels and the columns. The
+    columns are gathered with one strided slice copy per kernel offset (kh * kw copies in total).
+
+    Args:
+        x (numpy.ndarray): Images of shape (N, C, H, W).
+        kernel: Kernel size, an int or a (kh, kw) pair; likewise stride, padding and dilation.
+        pad_value (float): Value of the padding (e.g. -inf for max pooling).
+
+    Returns:
+        tuple: The columns, of shape (N, C * kh * kw, OH * OW), and the output size (OH, OW).
+    """
+
+    (kh, kw), (sh, sw), (ph, pw), (dh, dw) = _pair(kernel), _pair(stride), _pair(padding), _pair(dilation)
+    n, c, h, w = x.shape
+    oh = _output_size(h, kh, sh, ph, dh)
+    ow = _output_size(w, kw, sw, pw, dw)
+    if oh <= 0 or ow <= 0:
+        raise ValueError(f"the kernel ({kh}, {kw}) does not fit in the padded input ({h + 2 * ph}, {w + 2 * pw})")
+
+    if ph or pw:
+        x = np.pad(x, ((0, 0), (0, 0), (ph, ph), (pw, pw)), constant_values=pad_value)
+
+    cols = np.empty((n, c, kh, kw, oh, ow), dtype=x.dtype)
+    for i in range(kh):
+        top = i * dh
+        for j in range(kw):
+            left = j * dw
+            cols[:, :, i, j] = x[:, :, top:top + sh * oh:sh, left:left + sw * ow:sw]
+
+    return cols.reshape(n, c * kh * kw, oh * ow), (oh, ow)
+
+
+def col2im(cols, shape, kernel, stride=1, padding=0, dilation=1):
+
+    """
+    Fold columns back into images, summing the elements that overlapping windows share.
+
+    This is the adjoint of im2col: it maps the gradient of the columns to the gradient of the images.
+
+    Args:
+        cols (numpy.ndarray): Columns of shape (N, C * kh * kw, OH * OW).
+        shape (tuple): Shape (N, C, H, W) of the images.
+        kernel: Kernel size, an int or a (kh, kw) pair; likewise stride, padding and dilation.
+
+    Returns:
+        numpy.ndarray: The images, of shape 'shape'.
+    """
+
+    (kh, kw), (sh, sw), (ph, pw), (dh, dw) = _pair(kernel), _pair(stride), _pair(padding), _pair(dilation)
+    n, c, h, w = shape
+    oh = _output_size(h, kh, sh, ph, dh)
+    ow = _output_size(w, kw, sw, pw, dw)
+
+    cols = cols.reshape(n, c, kh, kw, oh, ow)
+    x = np.zeros((n, c, h + 2 * ph, w + 2 * pw), dtype=cols.dtype)
+    for i in range(kh):
+        top = i * dh
+        for j in range(kw):
+            left = j * dw
+            x[:, :, top:top + sh * oh:sh, left:left + sw * ow:sw] += cols[:, :, i, j]
+
+    return x[:, :, ph:ph + h, pw:pw + w]
+
+
+def _data(x):
+    if isinstance(x, Tensor):
+        return x.data
+    x = np.asarray(x)
+    return x if x.dtype.kind == 'f' else x.astype(np.float64)
+
+
+def _tracked(*operands):
+
+    """
+    Return True if the operation must build a graph node (some operand is a Tensor and the graph is enabled).
+    """
+
+    return autograd._state.grad_enabled and any(isinstance(t, Tensor) for t in operands)
+
+
+def conv2d(x, w, b=None, stride=1, padding=0, dilation=1):
+
+    """
+    Apply a 2D convolution (cross-correlation, as in PyTorch) to a batch of images.
+
+    The forward pass is one im2col and one matrix product; the backward pass is two matrix products
+    (for the kernels and for the columns) and one col2im for the input gradient.
+
+    Args:
+        x (Tensor or numpy.ndarray): Images of shape (N, C_in, H, W).
+        w (Tensor or numpy.ndarray): Kernels of shape (C_out, C_in, kh, kw).
+        b (Tensor or numpy.ndarray): Biases of shape (C_out,) (optional).
+        stride, padding, dilation: An int or a (height, width) pair.
+
+    Returns:
+        Tensor or numpy.ndarray: The feature maps, of shape (N, C_out, OH, OW); a Tensor node when
+        an operand is a Tensor and the graph is enabled, a float array otherwise.
+    """
+
+    xd, wd = _data(x), _data(w)
+    c_out, c_in, kh, kw = wd.shape
+    if xd.ndim != 4 or xd.shape[1] != c_in:
+        raise ValueError(f"expected input of shape (N, {c_in}, H, W), got {xd.shape}")
+
+    cols, (oh, ow) = im2col(xd, (kh, kw), stride, padding, dilation)
+    w2 = wd.reshape(c_out, -1)
+
+    # (C_out, K) @ (N, K, L) -> (N, C_out, L)
+    out = w2 @ cols
+    if b is not None:
+        out += _data(b).reshape(1, -1, 1)
+    out = out.reshape(len(xd), c_out, oh, ow)
+
+    operands = (x, w) if b is None else (x, w, b)
+    if not _tracked(*operands):
+        return out
+
+    x, w = [ t if isinstance(t, Tensor) else Tensor(t) for t in (x, w) ]
+    b = b if b is None or isinstance(b, Tensor) else Tensor(b)
+    out = Tensor(out, _op='conv2d', _prev=(x, w) if b is None else (x, w, b))
+
+    # Define the backward function for computing gradients
+    def _backward():
+        g = out.grad.reshape(len(xd), c_out, oh * ow)
+        w.grad += np.tensordot(g, cols, axes=([0, 2], [0, 2])).reshape(wd.shape)
+        if b is not None:
+            b.grad += g.sum(axis=(0, 2))
+        x.grad += col2im(w2.T @ g, xd.shape, (kh, kw), stride, padding, dilation)
+
+    out._backward = _backward
+    return out
+
+
+def conv1d(x, w, b=None, stride=1, padding=0, dilation=1):
+
+    """
+    Apply a 1D convolution to a batch of sequences, as a 2D convolution over images of height 1.
+
+    Args:
+        x (Tensor or numpy.ndarray): Sequences of shape (N, C_in, L).
+        w (Tensor or numpy.ndarray): Kernels of shape (C_out, C_in, k).
+        b (Tensor or numpy.ndarray): Biases of shape (C_out,) (optional).
+        stride, padding, dilation (int): Along the sequence.
+
+    Returns:
+        Tensor or numpy.ndarray: The feature maps, of shape (N, C_out, L_out).
+    """
+
+    x4 = x.reshape(x.shape[0], x.shape[1], 1, x.shape[2])
+    w4 = w.reshape(w.shape[0], w.shape[1], 1, w.shape[2])
+    out = conv2d(x4, w4, b, stride=(1, stride), padding=(0, padding), dilation=(1, dilation))
+    return out.reshape(out.shape[0], out.shape[1], out.shape[3])
+
+
+def _pool(x, kernel, stride, padding, dilation, pad_value):
+
+    """
+    Unfold every channel of a batch of images into windows for pooling.
+
+    Returns:
+        tuple: The windows, of shape (N * C, kh * kw, OH * OW), and the output shape (N, C, OH, OW).
+    """
+
+    xd = _data(x)
+    n, c, h, w = xd.shape
+    cols, (oh, ow) = im2col(xd.reshape(n * c, 1, h, w), kernel, stride, padding, dilation, pad_value)
+    return xd, cols, (n, c, oh, ow)
+
+
+def max_pool2d(x, kernel_size, stride=None, padding=0, dilation=1):
+
+    """
+    Take the maximum over sliding windows of every channel.
+
+    The gradient of each output goes to the input element that was the maximum of its window.
+
+    Args:
+        x (Tensor or numpy.ndarray): Images of shape (N, C, H, W).
+        kernel_size, stride, padding, dilation: An int or a (height, width) pair (stride defaults to kernel_size).
+
+    Returns:
+        Tensor or numpy.ndarray: The pooled maps, of shape (N, C, OH, OW).
+    """
+
+    stride = kernel_size if stride is None else stride
+    xd, cols, shape = _pool(x, kernel_size, stride, padding, dilation, -np.inf)
+    index = cols.argmax(axis=1)
+    out = np.take_along_axis(cols, index[:, None], axis=1).reshape(shape)
+
+    if not _tracked(x):
+        return out
+
+    out = Tensor(out, _op='maxpool2d', _prev=(x, ))
+
+    # Define the backward function for computing gradients
+    def _backward():
+        gcols = np.zeros_like(cols)
+        np.put_along_axis(gcols, index[:, None], out.grad.reshape(len(cols), 1, -1), axis=1)
+        n, c, h, w = xd.shape
+        x.grad += col2im(gcols, (n * c, 1, h, w), kernel_size, stride, padding, dilation).reshape(xd.shape)
+
+    out._backward = _backward
+    return out
+
+
+def avg_pool2d(x, kernel_size, stride=None, padding=0, dilation=1):
+
+    """
+    Average sliding windows of every channel (zero padding counts towards the average).
+
+    Args:
+        x (Tensor or numpy.ndarray): Images of shape (N, C, H, W).
+        kernel_size, stride, padding, dilation: An int or a (height, width) pair (stride defaults to kernel_size).
+
+    Returns:
+        Tensor or numpy.ndarray: The pooled maps, of shape (N, C, OH, OW).
+    """
+
+    stride = kernel_size if stride is None else stride
+    xd, cols, shape = _pool(x, kernel_size, stride, padding, dilation, 0.0)
+    k = cols.shape[1]
+    out = cols.mean(axis=1).reshape(shape)
+
+    if not _tracked(x):
+        return out
+
+    out = Tensor(out, _op='avgpool2d', _prev=(x, ))
+
+    # Define the backward function for computing gradients
+    def _backward():
+        g = out.grad.reshape(len(cols), 1, -1) / k
+        n, c, h, w = xd.shape
+        gcols = np.broadcast_to(g, cols.shape)
+        x.grad += col2im(gcols, (n * c, 1, h, w), kernel_size, stride, padding, dilation).reshape(xd.shape)
+
+    out._backward = _backward
+    return out
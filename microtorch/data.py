@@ -0,0 +1,305 @@
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class Dataset :
+
+    """
+    A map-style dataset: a fixed number of samples addressable by index.
+
+    A sample is a tuple of arrays (e.g. features and target). Subclasses implement __len__ and
+    __getitem__, which must accept slices so that contiguous blocks of samples can be read at once.
+    """
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def __getitem__(self, index):
+        raise NotImplementedError
+
+    def chunks(self, chunk_size, rng=None):
+
+        """
+        Yield the dataset as contiguous blocks of samples.
+
+        Args:
+            chunk_size (int): Number of samples per block.
+            rng (numpy.random.Generator): If given, the order of the blocks is shuffled.
+
+        Yields:
+            tuple: One array per field, each with 'chunk_size' rows (fewer for the last block).
+        """
+
+        starts = np.arange(0, len(self), chunk_size)
+        if rng is not None:
+            rng.shuffle(starts)
+
+        for start in starts:
+            yield self[int(start):int(start) + chunk_size]
+
+
+class IterableDataset :
+
+    """
+    A streaming dataset that can only be read front to back, one block of samples at a time.
+
+    Subclasses implement chunks(chunk_size, rng=None) yielding tuples of arrays.
+    """
+
+    def chunks(self, chunk_size, rng=None):
+        raise NotImplementedError
+
+
+class ArrayDataset(Dataset) :
+
+    """
+    A dataset over in-memory arrays sharing their first dimension.
+    """
+
+    def __init__(self, *arrays):
+
+        """
+        Initialize an ArrayDataset object.
+
+        Args:
+            arrays: One array-like per field, e.g. ArrayDataset(xs, ys).
+        """
+
+        self.arrays = [ np.asarray(a, dtype=np.float64) for a in arrays ]
+
+        if any(len(a) != len(self.arrays[0]) for a in self.arrays):
+            raise ValueError("all arrays must have the same number of samples")
+
+    def __len__(self):
+        return len(self.arrays[0])
+
+    def __getitem__(self, index):
+        return tuple(a[index] for a in self.arrays)
+
+
+class NpyDataset(Dataset) :
+
+    """
+    A dataset over .npy files opened as memory maps.
+
+    Only the rows of the blocks being read are paged in, so the files can be larger than RAM.
+    """
+
+    def __init__(self, *paths):
+
+        """
+        Initialize an NpyDataset object.
+
+        Args:
+            paths: One .npy file per field, e.g. NpyDataset('x.npy', 'y.npy').
+        """
+
+        self.arrays = [ np.load(path, mmap_mode='r') for path in paths ]
+
+        if any(len(a) != len(self.arrays[0]) for a in self.arrays):
+            raise ValueError("all arrays must have the same number of samples")
+
+    def __len__(self):
+        return len(self.arrays[0])
+
+    def __getitem__(self, index):
+        # Copy the requested rows out of the memory map
+        return tuple(np.array(a[index], dtype=np.float64) for a in self.arrays)
+
+
+class CSVDataset(IterableDataset) :
+
+    """
+    A dataset streaming a CSV file in chunks with pandas, without loading the whole file.
+    """
+
+    def __init__(self, path, target=None, features=None, **read_csv_kwargs):
+
+        """
+        Initialize a CSVDataset object.
+
+        Args:
+            path (str): Path of the CSV file.
+            target (str or list): Column(s) holding the target. If None, samples only have features.
+            features (list): Columns holding the features (default is every non-target column).
+            read_csv_kwargs: Extra keyword arguments passed to pandas.read_csv.
+        """
+
+        self.path = path
+        self.target = target
+        self.features = features
+        self.read_csv_kwargs = read_csv_kwargs
+
+    def chunks(self, chunk_size, rng=None):
+
+        """
+        Yield the file as blocks of 'chunk_size' rows, in file order.
+        """
+
+        for frame in pd.read_csv(self.path, chunksize=chunk_size, **self.read_csv_kwargs):
+            targets = [] if self.target is None else [self.target] if isinstance(self.target, str) else list(self.target)
+            features = self.features if self.features is not None else [ c for c in frame.columns if c not in targets ]
+
+            x = frame[features].to_numpy(dtype=np.float64)
+            if self.target is None:
+                yield (x, )
+            else:
+                yield (x, frame[self.target].to_numpy(dtype=np.float64))
+
+
+def _shuffled(chunks, buffer_size, rng):
+
+    """
+    Shuffle a stream of blocks with a bounded buffer of samples.
+
+    The buffer is filled until it holds 'buffer_size' samples, permuted, and everything beyond
+    half of it is emitted; the other half stays to be mixed with the following blocks.
+    """
+
+    buffer = None
+    for chunk in chunks:
+        buffer = chunk if buffer is None else tuple(np.concatenate(pair) for pair in zip(buffer, chunk))
+
+        if len(buffer[0]) >= buffer_size:
+            order = rng.permutation(len(buffer[0]))
+            buffer = tuple(a[order] for a in buffer)
+            emit = len(buffer[0]) - buffer_size // 2
+            yield tuple(a[:emit] for a in buffer)
+            buffer = tuple(a[emit:] for a in buffer)
+
+    if buffer is not None and len(buffer[0]):
+        order = rng.permutation(len(buffer[0]))
+        yield tuple(a[order] for a in buffer)
+
+
+def _batched(chunks, batch_size, drop_last):
+
+    """
+    Regroup a stream of blocks of any size into fixed-size mini-batches.
+    """
+
+    pending = None
+    for chunk in chunks:
+        pending = chunk if pending is None else tuple(np.concatenate(pair) for pair in zip(pending, chunk))
+
+        count = len(pending[0]) // batch_size * batch_size
+        for start in range(0, count, batch_size):
+            yield tuple(a[start:start + batch_size] for a in pending)
+        pending = tuple(a[count:] for a in pending)
+
+    if pending is not None and len(pending[0]) and not drop_last:
+        yield pending
+
+
+class DataLoader :
+
+    """
+    An iterator over fixed-size mini-batches of a Dataset or IterableDataset.
+
+    The dataset is read block by block, optionally shuffled through a bounded buffer, regrouped into
+    mini-batches and, by default, produced by a background thread that prepares the next batches
+    while the current training step runs. Memory use is bounded by the block size, the shuffle
+    buffer and the prefetch queue, not by the size of the dataset.
+
+    Example:
+        loader = DataLoader(CSVDataset('train.csv', target='y'), batch_size=64, shuffle=True)
+        for epoch in range(epochs):
+            for xs, ys in loader:
+                loss = Loss.MSELoss(ys, n(xs))
+                ...
+    """
+
+    def __init__(self, dataset, batch_size=32, shuffle=False, buffer_size=10000, chunk_size=4096,
+                 drop_last=False, prefetch=2, seed=None):
+
+        """
+        Initialize a DataLoader object.
+
+        Args:
+            dataset (Dataset or IterableDataset): The dataset to read.
+            batch_size (int): Number of samples per mini-batch.
+            shuffle (bool): Whether to shuffle the samples (and, for map-style datasets, the block order).
+            buffer_size (int): Number of samples held by the shuffle buffer.
+            chunk_size (int): Number of samples read from the dataset at a time.
+            drop_last (bool): Whether to drop the last mini-batch if it is smaller than 'batch_size'.
+            prefetch (int): Number of mini-batches prepared ahead by a background thread (0 disables the thread).
+            seed (int): Seed of the shuffling random generator.
+        """
+
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.buffer_size = buffer_size
+        self.chunk_size = chunk_size
+        self.drop_last = drop_last
+        self.prefetch = prefetch
+        self.rng = np.random.default_rng(seed)
+
+
+    def _batches(self):
+
+        """
+        Yield the mini-batches of one epoch in the calling thread.
+        """
+
+        rng = self.rng if self.shuffle else None
+        chunks = self.dataset.chunks(self.chunk_size, rng=rng)
+        if self.shuffle:
+            chunks = _shuffled(chunks, self.buffer_size, self.rng)
+
+        for batch in _batched(chunks, self.batch_size, self.drop_last):
+            yield batch if len(batch) > 1 else batch[0]
+
+
+    def __iter__(self):
+
+        """
+        Iterate over the mini-batches of one epoch.
+
+        Yields:
+            tuple or numpy.ndarray: A (xs, ys) tuple, or just xs for datasets without targets.
+        """
+
+        if not self.prefetch:
+            yield from self._batches()
+            return
+
+        batches = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            # Wait for room in the queue, giving up if the consumer went away
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            try:
+                for batch in self._batches():
+                    if not put(batch):
+                        return
+                put(done)
+            except BaseException as error:
+                put(error)
+
+        thread = threading.Thread(target=produce, daemon=True)
+        thread.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is done:
+                    break
+                if isinstance(batch, BaseException):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+            thread.join()
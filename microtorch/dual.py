@@ -0,0 +1,346 @@
+import numpy as np
+
+from microtorch import autograd
+from microtorch.Tensor import Tensor
+from microtorch.Value import Value, backpropagate
+
+
+def _align(tangent, ndim, out_ndim):
+
+    """
+    Insert axes into a tangent so that its data part has 'out_ndim' dimensions.
+
+    The leading axes of a tangent (beyond the 'ndim' dimensions of its data) index the directions,
+    so broadcasting against data of higher rank needs new axes between them and the data axes.
+    """
+
+    lead = tangent.ndim - ndim
+    if out_ndim == ndim or lead == 0:
+        return tangent
+    return tangent.reshape(tangent.shape[:lead] + (1, ) * (out_ndim - ndim) + tangent.shape[lead:])
+
+
+def _left_matmul(x, dual):
+
+    """
+    Multiply the tangent of 'dual' on the left by the array 'x'.
+    """
+
+    if dual.data.ndim == 1 and dual.tangent.ndim > 1:
+        # x @ v for every direction v, with the direction axis kept in front
+        return dual.tangent @ np.transpose(x)
+    return x @ dual.tangent
+
+
+class Dual :
+
+    """
+    A dual number for forward-mode automatic differentiation.
+
+    A Dual carries a value (the primal) and its derivative along one or several input directions
+    (the tangent). Every operation computes both at once, so a Jacobian-vector product costs about
+    one extra forward pass and no graph or tape is built. The primal may be a number or an array:
+    the tangent has the shape of the primal for one direction, or (k, *primal.shape) for k
+    directions evaluated together.
+
+    The operations mirror those of Value: +, -, *, /, ** (constant exponent), exp, log, tanh, relu
+    and sigmoid, plus matmul, sum, indexing and reshape so that nn layers can run on Duals.
+
+    Example:
+        x = Dual(2.0, 1.0)
+        y = (x * x).tanh()   # y.tangent is dy/dx at x = 2
+    """
+
+    __slots__ = ('data', 'tangent')
+
+    # Make numpy defer to Dual's reflected operators (e.g. ndarray * Dual -> Dual.__rmul__)
+    __array_ufunc__ = None
+
+
+    def __init__(self, data, tangent=None):
+
+        """
+        Initialize a Dual object.
+
+        Args:
+            data: The primal, a number or an array-like.
+            tangent: The tangent, shaped like the primal or with leading direction axes (default is zero).
+        """
+
+        self.data = np.asarray(data, dtype=np.float64)
+        self.tangent = np.zeros_like(self.data) if tangent is None else np.asarray(tangent, dtype=np.float64)
+
+
+    def __repr__(self):
+
+        """
+        Return a string representation of the Dual object.
+        """
+
+        return f"Dual(data={self.data}, tangent={self.tangent})"
+
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def ndim(self):
+        return self.data.ndim
+
+    def __len__(self):
+        return len(self.data)
+
+
+    def _tangent(self, out_ndim):
+        return _align(self.tangent, self.data.ndim, out_ndim)
+
+
+    def __add__(self, other):
+
+        """
+        Perform addition: d(a + b) = da + db.
+        """
+
+        if not isinstance(other, Dual):
+            data = self.data + other
+            return Dual(data, self._tangent(data.ndim))
+
+        data = self.data + other.data
+        return Dual(data, self._tangent(data.ndim) + other._tangent(data.ndim))
+
+    def __radd__(self, other):
+        return self + other
+
+    def __neg__(self):
+        return Dual(-self.data, -self.tangent)
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+
+    def __mul__(self, other):
+
+        """
+        Perform multiplication: d(a * b) = da * b + a * db.
+        """
+
+        if not isinstance(other, Dual):
+            data = self.data * other
+            return Dual(data, self._tangent(data.ndim) * other)
+
+        data = self.data * other.data
+        return Dual(data, self._tangent(data.ndim) * other.data + self.data * other._tangent(data.ndim))
+
+    def __rmul__(self, other):
+        return self * other
+
+
+    def __pow__(self, pow):
+
+        """
+        Raise to a constant power: d(a ** k) = k * a ** (k - 1) * da.
+        """
+
+        assert isinstance(pow, (int, float)), "only supporting int/float powers for now"
+        return Dual(self.data ** pow, pow * self.data ** (pow - 1) * self.tangent)
+
+    def __rpow__(self, other):
+
+        """
+        Raise a constant to this power: d(c ** a) = log(c) * c ** a * da.
+        """
+
+        data = other ** self.data
+        return Dual(data, np.log(other) * data * self.tangent)
+
+    def __truediv__(self, other):
+        return self * other ** -1
+
+    def __rtruediv__(self, other):
+        return self ** -1 * other
+
+
+    def __matmul__(self, other):
+
+        """
+        Perform matrix multiplication with an array or another Dual.
+        """
+
+        if not isinstance(other, Dual):
+            return Dual(self.data @ other, self.tangent @ other)
+        data = self.data @ other.data
+        return Dual(data, self.tangent @ other.data + _left_matmul(self.data, other))
+
+    def __rmatmul__(self, other):
+        return Dual(other @ self.data, _left_matmul(other, self))
+
+
+    def __lt__(self, other):
+        return self.data < (other.data if isinstance(other, Dual) else other)
+
+    def __le__(self, other):
+        return self.data <= (other.data if isinstance(other, Dual) else other)
+
+    def __gt__(self, other):
+        return self.data > (other.data if isinstance(other, Dual) else other)
+
+    def __ge__(self, other):
+        return self.data >= (other.data if isinstance(other, Dual) else other)
+
+
+    def relu(self):
+        return Dual(np.maximum(self.data, 0), (self.data > 0) * self.tangent)
+
+    def log(self):
+        return Dual(np.log(self.data), self.tangent / self.data)
+
+    def exp(self):
+        data = np.exp(self.data)
+        return Dual(data, data * self.tangent)
+
+    def tanh(self):
+        data = np.tanh(self.data)
+        return Dual(data, (1 - data ** 2) * self.tangent)
+
+    def sigmoid(self):
+        data = 1 / (1 + np.exp(-self.data))
+        return Dual(data, (1 - data) * data * self.tangent)
+
+
+    def sum(self, axis=None, keepdims=False):
+
+        """
+        Sum the elements of the primal over the given axis, and the tangent over the same axes.
+        """
+
+        lead = self.tangent.ndim - self.data.ndim
+        axes = tuple(range(self.data.ndim)) if axis is None else (axis, ) if isinstance(axis, int) else tuple(axis)
+        tangent_axes = tuple(lead + (a % self.data.ndim) for a in axes)
+        return Dual(self.data.sum(axis=axis, keepdims=keepdims), self.tangent.sum(axis=tangent_axes, keepdims=keepdims))
+
+    def __getitem__(self, index):
+        lead = self.tangent.ndim - self.data.ndim
+        index = index if isinstance(index, tuple) else (index, )
+        return Dual(self.data[index], self.tangent[(slice(None), ) * lead + index])
+
+    def reshape(self, *shape):
+        data = self.data.reshape(*shape)
+        lead = self.tangent.shape[:self.tangent.ndim - self.data.ndim]
+        return Dual(data, self.tangent.reshape(lead + data.shape))
+
+
+def jvp(model, x, v):
+
+    """
+    Compute a Jacobian-vector product in forward mode.
+
+    The model runs once on Dual inputs whose tangent is 'v'; its parameters are read as constants
+    and no graph is built.
+
+    Args:
+        model (callable): A Model (or any function of arrays built from Dual-supported operations).
+        x (numpy.ndarray): The point, a single sample or a batch.
+        v (numpy.ndarray): The direction, shaped like 'x', or (k, *x.shape) for k directions at once.
+
+    Returns:
+        tuple: The output of the model at 'x' and its derivative along 'v' (with the leading k axis
+        when several directions are given).
+    """
+
+    with autograd.no_grad():
+        out = model(Dual(x, v))
+    return out.data, out.tangent
+
+
+def _forward_jacobian(model, x):
+    eye = np.eye(x.size).reshape((x.size, ) + x.shape)
+    out, tangent = jvp(model, x, eye)
+    return np.moveaxis(tangent, 0, -1).reshape(out.shape + x.shape)
+
+
+def _reverse_jacobian(model, x):
+
+    # Backpropagate each output through one graph, restoring the parameter gradients afterwards
+    params = list(model.parameters())
+    saved = [ None if p.grad is None else np.copy(p.grad) for p in params ]
+    try:
+        with autograd.enable_grad():
+            if any(getattr(layer, 'tensor', False) for layer in model.layers):
+                leaf = Tensor(x)
+                out = model(leaf)
+                topo = autograd.topological_sort(out)
+                autograd.allocate_grads(topo)
+                rows = []
+                for i in range(out.data.size):
+                    for node in topo:
+                        node.grad[...] = 0.0
+                    seed = np.zeros(out.data.size)
+                    seed[i] = 1.0
+                    out.grad = seed.reshape(out.shape)
+                    autograd.backpropagate(topo)
+                    rows.append(leaf.grad.ravel().copy())
+                shape = out.shape
+            else:
+                leaves = np.empty(x.size, dtype=object)
+                leaves[:] = [ Value(d) for d in x.ravel().tolist() ]
+                outs = np.asarray(model(leaves.reshape(x.shape)), dtype=object)
+                rows = []
+                for root in outs.ravel():
+                    topo = autograd.topological_sort(root)
+                    for node in topo:
+                        node.grad = 0.0
+                    for v in leaves:
+                        v.grad = 0.0
+                    root.grad = 1.0
+                    backpropagate(topo)
+                    rows.append([ v.grad for v in leaves ])
+                shape = outs.shape
+    finally:
+        for p, g in zip(params, saved):
+            if g is None:
+                p.grad = None
+            elif isinstance(p, Tensor):
+                p.grad[...] = g
+            else:
+                p.grad = float(g)
+
+    return np.array(rows, dtype=np.float64).reshape(shape + x.shape)
+
+
+def jacobian(model, x, mode='auto'):
+
+    """
+    Compute the Jacobian of a Model with respect to its input.
+
+    Forward mode needs one pass per input element (all run together as the directions of a single
+    Dual pass) and reverse mode one backward pass per output element over a single graph, so 'auto'
+    picks forward mode when the input has no more elements than the output and reverse mode otherwise.
+
+    Args:
+        model (Model): The model.
+        x (numpy.ndarray): The point, a single sample or a batch.
+        mode (str): 'forward', 'reverse' or 'auto'.
+
+    Returns:
+        numpy.ndarray: The Jacobian, of shape output.shape + x.shape (for a single sample of shape
+        (nin,), the output has no batch axis: (nout, nin), or (nin,) for a single-output model).
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+
+    if mode == 'auto':
+        mode = 'forward' if x.size <= np.size(model.predict(x)) else 'reverse'
+
+    if mode == 'forward':
+        jac = _forward_jacobian(model, x)
+    elif mode == 'reverse':
+        jac = _reverse_jacobian(model, x)
+    else:
+        raise ValueError(f"unknown mode '{mode}', expected 'forward', 'reverse' or 'auto'")
+
+    # A Model runs a single sample as a batch of one: drop that batch axis
+    return jac[0] if x.ndim == 1 and jac.ndim > x.ndim and jac.shape[0] == 1 else jac
@@ -0,0 +1,328 @@
+from collections import Counter
+
+import numpy as np
+
+from microtorch import autograd
+from microtorch.Value import Value, _FORWARD, _BACKWARD
+from microtorch.Value import LITERAL, OP_LEAF, OP_ADD, OP_MUL, OP_POW, OP_NEG, OP_SUB, OP_DIV
+
+
+def _as_leaves(x):
+
+    """
+    Wrap an array of numbers into an object array of Value leaves with the same shape.
+
+    Args:
+        x (numpy.ndarray or list): Input data.
+
+    Returns:
+        numpy.ndarray: Object array of Value objects.
+    """
+
+    data = np.asarray(x, dtype=np.float64)
+
+    leaves = np.empty(data.size, dtype=object)
+    leaves[:] = [ Value(v) for v in data.ravel().tolist() ]
+
+    return leaves.reshape(data.shape)
+
+
+def _simplify(node, constant):
+
+    """
+    Apply the algebraic rewrites to one node.
+
+    The node is either rewritten in place (e.g. into a subtraction) or, if it is equivalent to one
+    of its operands, that operand is returned so that the node can be replaced by it.
+
+    Args:
+        node (Value): A node whose operands have already been simplified.
+        constant (callable): constant(v, x) is True if v is a constant equal to x.
+
+    Returns:
+        Value or None: The operand replacing the node, if any.
+    """
+
+    op, prev = node._op, node._prev
+
+    if op == OP_MUL:
+        a, b = prev
+        if constant(b, 1):
+            return a
+        if constant(a, 1):
+            return b
+        if constant(b, -1) or constant(a, -1):
+            # x * -1 is a negation, and a negated negation is the original value
+            x = a if constant(b, -1) else b
+            if x._op == OP_NEG:
+                return x._prev[0]
+            node._op, node._prev = OP_NEG, (x, )
+            return None
+        if b._op == OP_POW and b._const == -1:
+            node._op, node._prev = OP_DIV, (a, b._prev[0])
+        elif a._op == OP_POW and a._const == -1:
+            node._op, node._prev = OP_DIV, (b, a._prev[0])
+
+    elif op == OP_ADD:
+        a, b = prev
+        if constant(b, 0):
+            return a
+        if constant(a, 0):
+            return b
+        if b._op == OP_NEG:
+            node._op, node._prev = OP_SUB, (a, b._prev[0])
+        elif a._op == OP_NEG:
+            node._op, node._prev = OP_SUB, (b, a._prev[0])
+
+    elif op == OP_POW and node._const == 1:
+        return prev[0]
+
+    return None
+
+
+def _cse_key(node):
+
+    """
+    Return a key identifying the computation of a node, or None if it cannot be compared.
+    """
+
+    operands = tuple(id(v) for v in node._prev)
+    if node._op in (OP_ADD, OP_MUL):
+        operands = tuple(sorted(operands))
+
+    key = (node._op, operands, node._const)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class StaticGraph :
+
+    """
+    A computational graph captured once and replayed on new input data.
+
+    The graph is traced by running 'fn' on Value leaves wrapping the example inputs. Every node
+    created during the trace is recorded in creation order, which is already a topological order,
+    so replaying the forward pass is a single loop recomputing each node from its operands with the
+    forward rule of its opcode and
+    replaying the backward pass is a single loop over the frozen node list in reverse. No node,
+    closure or topological sort is rebuilt between calls.
+
+    Values that existed before the trace (such as model parameters) are treated as external
+    leaves: their current data is read on every replay and their gradients are accumulated,
+    so an optimizer can update them between steps as usual.
+    """
+
+    def __init__(self, fn, *example_inputs):
+
+        """
+        Trace 'fn' on the example inputs and freeze the recorded tape.
+
+        Args:
+            fn (callable): A function of the inputs returning a Value (e.g. a loss) or an array of Values.
+            example_inputs: Arrays of numbers, one per argument of 'fn'. Their shapes are fixed by the trace.
+        """
+
+        self.inputs = [ _as_leaves(x) for x in example_inputs ]
+
+        # Record every node created while running the forward pass
+        state = autograd._state
+        previous, state.tape = state.tape, []
+        try:
+            self.output = fn(*self.inputs)
+        finally:
+            tape, state.tape = state.tape, previous
+
+        # Keep only the recorded nodes the output depends on
+        outputs = [ o for o in np.ravel(self.output) if isinstance(o, Value) ]
+        needed = set()
+        stack = list(outputs)
+        while stack:
+            v = stack.pop()
+            if v not in needed:
+                needed.add(v)
+                stack.extend(v._prev)
+
+        self.nodes = [ node for node, _ in tape if node in needed ]
+        self._leaves = [ leaves.ravel() for leaves in self.inputs ]
+        self._compile()
+
+
+    def _compile(self):
+
+        """
+        Build the forward program as (node, rule, operands, constant) entries, in node order.
+        """
+
+        self._program = [ (node, _FORWARD[node._op], node._prev, node._const) for node in self.nodes if node._prev ]
+
+
+    def node_counts(self):
+
+        """
+        Count the nodes of the graph per operation (constants and other leaves are counted as 'leaf').
+
+        Returns:
+            collections.Counter: operation name -> number of nodes.
+        """
+
+        return Counter(node.op or 'leaf' for node in self.nodes)
+
+
+    def optimize(self):
+
+        """
+        Simplify the recorded graph in place.
+
+        Nodes whose operands are all constants (the plain numbers wrapped while tracing, such as the
+        -1 of negation) are folded into constants. Other leaves created while tracing (e.g. the
+        parameters of a lazily initialized layer) are kept as leaves. Multiplications by one, additions of zero, powers of
+        one and double negations are removed; 'x * -1' becomes a negation, 'a + neg(b)' a single
+        subtraction and 'a * b ** -1' a single division. Identical nodes (same operation, operands
+        and constant) are merged, and nodes no output depends on are dropped. Inputs and external
+        leaves such as parameters are never modified, and the outputs stay the same objects.
+
+        Returns:
+            dict: The node counts per operation 'before' and 'after' the pass.
+        """
+
+        before = self.node_counts()
+
+        outputs = set(o for o in np.ravel(self.output) if isinstance(o, Value))
+        constants = set(node for node in self.nodes if not node._prev and node._const is LITERAL)
+        alias = {}
+        seen = {}
+
+        def constant(node, value):
+            return node in constants and node.data == value
+
+        for node in self.nodes:
+            if not node._prev:
+                if node not in constants:
+                    continue
+
+                # Merge constants holding the same number
+                key = (OP_LEAF, node.data)
+                if key in seen and node not in outputs:
+                    alias[node] = seen[key]
+                else:
+                    seen.setdefault(key, node)
+                continue
+
+            prev = tuple(alias.get(v, v) for v in node._prev)
+            node._prev = prev
+
+            # Constant folding: the data computed during the trace never changes
+            if all(v in constants for v in prev):
+                node._op, node._prev, node._const = OP_LEAF, (), LITERAL
+                constants.add(node)
+                continue
+
+            replacement = _simplify(node, constant)
+            if replacement is not None and node not in outputs:
+                alias[node] = replacement
+                continue
+
+            # Common subexpressions: the same operation on the same operands
+            key = _cse_key(node)
+            if key is not None:
+                if key in seen and node not in outputs:
+                    alias[node] = seen[key]
+                    continue
+                seen.setdefault(key, node)
+
+        # Drop the nodes that are no longer reachable from the outputs
+        needed = set()
+        stack = list(outputs)
+        while stack:
+            v = stack.pop()
+            if v not in needed:
+                needed.add(v)
+                stack.extend(v._prev)
+        self.nodes = [ node for node in self.nodes if node in needed ]
+        self._compile()
+
+        return { 'before': before, 'after': self.node_counts() }
+
+
+    def __call__(self, *inputs):
+
+        """
+        Replay the forward pass on new input data.
+
+        Args:
+            inputs: Arrays of numbers with the same shapes as the example inputs.
+
+        Returns:
+            The output of the traced function, with its data recomputed for the new inputs.
+        """
+
+        # Load the new inputs into the input leaves
+        for leaves, x in zip(self._leaves, inputs):
+            data = np.asarray(x, dtype=np.float64).ravel()
+            if data.size != leaves.size:
+                raise ValueError(f"expected an input with {leaves.size} elements, got {data.size}")
+            for leaf, v in zip(leaves, data.tolist()):
+                leaf.data = v
+
+        # Recompute every node in topological order
+        for node, forward, operands, constant in self._program:
+            node.data = forward(operands, constant)
+
+        return self.output
+
+
+    def backward(self):
+
+        """
+        Replay the backward pass over the frozen node list.
+
+        Gradients of the recorded nodes and input leaves are reset first; gradients of external
+        leaves (e.g. parameters) are accumulated and must be cleared by the optimizer.
+        """
+
+        if not isinstance(self.output, Value):
+            raise ValueError("backward requires the traced function to return a single Value")
+
+        # Reset the gradients left over from the previous replay
+        for node in self.nodes:
+            node.grad = 0.0
+        for leaves in self._leaves:
+            for leaf in leaves:
+                leaf.grad = 0.0
+
+        # Seed the output and backpropagate in reverse topological order
+        self.output.grad = 1
+        backward = _BACKWARD
+        for node in reversed(self.nodes):
+            backward[node._op](node)
+
+
+def capture(fn, *example_inputs, optimize=False):
+
+    """
+    Trace one forward pass of 'fn' and return a StaticGraph that can be replayed.
+
+    Args:
+        fn (callable): A function of the inputs, typically running a Model and a loss.
+        example_inputs: Example arrays of numbers, one per argument of 'fn'.
+        optimize (bool): Whether to simplify the captured graph (see StaticGraph.optimize).
+
+    Returns:
+        StaticGraph: The captured graph.
+
+    Example:
+        step = capture(lambda x, y: Loss.MSELoss(y, model(x)), xs, ys)
+        for epoch in range(epochs):
+            loss = step(xs, ys)
+            optimizer.zero_grad()
+            step.backward()
+            optimizer.step()
+    """
+
+    graph = StaticGraph(fn, *example_inputs)
+    if optimize:
+        graph.optimize()
+    return graph
@@ -1,20 +1,222 @@
 import numpy as np
 
-from microtorch.utils import generator
+from microtorch import autograd
+from microtorch.dual import Dual
+from microtorch import conv, precision, rnn
+from microtorch.Tensor import Tensor
+from microtorch.Value import Value, affine, checkpoint
+from microtorch.utils import as_parameter, initialize, leaves
+
+# Element-wise activations over object arrays of Value objects
+_VALUE_ACTIVATIONS = {
+    'tanh': np.frompyfunc(lambda v: v.tanh(), 1, 1),
+    'relu': np.frompyfunc(lambda v: v.relu(), 1, 1),
+    'sigmoid': np.frompyfunc(lambda v: v.sigmoid(), 1, 1),
+}
+
+def _activate(z, activation):
+
+    """
+    Apply an activation function to a linear transformation output.
+
+    Args:
+        z (Value, Tensor or numpy.ndarray of Value): Linear transformation output.
+        activation (str): The activation function ('tanh', 'relu' or 'sigmoid'); anything else is the identity.
+
+    Returns:
+        The activated output, of the same kind as 'z'.
+    """
+
+    if isinstance(z, np.ndarray):
+        return _VALUE_ACTIVATIONS[activation](z) if activation in _VALUE_ACTIVATIONS else z
+
+    if activation == 'tanh':
+        return z.tanh()  # Tanh activation
+    elif activation == 'relu':
+        return z.relu()  # ReLU activation
+    elif activation == 'sigmoid':
+        return z.sigmoid()  # Sigmoid activation
+    else:
+        return z
+
+
+# Element-wise activations over float arrays, used when graph construction is disabled
+_NUMPY_ACTIVATIONS = {
+    'tanh': np.tanh,
+    'relu': lambda z: np.maximum(z, 0),
+    'sigmoid': lambda z: 1 / (1 + np.exp(-z)),
+}
+
+def _activate_data(z, activation):
+
+    """
+    Apply an activation function to a float array.
+
+    Args:
+        z (numpy.ndarray): Linear transformation output.
+        activation (str): The activation function ('tanh', 'relu' or 'sigmoid'); anything else is the identity.
+
+    Returns:
+        numpy.ndarray: The activated output.
+    """
+
+    return _NUMPY_ACTIVATIONS[activation](z) if activation in _NUMPY_ACTIVATIONS else z
+
+
+def _data(x):
+
+    """
+    Return the float data behind an input or a parameter array.
+
+    Args:
+        x: A Tensor, an object array (or list) of Value objects, or an array-like of numbers.
+
+    Returns:
+        numpy.ndarray: The float64 data, with the same shape.
+    """
+
+    if isinstance(x, Tensor):
+        return x.data
+
+    x = np.asarray(x)
+    if x.dtype == object:
+        data = np.fromiter((v.data if isinstance(v, Value) else v for v in x.flat), dtype=np.float64, count=x.size)
+        return data.reshape(x.shape)
+
+    # Float arrays keep their precision (e.g. float32 inputs of float32 layers)
+    return x if x.dtype.kind == 'f' else x.astype(np.float64)
+
+
+def _data_as(x, dtype):
+
+    """
+    Return the float data behind an input, converted to 'dtype' (the dtype of a layer's parameters).
+    """
+
+    return _data(x).astype(dtype, copy=False)
+
+
+def _tensor_as(x, dtype):
+
+    """
+    Return an input as a Tensor of 'dtype', converting a Tensor of another dtype through an
+    'astype' node so that its gradient flows back in its own dtype.
+    """
+
+    if not isinstance(x, Tensor):
+        return Tensor(_data_as(x, dtype))
+    return x if x.data.dtype == dtype else x.astype(dtype)
+
+
+def _dual_linear(fn, x):
+
+    """
+    Apply a map that is linear in its input batch (a convolution without bias, an average pooling)
+    to the tangent of a Dual, with the direction axes of the tangent folded into the batch axis.
+    """
+
+    lead = x.tangent.shape[:x.tangent.ndim - x.data.ndim]
+    t = fn(x.tangent.reshape((-1, ) + x.data.shape[1:]))
+    return t.reshape(lead + (x.data.shape[0], ) + t.shape[1:])
+
+
+def _kernels(shape, bias, init, rng):
+
+    """
+    Sample convolution kernels of 'shape' (out_channels, in_channels, *kernel) and their biases.
+
+    The kernels are drawn by utils.initialize as a dense layer from the in_channels * prod(kernel)
+    inputs of a window to the out_channels outputs, so the convolutions take the same 'init' and
+    'rng' options as Layer.
+    """
+
+    fan_in = int(np.prod(shape[1:]))
+    data = initialize(fan_in, shape[0], init, rng)
+    w = as_parameter(np.ascontiguousarray(data[:fan_in].T).reshape(shape))
+    return w, (as_parameter(data[fan_in]) if bias else None)
+
 
 class Model :             
     def __call__(self,xs) :
+        # Dual inputs (forward-mode differentiation) run forward on Duals
+        if isinstance(xs, Dual) :
+            if xs.ndim == 1 :
+                xs = xs.reshape(1,-1)
+            outs = self.forward(xs)
+            return outs[:, 0] if outs.ndim == 2 and outs.shape[1] == 1 else outs
+
+        # Without graph construction, run forward directly on float arrays
+        if not autograd._state.grad_enabled :
+            xs = _data(xs)
+            if xs.ndim == 1 :
+                xs = xs.reshape(1,-1)
+            outs = self.forward(xs)
+            return outs[:, 0] if outs.ndim == 2 and outs.shape[1] == 1 else outs
+
+        # Tensor-backed models take the batch as one Tensor
+        if isinstance(xs, Tensor) or any(getattr(layer, 'tensor', False) for layer in self.layers) :
+            xs = xs if isinstance(xs, Tensor) else Tensor(xs)
+            if xs.ndim == 1 :
+                xs = xs.reshape(1,-1)
+            outs = self.forward(xs)
+            return outs[:, 0] if outs.ndim == 2 and outs.shape[1] == 1 else outs
+
         xs = np.array(xs) if isinstance(xs, list) else xs
 
         if isinstance(xs, np.ndarray) and xs.ndim == 1 :
             xs = xs.reshape(1,-1)
-        outs = [ self.forward(x) for x in xs ]
-        return [ out[0] for out in outs ]
+
+        # Hand the whole (batch, nin) batch through forward at once
+        outs = self.forward(xs)
+
+        # Single-output models give one prediction per sample, others the whole (batch, nout) array
+        return list(outs[:, 0]) if outs.shape[1] == 1 else outs
+
+    def predict(self, xs) :
+
+        """
+        Compute predictions without building the computational graph.
+
+        Args:
+            xs (numpy.ndarray, list or Tensor): Input data, a single sample or a batch.
+
+        Returns:
+            numpy.ndarray: The output of the model for every sample, as floats.
+        """
+
+        with autograd.no_grad() :
+            return self(xs)
 
     def parameters(self) : 
         return np.concatenate([n.parameters() for n in self.layers])
 
 
+class Sequential(Model) :
+
+    """
+    A Model applying its layers one after the other.
+
+    Example:
+        n = nn.Sequential(nn.Layer(3, 4), nn.Layer(4, 4), nn.Layer(4, 1))
+    """
+
+    def __init__(self, *layers) :
+
+        """
+        Initialize a Sequential model.
+
+        Args:
+            layers: The layers, in the order they are applied.
+        """
+
+        self.layers = list(layers)
+
+    def forward(self, x) :
+        for layer in self.layers :
+            x = layer(x)
+        return x
+
+
 
 class Neuron :
 
@@ -25,9 +227,11 @@ class Neuron :
         w (numpy.ndarray): Weights of the neuron.
         b (numpy.ndarray): Bias of the neuron.
         activation (str): The activation function to use ('tanh', 'relu', or 'sigmoid').
+        tensor (bool): Whether the neuron runs on Tensor instead of scalar Value objects.
+        fused (bool): Whether each output is a single fused affine + activation Value node.
     """
 
-    def __init__(self, nin , activation = 'tanh' ):
+    def __init__(self, nin , activation = 'tanh', tensor = False, fused = True, init = 'normal', rng = None, w = None, b = None ):
 
         """
         Initialize a Neuron object.
@@ -35,12 +239,29 @@ class Neuron :
         Args:
             nin (int): The number of input features.
             activation (str): The activation function to use. Default is 'tanh'.
+            tensor (bool): If True, store the weights as a (nin, 1) Tensor and the bias as a (1,) Tensor. Default is False.
+            fused (bool): If True, compute each output as one fused affine + activation node instead of a graph of
+                scalar '*' and '+' nodes (see Value.affine). Set it to False to inspect the full scalar graph. Default is True.
+            init (str): The initialization scheme (see utils.initialize). Default is 'normal'.
+            rng: A numpy.random.Generator or a seed (default is the global numpy random state).
+            w, b: Existing (nin,) and (1,) arrays of Value objects to use as parameters instead of
+                sampling new ones (used by Layer, which initializes all its neurons at once).
         """
 
-        # Initialize weights and bias using the generator function from the Value module
-        self.w = generator(nin)  # Generate weights     
-        self.b = generator(1)  # Generate bias
+        if w is None :
+            # Sample the weights and the bias together, as one (nin + 1, 1) array
+            data = initialize(nin, 1, init, rng)
+            if tensor :
+                w, b = as_parameter(data[:nin]), as_parameter(data[nin])
+            else :
+                values = leaves(data[:, 0])
+                w, b = values[:nin], values[nin:]
+
+        self.w = w
+        self.b = b
         self.activation = activation # Set activation function
+        self.tensor = tensor
+        self.fused = fused
     
 
     def _activation(self, z):
@@ -48,20 +269,12 @@ class Neuron :
         Apply the activation function to the linear transformation output.
 
         Args:
-            z (numpy.ndarray): Linear transformation output.
+            z (numpy.ndarray or Tensor): Linear transformation output.
 
         Returns:
-            Value: Output of the neuron after applying the activation function.
-        """
-        if self.activation == 'tanh':
-            return z[0].tanh()  # Tanh activation
-        elif self.activation == 'relu':
-            return z[0].relu()  # ReLU activation
-        elif self.activation == 'sigmoid':
-            return z[0].sigmoid()  # Sigmoid activation
-        else:
-            return z[0]
-            
+            Value or Tensor: Output of the neuron after applying the activation function.
+        """
+        return _activate(z, self.activation)
         
 
     def __call__(self,x) :
@@ -70,27 +283,53 @@ class Neuron :
         Compute the output of the neuron given input data.
 
         Args:
-            x (numpy.ndarray or list): Input data.
+            x (numpy.ndarray, list or Tensor): Input data.
 
         Returns:
-            numpy.ndarray: Output of the neuron after applying the activation function.
+            Value, numpy.ndarray or Tensor: Output of the neuron after applying the activation function,
+            one Value per row for a 2D (batch, nin) input.
         """
 
+        if isinstance(x, Dual) :
+            # Forward-mode differentiation: the parameters are constants
+            return _activate(x @ _data(self.w).reshape(-1) + _data(self.b)[0], self.activation)
+
+        if not autograd._state.grad_enabled :
+            # Compute directly on the float data, without graph nodes
+            w = _data(self.w)
+            z = np.dot(_data_as(x, w.dtype), w.reshape(-1)) + _data(self.b)[0]
+            return _activate_data(z, self.activation)
+
+        if self.tensor :
+            # Compute the (batch, 1) linear transformation as a single matmul node, in the dtype of the parameters
+            _x = _tensor_as(x, self.w.data.dtype)
+            if _x.ndim == 1 :
+                _x = _x.reshape(1,-1)
+            return self._activation(_x @ self.w + self.b)
+
         # Convert input to numpy array if it's a list
         _x = np.array(x) if isinstance(x, list) else x
 
+        # Remember whether a single sample was given
+        single = not isinstance(_x, np.ndarray) or _x.ndim == 1
+
+        if self.fused :
+            # One fused affine + activation node per sample
+            if single :
+                return affine(_x, self.w, self.b[0], self.activation)
+            outs = np.empty(len(_x), dtype=object)
+            outs[:] = [ affine(row, self.w, self.b[0], self.activation) for row in _x ]
+            return outs
+
         # Reshape input if it's a 1D array
-        if isinstance(_x, np.ndarray) and _x.ndim == 1 :
-            _x = _x.reshape(1,-1)
+        if single :
+            _x = np.reshape(_x, (1,-1))
         
         # Compute the linear transformation
         z = np.dot(_x,self.w) + self.b
 
-
         # Apply the activation function
-        
-
-        return self._activation(z)
+        return self._activation(z[0] if single else z)
    
     def parameters(self) :
 
@@ -101,6 +340,12 @@ class Neuron :
             numpy.ndarray: Concatenated array of weights and bias.
         """
 
+        if self.tensor :
+            # Build the object array element-wise so numpy does not try to unpack the tensors
+            params = np.empty(2, dtype=object)
+            params[0], params[1] = self.w, self.b
+            return params
+
         # Return the parameters (weights and bias)
         return np.concatenate((self.w,self.b))
 
@@ -109,24 +354,106 @@ class Layer :
     """
     A class representing a layer of neurons in a neural network.
 
+    The weights of the layer are held as one (nin, nout) matrix and the biases as one (nout,) vector,
+    so a (batch, nin) input is transformed by a single matrix product. With tensor=True this is a
+    single matmul node followed by a single activation node.
+
     Attributes:
-        layer (numpy.ndarray): Array of neurons in the layer.
+        layer (numpy.ndarray): Array of neurons in the layer (scalar Value mode only).
+        w (numpy.ndarray or Tensor): Weight matrix of shape (nin, nout).
+        b (numpy.ndarray or Tensor): Bias vector of shape (nout,).
     """
 
-    def __init__(self,nin , nout , activation = 'tanh'):
+    def __init__(self,nin , nout , activation = 'tanh', tensor = False, fused = True, init = 'normal', rng = None):
 
         """
         Initialize a Layer object.
 
         Args:
-            nin (int): Number of input features.
+            nin (int): Number of input features, or None to infer it from the first input (lazy
+                initialization: the parameters are created by the first forward pass).
             nout (int): Number of neurons in the layer.
             activation (str): Activation function to use. Default is 'tanh'.
+            tensor (bool): Whether the neurons run on Tensor instead of scalar Value objects. Default is False.
+            fused (bool): Whether each output of a scalar Value layer is a single fused affine + activation node. Default is True.
+            init (str): The initialization scheme (see utils.initialize). Default is 'normal'.
+            rng: A numpy.random.Generator or a seed (default is the global numpy random state).
         """
 
-        # Create an array of neurons with specified input features and activation function
-        self.layer = np.array([ Neuron(nin,activation=activation) for _ in range(nout) ])
-        
+        self.nout = nout
+        self.activation = activation
+        self.tensor = tensor
+        self.fused = fused
+        self.init = init
+        self.rng = rng
+
+        if nin is not None :
+            self._initialize(nin)
+
+
+    def _initialize(self, nin):
+
+        """
+        Create the parameters of the layer for 'nin' input features.
+
+        The weights and biases of the whole layer are sampled as one (nin + 1, nout) array and, in
+        Value mode, wrapped into Value leaves in a single pass; the neurons share these Value
+        objects with the layer's weight matrix instead of sampling their own.
+        """
+
+        data = initialize(nin, self.nout, self.init, self.rng)
+        self._assign(data[:nin], data[nin])
+
+
+    def _assign(self, w, b):
+
+        """
+        Make the float arrays 'w' (nin, nout) and 'b' (nout,) the parameters of the layer.
+
+        Tensor parameters wrap the arrays without copying them when they already have the dtype of
+        the precision policy. In Value mode the weights and biases are wrapped into Value leaves in
+        a single pass, and the neurons share these Value objects with the layer's weight matrix.
+        """
+
+        nin = len(w)
+
+        if self.tensor :
+            # Hold the whole layer as one weight matrix and one bias vector
+            self.w = as_parameter(w)
+            self.b = as_parameter(b)
+            return
+
+        values = leaves(np.concatenate([ np.asarray(w), np.asarray(b).reshape(1, -1) ]))
+        self.w = values[:nin]
+        self.b = values[nin]
+
+        # The neurons view the columns of the layer's parameters (shared, not copied)
+        self.layer = np.empty(self.nout, dtype=object)
+        self.layer[:] = [ Neuron(nin, activation=self.activation, fused=self.fused, w=values[:nin, j], b=values[nin:, j])
+                          for j in range(self.nout) ]
+
+
+    @classmethod
+    def from_parameters(cls, w, b, activation = 'tanh', tensor = False, fused = True):
+
+        """
+        Build a layer around existing weights and biases, without sampling any parameters.
+
+        Args:
+            w (numpy.ndarray): Weight matrix of shape (nin, nout).
+            b (numpy.ndarray): Bias vector of shape (nout,).
+            activation (str): Activation function to use. Default is 'tanh'.
+            tensor (bool): Whether the layer runs on Tensor (which then wraps 'w' and 'b' without copying them).
+            fused (bool): Whether each output of a scalar Value layer is a single fused affine + activation node.
+
+        Returns:
+            Layer: The layer.
+        """
+
+        layer = cls(None, np.shape(w)[1], activation=activation, tensor=tensor, fused=fused)
+        layer._assign(w, b)
+        return layer
+
 
     def __call__(self , x):
 
@@ -134,16 +461,44 @@ class Layer :
         Compute the output of the layer given input data.
 
         Args:
-            xs (numpy.ndarray or list): Input data.
+            x (numpy.ndarray, list or Tensor): Input data, a single sample of shape (nin,) or a batch of shape (batch, nin).
 
         Returns:
-            numpy.ndarray: Output of the layer after applying the activation function.
+            numpy.ndarray or Tensor: Output of the layer after applying the activation function, of shape (nout,) or (batch, nout).
         """
 
-        # Apply each neuron in the layer to the input data
-        forward = np.vectorize(lambda n : n(x))
-        outs = forward(self.layer)
-        return outs
+        if not hasattr(self, 'w') :
+            # Lazy initialization: the number of input features is that of the first input. The
+            # parameters are created outside the graph of this forward pass, as plain leaves
+            with autograd.outside_graph() :
+                self._initialize(np.shape(x.data if isinstance(x, (Tensor, Dual)) else x)[-1])
+
+        if isinstance(x, Dual) :
+            # Forward-mode differentiation: the parameters are constants
+            return _activate(x @ _data(self.w) + _data(self.b), self.activation)
+
+        if not autograd._state.grad_enabled :
+            # Compute directly on the float data, without graph nodes
+            w = _data(self.w)
+            z = np.dot(_data_as(x, w.dtype), w) + _data(self.b)
+            return _activate_data(z, self.activation)
+
+        if self.tensor :
+            # One matmul node, one broadcast bias node and one activation node for the whole batch,
+            # in the dtype of the parameters
+            _x = _tensor_as(x, self.w.data.dtype)
+            return _activate(_x @ self.w + self.b, self.activation)
+
+        # Convert input to numpy array if it's a list
+        _x = np.array(x) if isinstance(x, list) else x
+
+        if self.fused :
+            # One fused node per (sample, neuron), stacked into (nout,) or (batch, nout)
+            return np.stack([ n(_x) for n in self.layer ], axis=-1)
+
+        # Apply the whole layer to the input data with one matrix product
+        z = np.dot(_x, self.w) + self.b
+        return _activate(z, self.activation)
     
     def parameters(self):
 
@@ -154,9 +509,576 @@ class Layer :
             numpy.ndarray: Concatenation of parameters of all neurons in the layer.
         """
 
+        if not hasattr(self, 'w') :
+            raise RuntimeError("the layer is lazily initialized: run a forward pass before reading its parameters")
+
+        if self.tensor :
+            # Build the object array element-wise so numpy does not try to unpack the tensors
+            params = np.empty(2, dtype=object)
+            params[0], params[1] = self.w, self.b
+            return params
+
         return np.concatenate([n.parameters() for n in self.layer])
 
 
+class Conv2d :
+
+    """
+    A 2D convolution layer over batches of images of shape (N, C_in, H, W).
+
+    The convolution runs on Tensor data through im2col, so the whole batch is one matrix product
+    in the forward pass and two in the backward pass (see microtorch.conv).
+
+    Attributes:
+        w (Tensor): Kernels of shape (out_channels, in_channels, kh, kw).
+        b (Tensor): Biases of shape (out_channels,), or None.
+    """
+
+    tensor = True
+
+    def __init__(self, in_channels, out_channels, kernel_size, stride=1, padding=0, dilation=1, activation='relu', bias=True,
+                 init='uniform', rng=None):
+
+        """
+        Initialize a Conv2d layer.
+
+        Args:
+            in_channels (int): Number of input channels.
+            out_channels (int): Number of output channels.
+            kernel_size: Size of the kernels, an int or a (height, width) pair.
+            stride: Step between windows, an int or a pair. Default is 1.
+            padding: Zero padding added on each side, an int or a pair. Default is 0.
+            dilation: Spacing between kernel elements, an int or a pair. Default is 1.
+            activation (str): Activation function to use. Default is 'relu'.
+            bias (bool): Whether to add a bias per output channel. Default is True.
+            init (str): The initialization scheme (see utils.initialize), over a fan-in of
+                in_channels * kernel size. Default is 'uniform'.
+            rng: A numpy.random.Generator or a seed (default is the global numpy random state).
+        """
+
+        kh, kw = conv._pair(kernel_size)
+        self.stride, self.padding, self.dilation = stride, padding, dilation
+        self.activation = activation
+
+        # 'uniform' scales the kernels by the fan-in so deep stacks of convolutions do not saturate
+        self.w, self.b = _kernels((out_channels, in_channels, kh, kw), bias, init, rng)
+
+
+    def _convolve(self, x, bias=True):
+        return conv.conv2d(x, self.w, self.b if bias else None, self.stride, self.padding, self.dilation)
+
+
+    def __call__(self, x):
+
+        """
+        Compute the output of the layer given input images.
+
+        Args:
+            x (numpy.ndarray or Tensor): Input of shape (N, in_channels, H, W).
+
+        Returns:
+            numpy.ndarray or Tensor: Output of shape (N, out_channels, OH, OW).
+        """
+
+        if isinstance(x, Dual) :
+            # Forward-mode differentiation: the convolution is linear in its input, so the tangent
+            # is the convolution of the tangent without the bias
+            with autograd.no_grad() :
+                z = Dual(self._convolve(x.data), _dual_linear(lambda t: self._convolve(t, bias=False), x))
+            return _activate(z, self.activation)
+
+        if not autograd._state.grad_enabled :
+            return _activate_data(self._convolve(_data_as(x, self.w.data.dtype)), self.activation)
+
+        return _activate(self._convolve(_tensor_as(x, self.w.data.dtype)), self.activation)
+
+
+    def parameters(self):
+
+        """
+        Get the parameters (kernels and biases) of the layer.
+
+        Returns:
+            numpy.ndarray: Object array of the parameter Tensors.
+        """
+
+        params = np.empty(1 if self.b is None else 2, dtype=object)
+        params[0] = self.w
+        if self.b is not None:
+            params[1] = self.b
+        return params
+
+
+class Conv1d(Conv2d) :
+
+    """
+    A 1D convolution layer over batches of sequences of shape (N, C_in, L).
+
+    Attributes:
+        w (Tensor): Kernels of shape (out_channels, in_channels, k).
+        b (Tensor): Biases of shape (out_channels,), or None.
+    """
+
+    def __init__(self, in_channels, out_channels, kernel_size, stride=1, padding=0, dilation=1, activation='relu', bias=True,
+                 init='uniform', rng=None):
+
+        """
+        Initialize a Conv1d layer.
+
+        Args:
+            in_channels (int): Number of input channels.
+            out_channels (int): Number of output channels.
+            kernel_size (int): Size of the kernels.
+            stride (int): Step between windows. Default is 1.
+            padding (int): Zero padding added on each side. Default is 0.
+            dilation (int): Spacing between kernel elements. Default is 1.
+            activation (str): Activation function to use. Default is 'relu'.
+            bias (bool): Whether to add a bias per output channel. Default is True.
+            init (str): The initialization scheme (see utils.initialize), over a fan-in of
+                in_channels * kernel size. Default is 'uniform'.
+            rng: A numpy.random.Generator or a seed (default is the global numpy random state).
+        """
+
+        self.stride, self.padding, self.dilation = stride, padding, dilation
+        self.activation = activation
+
+        self.w, self.b = _kernels((out_channels, in_channels, kernel_size), bias, init, rng)
+
+
+    def _convolve(self, x, bias=True):
+        return conv.conv1d(x, self.w, self.b if bias else None, self.stride, self.padding, self.dilation)
+
+
+class _Pool2d :
+
+    """
+    Base class of the pooling layers, which have no parameters.
+    """
+
+    tensor = True
+    activation = ''
+
+    def __init__(self, kernel_size, stride=None, padding=0, dilation=1):
+
+        """
+        Initialize a pooling layer.
+
+        Args:
+            kernel_size: Size of the windows, an int or a (height, width) pair.
+            stride: Step between windows, an int or a pair. Default is kernel_size.
+            padding: Padding added on each side, an int or a pair. Default is 0.
+            dilation: Spacing between window elements, an int or a pair. Default is 1.
+        """
+
+        self.kernel_size, self.stride, self.padding, self.dilation = kernel_size, stride, padding, dilation
+
+
+    def __call__(self, x):
+
+        """
+        Pool every channel of the input images.
+
+        Args:
+            x (numpy.ndarray or Tensor): Input of shape (N, C, H, W).
+
+        Returns:
+            numpy.ndarray or Tensor: Output of shape (N, C, OH, OW).
+        """
+
+        if isinstance(x, Dual) :
+            return self._dual(x)
+
+        if autograd._state.grad_enabled and not isinstance(x, Tensor) :
+            x = Tensor(x)
+        return self._pool(x, self.kernel_size, self.stride, self.padding, self.dilation)
+
+
+    def parameters(self):
+        return np.empty(0, dtype=object)
+
+
+class MaxPool2d(_Pool2d) :
+
+    """
+    A max pooling layer: the maximum of every window of every channel.
+    """
+
+    _pool = staticmethod(conv.max_pool2d)
+
+    def _dual(self, x):
+        # The tangent of every output is the tangent of the input element that is the maximum of its window
+        stride = self.kernel_size if self.stride is None else self.stride
+        _, cols, shape = conv._pool(x.data, self.kernel_size, stride, self.padding, self.dilation, -np.inf)
+        index = cols.argmax(axis=1)[:, None]
+
+        def pick(t):
+            _, tcols, tshape = conv._pool(t, self.kernel_size, stride, self.padding, self.dilation, 0.0)
+            return np.take_along_axis(tcols, np.tile(index, (len(tcols) // len(index), 1, 1)), axis=1).reshape(tshape)
+
+        return Dual(np.take_along_axis(cols, index, axis=1).reshape(shape), _dual_linear(pick, x))
+
+
+class AvgPool2d(_Pool2d) :
+
+    """
+    An average pooling layer: the mean of every window of every channel.
+    """
+
+    _pool = staticmethod(conv.avg_pool2d)
+
+    def _dual(self, x):
+        pool = lambda t: self._pool(t, self.kernel_size, self.stride, self.padding, self.dilation)
+        return Dual(pool(x.data), _dual_linear(pool, x))
+
+
+class Flatten :
+
+    """
+    A layer flattening every sample of a batch into a vector, e.g. between convolutions and dense layers.
+    """
+
+    tensor = True
+    activation = ''
+
+    def __call__(self, x):
+
+        """
+        Reshape an input of shape (N, ...) into (N, features).
+        """
+
+        return x.reshape(x.shape[0], -1)
+
+
+    def parameters(self):
+        return np.empty(0, dtype=object)
+
+
+class _Recurrent :
+
+    """
+    Base class of the recurrent layers, over batches of sequences of shape (N, T, input_size).
+
+    Every time step of the sequence is a single fused graph node with an analytic backward pass
+    (see microtorch.rnn), so a sequence of length T adds T + 1 nodes to the graph whatever the
+    hidden size. Variable-length batches are packed: the rows are sorted by length, and at every
+    time step only the rows that are still running are computed.
+
+    Attributes:
+        w_ih (Tensor): Input weights of shape (input_size, gates * hidden_size).
+        w_hh (Tensor): Recurrent weights of shape (hidden_size, gates * hidden_size).
+        b_ih, b_hh (Tensor): Biases of shape (gates * hidden_size,).
+        state (numpy.ndarray): The final state of the last call, as floats (detached from the graph).
+        stateful (bool): Whether a call without an explicit state starts from 'state' (used by
+            truncated_bptt to carry the state from one window to the next).
+        lengths (numpy.ndarray): Lengths used by calls that do not pass any (used by truncated_bptt).
+    """
+
+    tensor = True
+    activation = ''
+    kernel = None
+
+    def __init__(self, input_size, hidden_size, return_sequences=True, init='uniform', rng=None):
+
+        """
+        Initialize a recurrent layer.
+
+        Args:
+            input_size (int): Number of input features.
+            hidden_size (int): Number of hidden units.
+            return_sequences (bool): Whether to return the output of every time step, of shape
+                (N, T, hidden_size), or only the last output of every sequence, of shape (N, hidden_size).
+            init (str): The initialization scheme (see utils.initialize) of the input and the
+                recurrent weights, over a fan-in of input_size and hidden_size. Default is 'uniform'.
+            rng: A numpy.random.Generator or a seed (default is the global numpy random state).
+        """
+
+        gates, self.state_factor = rnn.KERNELS[self.kernel][2:]
+        self.hidden_size = hidden_size
+        self.return_sequences = return_sequences
+
+        # One generator for both draws, so a seed does not give the two matrices the same stream
+        rng = None if rng is None else np.random.default_rng(rng)
+        ih = initialize(input_size, gates * hidden_size, init, rng)
+        hh = initialize(hidden_size, gates * hidden_size, init, rng)
+        self.w_ih, self.b_ih = as_parameter(ih[:input_size]), as_parameter(ih[input_size])
+        self.w_hh, self.b_hh = as_parameter(hh[:hidden_size]), as_parameter(hh[hidden_size])
+
+        self.state = None
+        self.stateful = False
+        self.lengths = None
+
+
+    def __call__(self, x, state=None, lengths=None):
+
+        """
+        Run the layer over a batch of sequences.
+
+        Args:
+            x (numpy.ndarray or Tensor): Input of shape (N, T, input_size).
+            state (numpy.ndarray or Tensor): Initial state of shape (N, state_size) (default is
+                zeros, or the last state if the layer is stateful). For LSTM the state is the hidden
+                state and the cell state concatenated, of shape (N, 2 * hidden_size).
+            lengths (array-like): The length of every sequence, for batches padded to a common length.
+
+        Returns:
+            numpy.ndarray or Tensor: The outputs, of shape (N, T, hidden_size), or (N, hidden_size)
+            if return_sequences is False.
+        """
+
+        if isinstance(x, Dual) :
+            raise TypeError(f"{type(self).__name__} layers do not support forward-mode differentiation (Dual inputs); "
+                            "use jacobian(..., mode='reverse')")
+
+        tracked = autograd._state.grad_enabled
+        dtype = self.w_ih.data.dtype
+        x = _tensor_as(x, dtype) if tracked else _data_as(x, dtype)
+        n, steps = x.shape[0], x.shape[1]
+
+        if state is None and self.stateful and self.state is not None :
+            state = self.state
+        if state is None :
+            state = np.zeros((n, self.state_factor * self.hidden_size), dtype=dtype)
+
+        lengths = self.lengths if lengths is None else lengths
+        order = None
+        if lengths is not None :
+            # Pack the batch: sort the rows by decreasing length so the running rows are a prefix
+            lengths = np.asarray(lengths)
+            order = np.argsort(-lengths, kind='stable')
+            x, state = x[order], state[order]
+            batch_sizes = [ int(np.count_nonzero(lengths > t)) for t in range(steps) ]
+        else :
+            batch_sizes = [ n ] * steps
+
+        if tracked and not isinstance(state, Tensor) :
+            state = Tensor(state)
+
+        states = []
+        for t in range(steps) :
+            state = rnn.step(self.kernel, x, t, batch_sizes[t], state, self.w_ih, self.w_hh, self.b_ih, self.b_hh)
+            states.append(state)
+
+        if order is not None :
+            # Restore the original order of the rows
+            inverse = np.argsort(order)
+            state = state[inverse]
+        self.state = np.array(state.data if isinstance(state, Tensor) else state)
+
+        if not self.return_sequences :
+            return state[:, :self.hidden_size]
+
+        out = rnn.gather(states, self.hidden_size, batch_sizes)
+        return out if order is None else out[inverse]
+
+
+    def parameters(self):
+
+        """
+        Get the parameters of the layer.
+
+        Returns:
+            numpy.ndarray: Object array of the parameter Tensors.
+        """
+
+        params = np.empty(4, dtype=object)
+        params[:] = [ self.w_ih, self.w_hh, self.b_ih, self.b_hh ]
+        return params
+
+
+class RNN(_Recurrent) :
+
+    """
+    An Elman recurrent layer: h' = tanh(x w_ih + h w_hh + b_ih + b_hh).
+    """
+
+    kernel = 'rnn'
+
+
+class GRU(_Recurrent) :
+
+    """
+    A gated recurrent unit layer (reset, update and candidate gates, as in PyTorch).
+    """
+
+    kernel = 'gru'
+
+
+class LSTM(_Recurrent) :
+
+    """
+    A long short-term memory layer (input, forget, cell and output gates, as in PyTorch).
+    """
+
+    kernel = 'lstm'
+
+
+class Checkpoint :
+
+    """
+    A segment of consecutive layers whose internal graph is dropped after the forward pass and
+    recomputed during backward (gradient checkpointing).
+
+    Only the inputs and the outputs of the segment stay in the graph between forward and backward;
+    the intermediate nodes of its layers exist only while the segment's gradient is being computed.
+    This trades one extra forward pass of the segment for memory, and gives the same gradients.
+
+    Example:
+        self.layers = [ nn.Checkpoint(nn.Layer(8, 8), nn.Layer(8, 8)), nn.Layer(8, 1) ]
+    """
+
+    def __init__(self, *layers):
+
+        """
+        Initialize a Checkpoint segment.
+
+        Args:
+            layers: The layers of the segment, in the order they are applied.
+        """
+
+        self.layers = list(layers)
+        self.tensor = any(getattr(layer, 'tensor', False) for layer in self.layers)
+
+
+    def _forward(self, x):
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+
+    def __call__(self, x):
+
+        """
+        Compute the output of the segment given input data.
+
+        Args:
+            x (numpy.ndarray, list or Tensor): Input data.
+
+        Returns:
+            numpy.ndarray or Tensor: Output of the last layer of the segment.
+        """
+
+        if not autograd._state.grad_enabled or isinstance(x, Dual) :
+            return self._forward(x)
+
+        if self.tensor :
+            return Tensor.checkpoint(self._forward, x)
+
+        return checkpoint(self._forward, np.array(x) if isinstance(x, list) else x)
+
+
+    def parameters(self):
+
+        """
+        Get the parameters of the layers of the segment.
+
+        Returns:
+            numpy.ndarray: Concatenation of the parameters of all the layers.
+        """
+
+        return np.concatenate([ layer.parameters() for layer in self.layers ])
+
+
+def _graph_bytes(layer, batch_size):
+
+    """
+    Estimate the memory held by the graph of one layer's forward pass over a batch.
+    """
+
+    nin, nout = np.shape(layer.w)
+    if layer.tensor :
+        # A handful of (batch, nout) data and gradient arrays
+        return batch_size * nout * 48
+    # One fused node per output, holding its weights and inputs as operands
+    return batch_size * nout * (300 + 16 * nin)
+
+
+def checkpoint_sequential(layers, segments=None, memory_budget=None, batch_size=1):
+
+    """
+    Group consecutive layers into Checkpoint segments.
+
+    Either split the layers into 'segments' segments of (nearly) equal length, or fill each
+    segment with as many layers as fit in 'memory_budget', the number of bytes the graph of one
+    segment may hold during its recomputation. Peak memory is then about the budget plus the
+    segment boundaries. With neither argument, about sqrt(len(layers)) segments are used.
+
+    Args:
+        layers (list): The layers, in the order they are applied.
+        segments (int): The number of segments.
+        memory_budget (int): Bytes allowed for the graph of one segment.
+        batch_size (int): The batch size used to estimate the memory of a layer's graph.
+
+    Returns:
+        list: The Checkpoint segments, to be used as the layers of a Model.
+    """
+
+    layers = list(layers)
+
+    if memory_budget is not None :
+        groups = [[]]
+        used = 0
+        for layer in layers :
+            size = _graph_bytes(layer, batch_size)
+            if groups[-1] and used + size > memory_budget :
+                groups.append([])
+                used = 0
+            groups[-1].append(layer)
+            used += size
+    else :
+        segments = segments or max(1, int(round(np.sqrt(len(layers)))))
+        bounds = np.linspace(0, len(layers), min(segments, len(layers)) + 1).round().astype(int)
+        groups = [ layers[start:stop] for start, stop in zip(bounds[:-1], bounds[1:]) ]
+
+    return [ Checkpoint(*group) for group in groups ]
+
+
+def truncated_bptt(model, xs, ys, loss, window, lengths=None, optimizer=None):
+
+    """
+    Train a recurrent model on long sequences with truncated backpropagation through time.
+
+    The sequences are cut into windows of 'window' time steps. Each window runs forward from the
+    final state of the previous window (carried as plain floats, so no gradient flows across
+    windows), its loss is backpropagated and its graph released before the next window starts, so
+    memory grows with the window rather than with the whole sequence.
+
+    Args:
+        model (Model): A model whose recurrent layers return sequences.
+        xs (numpy.ndarray): Inputs of shape (N, T, input_size).
+        ys (numpy.ndarray): Targets of shape (N, T, ...), aligned with the inputs.
+        loss (callable): A loss with the signature loss(y_true, y_pred), e.g. Loss.MSELoss.
+        window (int): Number of time steps per window.
+        lengths (array-like): The length of every sequence, for padded variable-length batches.
+        optimizer (Optimizer): If given, zero_grad and step are called around every window;
+            otherwise the gradients of all the windows accumulate.
+
+    Returns:
+        list: The loss of every window.
+    """
+
+    recurrent = [ layer for layer in model.layers if isinstance(layer, _Recurrent) ]
+    saved = [ (layer.stateful, layer.lengths) for layer in recurrent ]
+    for layer in recurrent :
+        layer.state, layer.stateful = None, True
 
+    losses = []
+    try :
+        for start in range(0, xs.shape[1], window) :
+            if lengths is not None :
+                # Steps left in this window for every sequence
+                for layer in recurrent :
+                    layer.lengths = np.clip(np.asarray(lengths) - start, 0, window)
 
+            if optimizer is not None :
+                optimizer.zero_grad()
+            value = loss(ys[:, start:start + window], model(xs[:, start:start + window]))
+            # The window's graph is not needed afterwards: release it as the sweep goes
+            value.backward(retain_graph=False)
+            if optimizer is not None :
+                optimizer.step()
+            losses.append(float(value.data))
+    finally :
+        for layer, (stateful, layer_lengths) in zip(recurrent, saved) :
+            layer.stateful, layer.lengths = stateful, layer_lengths
 
+    return losses
@@ -0,0 +1,248 @@
+import multiprocessing as mp
+import traceback
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from microtorch.utils import ParameterBuffer
+
+
+class _RemoteTraceback(Exception) :
+
+    """
+    The formatted traceback of an exception raised in a worker, chained to the exception re-raised in the parent.
+    """
+
+    def __init__(self, tb):
+        self.tb = tb
+
+    def __str__(self):
+        return self.tb
+
+
+def _worker(rank, model, loss_fn, conn, params_name, grads_name, size, workers):
+
+    """
+    Worker process loop: run forward/backward on a shard with a replica of the model.
+
+    Parameters are read from the shared parameter buffer before every step and the gradients of
+    the shard are written to this worker's row of the shared gradient buffer, so no Value or
+    Tensor object ever crosses the process boundary. Every step answers ('ok', loss), or
+    ('error', exception, traceback) if the step raised, and the worker keeps serving.
+    """
+
+    params_shm = shared_memory.SharedMemory(name=params_name)
+    grads_shm = shared_memory.SharedMemory(name=grads_name)
+    try:
+        params = np.ndarray((size, ), dtype=np.float64, buffer=params_shm.buf)
+        grads = np.ndarray((workers, size), dtype=np.float64, buffer=grads_shm.buf)
+        buffer = ParameterBuffer(model.parameters())
+
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            xs, ys = message
+
+            try:
+                # Pull the broadcast parameters into the replica and clear its gradients
+                buffer.data[:] = params
+                buffer.push_data()
+                buffer.zero_grad()
+
+                loss = loss_fn(ys, model(xs))
+                loss.backward()
+
+                # Publish the shard gradients through shared memory
+                buffer.pull_grad()
+                grads[rank] = buffer.grad
+            except Exception as e:
+                tb = traceback.format_exc()
+                try:
+                    conn.send(('error', e, tb))
+                except Exception:
+                    # The exception itself cannot be pickled
+                    conn.send(('error', RuntimeError(f"{type(e).__name__}: {e}"), tb))
+                continue
+            conn.send(('ok', float(np.sum(loss.data))))
+    finally:
+        params_shm.close()
+        grads_shm.close()
+
+
+def _shutdown(conns, processes, shms):
+
+    """
+    Stop the worker processes and release the shared memory (run once, by close or when the trainer is collected).
+    """
+
+    for conn in conns:
+        try:
+            conn.send(None)
+        except (OSError, ValueError):
+            # The worker is already gone
+            pass
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    for shm in shms:
+        shm.unlink()
+        try:
+            shm.close()
+        except BufferError:
+            # Arrays over the buffer are still referenced; the mapping goes with them
+            pass
+
+
+class DataParallelTrainer :
+
+    """
+    A trainer that shards every mini-batch across worker processes holding replicas of a Model.
+
+    Each worker runs forward and backward on its shard and writes only its parameter gradients to
+    a shared-memory buffer. The parent reduces them (weighted by shard size, so the result equals
+    the gradient of the full batch for a mean loss such as MSELoss), loads them into its own model
+    and applies them with the optimizer. Updated parameters are broadcast back to the workers
+    through a second shared-memory buffer.
+
+    An exception raised in a worker is re-raised by step, with the worker's traceback as its
+    cause. The workers and the shared memory are released by close (or leaving the 'with' block),
+    or when the trainer is garbage collected.
+
+    Example:
+        optimizer = Optimizers.SGD(n.parameters, 0.2)
+        with DataParallelTrainer(n, Loss.MSELoss, optimizer, workers=4) as trainer:
+            for epoch in range(epochs):
+                loss = trainer.step(xs, ys)
+    """
+
+    def __init__(self, model, loss_fn, optimizer, workers=2):
+
+        """
+        Start the worker processes.
+
+        Args:
+            model (Model): The model to train; every worker gets a replica of it.
+            loss_fn (callable): A loss with the signature loss_fn(y_true, y_pred), e.g. Loss.MSELoss.
+            optimizer: An optimizer over the parameters of 'model', e.g. Optimizers.SGD.
+            workers (int): The number of worker processes.
+        """
+
+        self.model = model
+        self.optimizer = optimizer
+        self.workers = workers
+
+        # Share the optimizer's flat buffer when it has one, so both see the same layout
+        self.buffer = optimizer.buffer if isinstance(getattr(optimizer, 'buffer', None), ParameterBuffer) else ParameterBuffer(model.parameters())
+        self.size = self.buffer.size
+
+        # Shared buffers: one parameter vector and one gradient row per worker
+        self._params_shm = shared_memory.SharedMemory(create=True, size=max(self.size, 1) * 8)
+        self._grads_shm = shared_memory.SharedMemory(create=True, size=max(self.size * workers, 1) * 8)
+        self._params = np.ndarray((self.size, ), dtype=np.float64, buffer=self._params_shm.buf)
+        self._grads = np.ndarray((workers, self.size), dtype=np.float64, buffer=self._grads_shm.buf)
+
+        # Fork where available so the replicas are inherited rather than pickled
+        context = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else mp.get_context()
+
+        self._conns = []
+        self._processes = []
+        for rank in range(workers):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(rank, model, loss_fn, child_conn, self._params_shm.name, self._grads_shm.name, self.size, workers),
+                daemon=True,
+            )
+            process.start()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+
+        self._finalizer = weakref.finalize(self, _shutdown, list(self._conns), list(self._processes), [ self._params_shm, self._grads_shm ])
+
+
+    def step(self, xs, ys):
+
+        """
+        Run one data-parallel training step on a mini-batch.
+
+        Args:
+            xs (numpy.ndarray or list): Input batch of shape (batch, nin).
+            ys (numpy.ndarray or list): Targets of shape (batch,).
+
+        Returns:
+            float: The loss of the full mini-batch (the shard losses weighted by shard size).
+        """
+
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+
+        # Broadcast the current parameters
+        self.buffer.pull_data()
+        self._params[:] = self.buffer.data
+
+        # Shard the batch; empty shards (batch smaller than the pool) are skipped
+        shards = [ s for s in np.array_split(np.arange(len(xs)), self.workers) if len(s) ]
+        for conn, shard in zip(self._conns, shards):
+            conn.send((xs[shard], ys[shard]))
+
+        weights = np.array([ len(s) for s in shards ], dtype=np.float64) / len(xs)
+        losses = np.array(self._receive(len(shards)))
+
+        # All-reduce: the weighted sum of the shard gradients is the full-batch gradient
+        self.buffer.grad[:] = weights @ self._grads[:len(shards)]
+        self.buffer.push_grad()
+
+        self.optimizer.step()
+
+        return float(weights @ losses)
+
+
+    def _receive(self, count):
+
+        """
+        Collect the shard losses of the first 'count' workers, re-raising the first worker exception.
+
+        Every worker is read before raising, so the pipes stay in step for the next call.
+        """
+
+        losses, error = [], None
+        for rank, conn in enumerate(self._conns[:count]):
+            try:
+                message = conn.recv()
+            except EOFError:
+                message = ('error', RuntimeError(f"worker {rank} exited with code {self._processes[rank].exitcode}"), None)
+            if message[0] == 'ok':
+                losses.append(message[1])
+            elif error is None:
+                error = message
+
+        if error is not None:
+            _, exc, tb = error
+            if tb is not None:
+                raise exc from _RemoteTraceback(tb)
+            raise exc
+        return losses
+
+
+    def close(self):
+
+        """
+        Stop the worker processes and release the shared memory.
+        """
+
+        self._params = self._grads = None
+        self._finalizer()
+        self._conns, self._processes = [], []
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,219 @@
+import numpy as np
+
+from microtorch.Tensor import Tensor
+
+
+class Policy :
+
+    """
+    A dtype policy for Tensor models.
+
+    'dtype' is the storage of the parameters and therefore of the activations and gradients of the
+    layers that own them (each layer computes in the dtype of its parameters). 'master_dtype', if
+    set, is the dtype of the optimizer's copy of the parameters and of its state (momentum, moving
+    averages): the update is computed in that precision and the result is rounded back into the
+    parameters, so small updates are not lost to float32 rounding.
+
+    Scalar Value models are not affected: a Value holds a Python float, which is always float64.
+
+    Attributes:
+        dtype (numpy.dtype): Parameters, activations and gradients.
+        master_dtype (numpy.dtype): Optimizer master weights and state, or None for 'dtype'.
+    """
+
+    def __init__(self, dtype='float64', master_dtype=None):
+
+        """
+        Initialize a Policy.
+
+        Args:
+            dtype: The dtype of the parameters, activations and gradients.
+            master_dtype: The dtype of the optimizer master weights and state (default is 'dtype').
+        """
+
+        self.dtype = np.dtype(dtype)
+        self.master_dtype = None if master_dtype is None else np.dtype(master_dtype)
+
+
+    def __repr__(self):
+        return f"Policy(dtype={self.dtype.name}, master_dtype={None if self.master_dtype is None else self.master_dtype.name})"
+
+
+# Named policies
+POLICIES = {
+    'float64': Policy('float64'),
+    'float32': Policy('float32'),
+    'mixed': Policy('float32', master_dtype='float64'),
+}
+
+# The global policy, used by layers created without a policy of their own. It is process-wide,
+# not per thread: set it before starting threads that build layers or optimizers
+_policy = POLICIES['float64']
+
+
+def _as_policy(policy):
+    return POLICIES[policy] if isinstance(policy, str) else policy
+
+
+def get_policy():
+
+    """
+    Return the global dtype policy.
+
+    The policy is shared by all the threads of the process.
+    """
+
+    return _policy
+
+
+def set_policy(policy):
+
+    """
+    Set the global dtype policy, used by the layers created afterwards and by the optimizers.
+
+    Args:
+        policy (Policy or str): A Policy, or 'float64', 'float32' or 'mixed'.
+
+    The policy is process-wide: it also applies to the layers and optimizers created by other
+    threads.
+    """
+
+    global _policy
+    _policy = _as_policy(policy)
+
+
+class policy :
+
+    """
+    Context manager that sets the global dtype policy inside a block.
+
+    Like set_policy it is process-wide, so other threads see the policy while the block runs.
+
+    Example:
+        with precision.policy('mixed'):
+            n = nn.Sequential(nn.Layer(3, 16, tensor=True), nn.Layer(16, 1, tensor=True))
+    """
+
+    def __init__(self, policy):
+        self._new = _as_policy(policy)
+
+    def __enter__(self):
+        global _policy
+        self._previous = _policy
+        _policy = self._new
+        return self._new
+
+    def __exit__(self, *exc):
+        global _policy
+        _policy = self._previous
+        return False
+
+
+def cast(module, policy):
+
+    """
+    Apply a dtype policy to an existing model or layer (a per-module policy).
+
+    The Tensor parameters of 'module' are converted to the policy's dtype, so the module computes
+    its activations and gradients in that dtype while the rest of the model keeps its own.
+
+    Cast before building the optimizer: the optimizer's buffer then picks its dtype from the cast
+    parameters. Parameters already registered with an optimizer are recast through its buffer,
+    which keeps them in step with the optimizer but copies them in and out of the buffer on every
+    step (like the float32 parameters of the 'mixed' policy).
+
+    Args:
+        module: A Model or a layer.
+        policy (Policy or str): The policy.
+
+    Returns:
+        The module.
+    """
+
+    dtype = _as_policy(policy).dtype
+    for p in module.parameters():
+        if not isinstance(p, Tensor) or p.data.dtype == dtype:
+            continue
+        buffer = p._buffer() if getattr(p, '_buffer', None) is not None else None
+        if buffer is not None:
+            buffer.recast(p, dtype)
+        else:
+            p.data = p.data.astype(dtype)
+            p.grad = np.zeros_like(p.data)
+    return module
+
+
+class LossScaler :
+
+    """
+    Dynamic loss scaling for low-precision gradients.
+
+    The loss is multiplied by a large factor before backward so that small gradients do not
+    underflow in the low-precision dtype, and the gradients are divided by the same factor before
+    the optimizer step. If any gradient overflowed (inf or nan) the step is skipped and the scale
+    is reduced; after 'growth_interval' steps without overflow the scale is increased again.
+
+    Example:
+        scaler = precision.LossScaler()
+        loss = Loss.MSELoss(ys, n(xs))
+        optimizer.zero_grad()
+        scaler.scale(loss).backward()
+        scaler.step(optimizer)
+
+    Attributes:
+        scale_factor (float): The current scale.
+        skipped (int): Number of steps skipped because of an overflow.
+    """
+
+    def __init__(self, init_scale=2.0 ** 16, growth_factor=2.0, backoff_factor=0.5, growth_interval=2000):
+
+        """
+        Initialize a LossScaler.
+
+        Args:
+            init_scale (float): The initial scale.
+            growth_factor (float): Factor applied to the scale after 'growth_interval' good steps.
+            backoff_factor (float): Factor applied to the scale after an overflow.
+            growth_interval (int): Number of consecutive steps without overflow before growing.
+        """
+
+        self.scale_factor = float(init_scale)
+        self.growth_factor = growth_factor
+        self.backoff_factor = backoff_factor
+        self.growth_interval = growth_interval
+        self.skipped = 0
+        self._good_steps = 0
+
+
+    def scale(self, loss):
+
+        """
+        Return the loss multiplied by the current scale, to call backward on.
+        """
+
+        return loss * self.scale_factor
+
+
+    def step(self, optimizer):
+
+        """
+        Unscale the gradients and run the optimizer step, unless a gradient overflowed.
+
+        Args:
+            optimizer (Optimizer): The optimizer.
+
+        Returns:
+            bool: Whether the step was taken.
+        """
+
+        if not optimizer.step(grad_scale=self.scale_factor):
+            self.scale_factor *= self.backoff_factor
+            self._good_steps = 0
+            self.skipped += 1
+            return False
+
+        self._good_steps += 1
+        if self._good_steps >= self.growth_interval:
+            self.scale_factor *= self.growth_factor
+            self._good_steps = 0
+        return True
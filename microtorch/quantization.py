@@ -0,0 +1,336 @@
+import copy
+
+import numpy as np
+
+from microtorch import autograd, nn
+
+# Signed 8-bit range of the quantized weights and activations
+_QMIN, _QMAX = -128, 127
+
+# Longest reduction computed in one float32 product: every product of two int8 values is at most
+# 128 * 128 in magnitude, so partial sums of 1024 of them stay below 2 ** 24 and are exact in float32
+_BLOCK = 1024
+
+
+def quantize_params(x, axis=None):
+
+    """
+    Compute the affine int8 quantization parameters of a float array.
+
+    A float r is represented by the integer q = round(r / scale) + zero_point, clipped to
+    [-128, 127], and recovered as scale * (q - zero_point). The range is widened to contain 0 so
+    that zero (padding, ReLU outputs) is represented exactly.
+
+    Args:
+        x (numpy.ndarray): The values to represent.
+        axis (int): Axis along which every slice gets its own parameters (e.g. 0 for one scale per
+            output column of a (nin, nout) weight matrix), or None for a single pair.
+
+    Returns:
+        tuple: The scale (float64) and the zero point (int32), scalars or arrays over the kept axis.
+    """
+
+    reduce = None if axis is None else tuple(i for i in range(x.ndim) if i != axis)
+    lo = np.minimum(np.min(x, axis=reduce), 0.0)
+    hi = np.maximum(np.max(x, axis=reduce), 0.0)
+    return _params_from_range(lo, hi)
+
+
+def _params_from_range(lo, hi):
+    scale = (np.asarray(hi, dtype=np.float64) - lo) / (_QMAX - _QMIN)
+    scale = np.where(scale > 0, scale, 1.0)
+    zero_point = np.clip(np.round(_QMIN - lo / scale), _QMIN, _QMAX).astype(np.int32)
+    return scale, zero_point
+
+
+def quantize_array(x, scale, zero_point):
+
+    """
+    Quantize a float array to int8 with the given (broadcastable) scale and zero point.
+    """
+
+    return np.clip(np.round(x / scale) + zero_point, _QMIN, _QMAX).astype(np.int8)
+
+
+def dequantize_array(q, scale, zero_point):
+
+    """
+    Map an int8 array back to floats with the given (broadcastable) scale and zero point.
+    """
+
+    return scale * (q.astype(np.int32) - zero_point)
+
+
+def int8_matmul(a, b):
+
+    """
+    Multiply two int8 matrices with int32 accumulation.
+
+    NumPy has no int8 matrix kernel (its integer matmul does not use BLAS and is about ten times
+    slower than a float product), so the product is computed with float32 BLAS over blocks of
+    the reduction axis short enough for every partial sum to be an exact integer, and the blocks
+    are accumulated in int32. The result is identical to an int32 matmul of the int8 inputs.
+
+    Args:
+        a (numpy.ndarray): int8 matrix of shape (batch, k).
+        b (numpy.ndarray): int8 matrix of shape (k, n).
+
+    Returns:
+        numpy.ndarray: The int32 product, of shape (batch, n).
+    """
+
+    k = a.shape[1]
+    acc = None
+    for start in range(0, k, _BLOCK):
+        part = (a[:, start:start + _BLOCK].astype(np.float32) @ b[start:start + _BLOCK].astype(np.float32)).astype(np.int32)
+        acc = part if acc is None else acc + part
+    return acc
+
+
+class QuantizedLayer :
+
+    """
+    An inference-only int8 version of a Layer.
+
+    The weights are stored as int8 with one scale and zero point per output neuron (per column of
+    the weight matrix), a quarter of the bytes of float32 weights and an eighth of float64. At run
+    time the input is quantized to int8 per tensor, with the range found by calibration or, without
+    calibration, with the range of the batch itself (dynamic quantization). The int8 product is
+    accumulated in int32, corrected for the zero points, dequantized with the product of the two
+    scales, and the float bias and the activation of the layer are applied.
+
+    Attributes:
+        qw (numpy.ndarray): The int8 weights, of shape (nin, nout).
+        w_scale (numpy.ndarray): The weight scales, of shape (nout,).
+        w_zero_point (numpy.ndarray): The weight zero points, of shape (nout,).
+        b (numpy.ndarray): The float biases, of shape (nout,).
+        x_scale (float): The input scale, or None for dynamic quantization.
+        x_zero_point (int): The input zero point, or None for dynamic quantization.
+    """
+
+    # Quantized layers never build graph nodes
+    tensor = False
+
+    def __init__(self, layer, input_range=None):
+
+        """
+        Quantize the parameters of a trained Layer.
+
+        Args:
+            layer (Layer): The float layer.
+            input_range (tuple): The (min, max) of the inputs of the layer seen during calibration,
+                or None to quantize every input batch with its own range.
+        """
+
+        w = nn._data(layer.w).astype(np.float64)
+        self.activation = layer.activation
+        self.b = nn._data(layer.b).astype(np.float64)
+
+        self.w_scale, self.w_zero_point = quantize_params(w, axis=1)
+        self.qw = quantize_array(w, self.w_scale, self.w_zero_point)
+
+        # Zero-point correction of the weights: sum over the inputs of every int8 weight column
+        self._qw_sums = self.qw.astype(np.int32).sum(axis=0)
+
+        self.x_scale = self.x_zero_point = None
+        if input_range is not None:
+            self.x_scale, self.x_zero_point = _params_from_range(min(input_range[0], 0.0), max(input_range[1], 0.0))
+            self.x_scale, self.x_zero_point = float(self.x_scale), int(self.x_zero_point)
+
+
+    @property
+    def nbytes(self):
+
+        """
+        The size of the parameters in bytes (int8 weights plus float scales, zero points and biases).
+        """
+
+        return self.qw.nbytes + self.w_scale.nbytes + self.w_zero_point.nbytes + self.b.nbytes
+
+
+    def weight_error(self, layer):
+
+        """
+        Return the largest absolute difference between the float weights of 'layer' and the dequantized weights.
+        """
+
+        return float(np.abs(dequantize_array(self.qw, self.w_scale, self.w_zero_point) - nn._data(layer.w)).max())
+
+
+    def __call__(self, x):
+
+        """
+        Compute the output of the layer for float inputs.
+
+        Args:
+            x (numpy.ndarray, list or Tensor): A single sample of shape (nin,) or a batch of shape (batch, nin).
+
+        Returns:
+            numpy.ndarray: The float output, of shape (nout,) or (batch, nout).
+        """
+
+        x = nn._data(x)
+        single = x.ndim == 1
+        x = x.reshape(1, -1) if single else x
+
+        if self.x_scale is None:
+            x_scale, x_zero_point = quantize_params(x)
+        else:
+            x_scale, x_zero_point = self.x_scale, self.x_zero_point
+        qx = quantize_array(x, x_scale, x_zero_point)
+
+        # sum_k (qx - zx) (qw - zw) = qx @ qw - zw * sum_k qx - zx * sum_k qw + k * zx * zw
+        acc = int8_matmul(qx, self.qw)
+        acc -= self.w_zero_point * qx.astype(np.int32).sum(axis=1, keepdims=True)
+        acc -= x_zero_point * self._qw_sums
+        acc += len(self.qw) * x_zero_point * self.w_zero_point
+
+        z = (x_scale * self.w_scale) * acc + self.b
+        out = nn._activate_data(z, self.activation)
+        return out[0] if single else out
+
+
+    def parameters(self):
+
+        """
+        Quantized layers have no trainable parameters.
+        """
+
+        return np.array([], dtype=object)
+
+
+class _Observer :
+
+    """
+    Stand-in for a layer during calibration: records the range of its inputs and calls the layer.
+    """
+
+    def __init__(self, layer):
+        self.layer = layer
+        self.tensor = getattr(layer, 'tensor', False)
+        self.lo, self.hi = np.inf, -np.inf
+
+    def __call__(self, x):
+        data = nn._data(x)
+        self.lo = min(self.lo, float(data.min()))
+        self.hi = max(self.hi, float(data.max()))
+        return self.layer(x)
+
+    def parameters(self):
+        return self.layer.parameters()
+
+
+def _replace_layers(model, layers):
+
+    """
+    Return a shallow copy of 'model' whose 'layers' are replaced, keeping the container type (list or object array).
+    """
+
+    out = copy.copy(model)
+    if isinstance(model.layers, np.ndarray):
+        out.layers = np.empty(len(layers), dtype=object)
+        out.layers[:] = layers
+    else:
+        out.layers = list(layers)
+    return out
+
+
+def calibrate(model, xs, batch_size=256):
+
+    """
+    Run sample inputs through a float model and record the input range of every Layer.
+
+    Args:
+        model (Model): The float model; its forward pass must apply the layers of 'model.layers'.
+        xs (array-like): Representative inputs, of shape (samples, nin).
+        batch_size (int): Number of samples per forward pass.
+
+    Returns:
+        list: The (min, max) input range of every layer of the model, None for the other layers.
+    """
+
+    observers = [ _Observer(layer) if isinstance(layer, nn.Layer) else layer for layer in model.layers ]
+    observed = _replace_layers(model, observers)
+
+    xs = nn._data(xs)
+    with autograd.no_grad():
+        for start in range(0, len(xs), batch_size):
+            observed(xs[start:start + batch_size])
+
+    return [ (o.lo, o.hi) if isinstance(o, _Observer) else None for o in observers ]
+
+
+def quantize(model, calibration=None, batch_size=256):
+
+    """
+    Convert the Layers of a trained model to int8 for inference (post-training quantization).
+
+    Every nn.Layer of 'model.layers' is replaced by a QuantizedLayer with per-output-channel int8
+    weights; other layers (convolutions, pooling, ...) are kept in float. With calibration data,
+    the input range of every layer is measured once and the activations are quantized with fixed
+    parameters (static quantization); without it, every input batch is quantized with its own
+    range (dynamic quantization). The float model is left unchanged.
+
+    Example:
+        q = quantization.quantize(n, calibration=xs_train[:1000])
+        print(quantization.drift_report(n, q, xs_test, ys_test))
+        y = q.predict(x)
+
+    Args:
+        model (Model): The trained float model.
+        calibration (array-like): Representative inputs, of shape (samples, nin) (optional).
+        batch_size (int): Number of calibration samples per forward pass.
+
+    Returns:
+        Model: A copy of the model running the quantized layers (use predict or a no_grad block).
+    """
+
+    ranges = calibrate(model, calibration, batch_size) if calibration is not None else [ None ] * len(model.layers)
+    layers = [ QuantizedLayer(layer, r) if isinstance(layer, nn.Layer) else layer for layer, r in zip(model.layers, ranges) ]
+    return _replace_layers(model, layers)
+
+
+def drift_report(model, quantized, xs, ys=None):
+
+    """
+    Compare the outputs of a quantized model with those of the float model it was made from.
+
+    Args:
+        model (Model): The float model.
+        quantized (Model): The model returned by quantize(model, ...).
+        xs (array-like): Evaluation inputs, of shape (samples, nin).
+        ys (array-like): Targets (optional): class indices for multi-output models, or values
+            for single-output models, whose sign is compared with the prediction (as in the demo).
+
+    Returns:
+        dict: The largest and mean absolute output difference, the relative error of the outputs,
+        the fraction of samples whose predicted class (or sign) is unchanged, the float and
+        quantized accuracy against 'ys' if given, the largest weight error of every layer and the
+        parameter bytes of both models.
+    """
+
+    reference = np.asarray(model.predict(xs), dtype=np.float64)
+    outputs = np.asarray(quantized.predict(xs), dtype=np.float64)
+    diff = np.abs(outputs - reference)
+
+    def decide(out):
+        return out.argmax(axis=-1) if out.ndim == 2 else np.sign(out)
+
+    report = {
+        'max_abs_error': float(diff.max()),
+        'mean_abs_error': float(diff.mean()),
+        'relative_error': float(np.linalg.norm(outputs - reference) / max(np.linalg.norm(reference), 1e-300)),
+        'agreement': float(np.mean(decide(outputs) == decide(reference))),
+    }
+
+    if ys is not None:
+        ys = np.asarray(ys)
+        truth = ys if reference.ndim == 2 else np.sign(ys)
+        report['float_accuracy'] = float(np.mean(decide(reference) == truth))
+        report['quantized_accuracy'] = float(np.mean(decide(outputs) == truth))
+
+    report['weight_errors'] = [ q.weight_error(layer) for layer, q in zip(model.layers, quantized.layers) if isinstance(q, QuantizedLayer) ]
+    report['float_bytes'] = sum(nn._data(p).nbytes for layer in model.layers for p in layer.parameters())
+    report['quantized_bytes'] = sum(q.nbytes if isinstance(q, QuantizedLayer) else sum(nn._data(p).nbytes for p in q.parameters())
+                                    for q in quantized.layers)
+    return report
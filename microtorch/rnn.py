@@ -0,0 +1,191 @@
+import numpy as np
+
+from microtorch import autograd
+from microtorch.Tensor import Tensor
+
+
+def _sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+# Time-step kernels. Each one has a forward function
+#     forward(x, s, w_ih, w_hh, b_ih, b_hh) -> (new state, cache)
+# over the rows of the batch that are still running, and a backward function
+#     backward(cache, g) -> (dx, ds, dw_ih, dw_hh, db_ih, db_hh)
+# giving the gradients of the step from the gradient 'g' of the new state.
+
+def _rnn_forward(x, s, w_ih, w_hh, b_ih, b_hh):
+    h = np.tanh(x @ w_ih + s @ w_hh + b_ih + b_hh)
+    return h, (x, s, w_ih, w_hh, h)
+
+def _rnn_backward(cache, g):
+    x, s, w_ih, w_hh, h = cache
+    da = g * (1 - h ** 2)
+    db = da.sum(axis=0)
+    return da @ w_ih.T, da @ w_hh.T, x.T @ da, s.T @ da, db, db
+
+
+def _gru_forward(x, s, w_ih, w_hh, b_ih, b_hh):
+    n_h = s.shape[1]
+    gi = x @ w_ih + b_ih
+    gh = s @ w_hh + b_hh
+    r = _sigmoid(gi[:, :n_h] + gh[:, :n_h])
+    z = _sigmoid(gi[:, n_h:2 * n_h] + gh[:, n_h:2 * n_h])
+    n = np.tanh(gi[:, 2 * n_h:] + r * gh[:, 2 * n_h:])
+    h = (1 - z) * n + z * s
+    return h, (x, s, w_ih, w_hh, gh[:, 2 * n_h:], r, z, n)
+
+def _gru_backward(cache, g):
+    x, s, w_ih, w_hh, hn, r, z, n = cache
+    dan = g * (1 - z) * (1 - n ** 2)
+    dar = dan * hn * r * (1 - r)
+    daz = g * (s - n) * z * (1 - z)
+    dgi = np.concatenate([dar, daz, dan], axis=1)
+    dgh = np.concatenate([dar, daz, dan * r], axis=1)
+    ds = dgh @ w_hh.T + g * z
+    return dgi @ w_ih.T, ds, x.T @ dgi, s.T @ dgh, dgi.sum(axis=0), dgh.sum(axis=0)
+
+
+def _lstm_forward(x, s, w_ih, w_hh, b_ih, b_hh):
+    # The state holds the hidden state and the cell state side by side: s = [h, c]
+    n_h = s.shape[1] // 2
+    h, c = s[:, :n_h], s[:, n_h:]
+    a = x @ w_ih + h @ w_hh + b_ih + b_hh
+    i = _sigmoid(a[:, :n_h])
+    f = _sigmoid(a[:, n_h:2 * n_h])
+    gg = np.tanh(a[:, 2 * n_h:3 * n_h])
+    o = _sigmoid(a[:, 3 * n_h:])
+    c_new = f * c + i * gg
+    tc = np.tanh(c_new)
+    return np.concatenate([o * tc, c_new], axis=1), (x, h, c, w_ih, w_hh, i, f, gg, o, tc)
+
+def _lstm_backward(cache, g):
+    x, h, c, w_ih, w_hh, i, f, gg, o, tc = cache
+    n_h = h.shape[1]
+    gh, gc = g[:, :n_h], g[:, n_h:]
+    dc = gc + gh * o * (1 - tc ** 2)
+    da = np.concatenate([
+        dc * gg * i * (1 - i),
+        dc * c * f * (1 - f),
+        dc * i * (1 - gg ** 2),
+        gh * tc * o * (1 - o),
+    ], axis=1)
+    db = da.sum(axis=0)
+    ds = np.concatenate([da @ w_hh.T, dc * f], axis=1)
+    return da @ w_ih.T, ds, x.T @ da, h.T @ da, db, db
+
+
+# name -> (forward, backward, number of gates, state size in hidden units)
+KERNELS = {
+    'rnn': (_rnn_forward, _rnn_backward, 1, 1),
+    'gru': (_gru_forward, _gru_backward, 3, 1),
+    'lstm': (_lstm_forward, _lstm_backward, 4, 2),
+}
+
+
+def step(kernel, x, t, batch, state, w_ih, w_hh, b_ih, b_hh):
+
+    """
+    Advance a recurrent cell by one time step, as a single graph node.
+
+    Only the first 'batch' rows of the batch (sorted by decreasing length) are still running at
+    time 't'; the state of the other rows is passed through unchanged. The node reads its input
+    directly from the whole sequence 'x', so a time step adds exactly one node to the graph, and
+    its backward function is the analytic gradient of the cell.
+
+    Args:
+        kernel (str): 'rnn', 'gru' or 'lstm'.
+        x (Tensor or numpy.ndarray): The input sequences, of shape (N, T, input_size).
+        t (int): The time step.
+        batch (int): The number of rows still running at time 't'.
+        state (Tensor or numpy.ndarray): The state, of shape (N, state_size).
+        w_ih, w_hh, b_ih, b_hh (Tensor): The parameters of the cell.
+
+    Returns:
+        Tensor or numpy.ndarray: The new state; a float array when the graph is disabled.
+    """
+
+    forward, backward = KERNELS[kernel][:2]
+    params = (w_ih, w_hh, b_ih, b_hh)
+    xd = x.data if isinstance(x, Tensor) else x
+    sd = state.data if isinstance(state, Tensor) else state
+
+    new, cache = forward(xd[:batch, t], sd[:batch], *(p.data for p in params))
+    if batch < len(sd):
+        new = np.concatenate([new, sd[batch:]])
+
+    if not autograd._state.grad_enabled:
+        return new
+
+    x = x if isinstance(x, Tensor) else Tensor(x)
+    state = state if isinstance(state, Tensor) else Tensor(state)
+    out = Tensor(new, _op=kernel, _prev=(x, state) + params)
+
+    # Define the backward function for computing gradients
+    def _backward():
+        g = out.grad
+        dx, ds, dw_ih, dw_hh, db_ih, db_hh = backward(cache, g[:batch])
+        x.grad[:batch, t] += dx
+        state.grad[:batch] += ds
+        state.grad[batch:] += g[batch:]
+        for p, d in zip(params, (dw_ih, dw_hh, db_ih, db_hh)):
+            p.grad += d
+
+    out._backward = _backward
+    return out
+
+
+def gather(states, hidden_size, batch_sizes):
+
+    """
+    Stack the hidden states of every time step into one (N, T, hidden_size) output, as a single node.
+
+    Outputs of the rows that have already ended are zero.
+
+    Args:
+        states (list): The state after every time step (Tensor or numpy.ndarray).
+        hidden_size (int): The number of leading state columns that form the output.
+        batch_sizes (list): The number of rows running at every time step.
+
+    Returns:
+        Tensor or numpy.ndarray: The outputs.
+    """
+
+    datas = [ s.data if isinstance(s, Tensor) else s for s in states ]
+    out = np.zeros((len(datas[0]), len(datas), hidden_size), dtype=datas[0].dtype)
+    for t, (d, batch) in enumerate(zip(datas, batch_sizes)):
+        out[:batch, t] = d[:batch, :hidden_size]
+
+    if not autograd._state.grad_enabled:
+        return out
+
+    out = Tensor(out, _op='gather', _prev=states)
+
+    # Define the backward function for computing gradients
+    def _backward():
+        for t, (s, batch) in enumerate(zip(states, batch_sizes)):
+            s.grad[:batch, :hidden_size] += out.grad[:batch, t]
+
+    out._backward = _backward
+    return out
+
+
+def pad_sequences(sequences):
+
+    """
+    Pad a list of variable-length sequences into one batch.
+
+    Args:
+        sequences: A list of arrays of shape (length_i, input_size).
+
+    Returns:
+        tuple: The batch, of shape (N, max length, input_size) with zeros after the end of each
+        sequence, and the lengths, of shape (N,).
+    """
+
+    sequences = [ np.asarray(s, dtype=np.float64) for s in sequences ]
+    lengths = np.array([ len(s) for s in sequences ])
+    batch = np.zeros((len(sequences), lengths.max()) + sequences[0].shape[1:])
+    for i, s in enumerate(sequences):
+        batch[i, :len(s)] = s
+    return batch, lengths
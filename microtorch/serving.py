@@ -0,0 +1,246 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from microtorch import nn
+
+
+def _sample_shape(model):
+
+    """
+    Return the shape of one input sample of 'model', with None for the free dimensions (e.g. the
+    height and width of images, the length of sequences), or None if it cannot be told from the
+    first layer (a lazy Layer before its first forward pass, a model without 'layers').
+    """
+
+    layers = getattr(model, 'layers', None)
+    if layers is None or not len(layers):
+        return None
+    first = layers[0]
+
+    if isinstance(first, nn.Layer):
+        return (np.shape(nn._data(first.w))[0], ) if hasattr(first, 'w') else None
+    if isinstance(first, nn.Conv2d):
+        # (C, H, W) for Conv2d, (C, L) for Conv1d
+        return (first.w.shape[1], ) + (None, ) * (first.w.ndim - 2)
+    if isinstance(first, nn._Recurrent):
+        return (None, first.w_ih.shape[0])
+    return None
+
+
+class InferenceServer :
+
+    """
+    An asyncio front end that coalesces concurrent single-sample requests into batches.
+
+    Callers await predict(x) with one sample each. The requests wait in a queue until either
+    'max_batch_size' of them are pending or the oldest has waited 'max_wait' seconds; the batch is
+    then stacked and run through one graph-free forward pass (Model.predict) on a worker thread,
+    so the event loop keeps accepting requests meanwhile, and every caller gets its own row of the
+    output. While a batch runs, new requests accumulate, so batches grow with the load.
+
+    The forward passes run one at a time on a single worker thread. Model.predict only switches
+    graph construction off for that thread (the grad mode is per thread), so the model can keep
+    training on another thread; a batch that runs during an optimizer step may then see some
+    parameters before the update and some after.
+
+    Example:
+        async with InferenceServer(model, max_batch_size=64, max_wait=0.002) as server:
+            y = await server.predict(x)
+        print(server.stats())
+    """
+
+    def __init__(self, model, max_batch_size=32, max_wait=0.002, history=100000):
+
+        """
+        Initialize an InferenceServer.
+
+        Args:
+            model (Model): The model; anything with a predict(xs) method over a batch works.
+            max_batch_size (int): Largest number of requests run in one forward pass.
+            max_wait (float): Longest time, in seconds, a request waits for others to join its batch.
+            history (int): Number of most recent request latencies kept for the statistics.
+        """
+
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._queue = None
+        self._task = None
+        self._executor = None
+        self._stopping = False
+
+        self.latencies = deque(maxlen=history)
+        self.batch_sizes = deque(maxlen=history)
+        self._first = None
+        self._last = None
+
+
+    async def start(self):
+
+        """
+        Start the batching loop and the worker thread.
+        """
+
+        if self._task is not None:
+            raise RuntimeError("the server is already running")
+        self._queue = asyncio.Queue()
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='microtorch-inference')
+        self._task = asyncio.get_running_loop().create_task(self._serve())
+
+
+    async def stop(self):
+
+        """
+        Stop the batching loop after the pending requests have been served.
+
+        Requests made once stop() has been called are rejected with a RuntimeError.
+        """
+
+        if self._task is None or self._stopping:
+            return
+        self._stopping = True
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+        self._executor.shutdown(wait=True)
+
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+        return False
+
+
+    async def predict(self, x):
+
+        """
+        Compute the prediction of the model for one sample.
+
+        Args:
+            x (array-like): One sample, e.g. of shape (nin,).
+
+        Returns:
+            The output of the model for the sample: a float, or an array for multi-output models.
+            A RuntimeError is raised if the server is not running or is stopping, and a ValueError
+            if the sample does not have the input shape of the model.
+        """
+
+        if self._task is None:
+            raise RuntimeError("the server is not running (use 'async with' or start())")
+        if self._stopping:
+            raise RuntimeError("the server is stopping")
+
+        x = np.asarray(x, dtype=np.float64)
+        shape = _sample_shape(self.model)
+        if shape is not None and (x.ndim != len(shape) or any(e is not None and e != d for e, d in zip(shape, x.shape))):
+            expected = '(' + ', '.join('*' if e is None else str(e) for e in shape) + (',)' if len(shape) == 1 else ')')
+            raise ValueError(f"expected a sample of shape {expected}, got {x.shape}")
+
+        # Nothing can be queued after the stop sentinel: the queue is unbounded, so put_nowait
+        # enqueues the request right after the check above, without yielding to the event loop
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((x, future, time.perf_counter()))
+        return await future
+
+
+    async def _collect(self, first):
+
+        """
+        Gather the requests of the next batch, starting with 'first'.
+
+        Returns:
+            tuple: The requests, and whether the stop sentinel was received.
+        """
+
+        batch = [ first ]
+        deadline = first[2] + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if self._queue.empty():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+
+            if item is None:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch, stopping = await self._collect(first)
+
+            # Drop the requests whose callers gave up while waiting
+            batch = [ request for request in batch if not request[1].cancelled() ]
+            if not batch:
+                continue
+
+            try:
+                # Stacking fails for samples of different shapes: only this batch is failed
+                xs = np.stack([ x for x, _, _ in batch ])
+                outs = await loop.run_in_executor(self._executor, self.model.predict, xs)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            now = time.perf_counter()
+            for (_, future, start), out in zip(batch, outs):
+                if not future.done():
+                    future.set_result(out)
+                self.latencies.append(now - start)
+
+            self.batch_sizes.append(len(batch))
+            self._first = batch[0][2] if self._first is None else self._first
+            self._last = now
+
+
+    def stats(self):
+
+        """
+        Summarize the served requests.
+
+        Returns:
+            dict: Number of requests and batches, mean batch size, throughput (requests per second
+            between the first request and the last answer) and p50/p99/max latency in milliseconds.
+        """
+
+        if not self.latencies:
+            return { 'requests': 0, 'batches': 0 }
+
+        latencies = np.array(self.latencies) * 1e3
+        elapsed = self._last - self._first
+        requests = int(np.sum(self.batch_sizes))
+        return {
+            'requests': requests,
+            'batches': len(self.batch_sizes),
+            'mean_batch_size': float(np.mean(self.batch_sizes)),
+            'throughput': requests / elapsed if elapsed > 0 else float('inf'),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'max_ms': float(latencies.max()),
+        }
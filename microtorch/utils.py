@@ -1,8 +1,12 @@
+from microtorch import precision
 from microtorch.Value import Value
+from microtorch.Tensor import Tensor
+
+import weakref
 
 import numpy as np
 
-def generator(size ,mean = 0 , std = 1) :
+def generator(size ,mean = 0 , std = 1, tensor = False) :
 
     """
     Generate random numbers from a normal distribution.
@@ -11,9 +15,311 @@ def generator(size ,mean = 0 , std = 1) :
         size: Size of the random array.
         mean: Mean of the normal distribution (default is 0).
         std: Standard deviation of the normal distribution (default is 1).
+        tensor: If True, return a single Tensor instead of an array of Value objects (default is False).
 
     Returns:
         Numpy array of random numbers from the normal distribution.
     """
 
-    return np.random.normal(mean, std, size) * Value(1)
+    data = np.random.normal(mean, std, size)
+    return as_parameter(data) if tensor else leaves(data)
+
+
+def as_parameter(data) :
+
+    """
+    Wrap float data into a Tensor parameter stored in the dtype of the global precision policy.
+
+    Args:
+        data (numpy.ndarray): The initial values.
+
+    Returns:
+        Tensor: The parameter.
+    """
+
+    return Tensor(np.asarray(data, dtype=precision.get_policy().dtype))
+
+
+def leaves(data) :
+
+    """
+    Wrap every number of a float array in its own Value leaf.
+
+    Args:
+        data (numpy.ndarray): The numbers.
+
+    Returns:
+        numpy.ndarray: An object array of Value objects with the shape of 'data'.
+    """
+
+    # fromiter fills the object array directly; assigning a list would make numpy probe every
+    # Value object for the array protocols first, which costs more than creating them
+    values = np.fromiter(map(Value, data.ravel().tolist()), dtype=object, count=data.size)
+    return values.reshape(data.shape)
+
+
+def rng_streams(seed, n) :
+
+    """
+    Create independent random number generators from one seed.
+
+    Giving every layer its own stream keeps the initialization of a layer the same when other
+    layers are added, removed or resized.
+
+    Args:
+        seed (int): The root seed.
+        n (int): The number of streams.
+
+    Returns:
+        list: n numpy.random.Generator objects.
+    """
+
+    return [ np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(n) ]
+
+
+# Initialization schemes: name -> (distribution, scale), where the weights are drawn from
+# N(0, scale ** 2) or U(-scale, scale) and scale is a function of (fan_in, fan_out)
+_SCHEMES = {
+    'normal': ('normal', lambda fan_in, fan_out: 1.0),
+    'uniform': ('uniform', lambda fan_in, fan_out: 1 / np.sqrt(fan_in)),
+    'xavier': ('normal', lambda fan_in, fan_out: np.sqrt(2 / (fan_in + fan_out))),
+    'xavier_uniform': ('uniform', lambda fan_in, fan_out: np.sqrt(6 / (fan_in + fan_out))),
+    'he': ('normal', lambda fan_in, fan_out: np.sqrt(2 / fan_in)),
+    'he_uniform': ('uniform', lambda fan_in, fan_out: np.sqrt(6 / fan_in)),
+}
+
+# Aliases of the schemes
+_SCHEMES['glorot'] = _SCHEMES['xavier']
+_SCHEMES['glorot_uniform'] = _SCHEMES['xavier_uniform']
+_SCHEMES['kaiming'] = _SCHEMES['he']
+_SCHEMES['kaiming_uniform'] = _SCHEMES['he_uniform']
+
+
+def initialize(nin, nout, init = 'normal', rng = None) :
+
+    """
+    Sample the weights and biases of a dense layer as one float array.
+
+    Row i < nin holds the weights of input i and the last row holds the biases, so the whole layer
+    is one allocation. 'normal' keeps the historical N(0, 1) weights and biases; 'uniform' draws
+    both from U(-1/sqrt(nin), 1/sqrt(nin)) (the PyTorch default); the Xavier/Glorot and He/Kaiming
+    schemes scale the weights by the fan-in (and fan-out) and start the biases at zero.
+
+    Args:
+        nin (int): Number of inputs (the fan-in).
+        nout (int): Number of outputs (the fan-out).
+        init (str): The scheme: 'normal', 'uniform', 'xavier', 'xavier_uniform', 'he', 'he_uniform'
+            (or the aliases 'glorot', 'glorot_uniform', 'kaiming', 'kaiming_uniform').
+        rng: A numpy.random.Generator, or a seed for a new one (default is the global numpy
+            random state, so np.random.seed makes it reproducible).
+
+    Returns:
+        numpy.ndarray: The (nin + 1, nout) array of weights and biases.
+    """
+
+    if init not in _SCHEMES :
+        raise ValueError(f"unknown initialization '{init}', expected one of {sorted(_SCHEMES)}")
+    distribution, scale = _SCHEMES[init]
+    scale = scale(nin, nout)
+
+    rng = np.random if rng is None else np.random.default_rng(rng)
+    data = np.empty((nin + 1, nout))
+
+    if distribution == 'normal' :
+        data[:nin] = rng.normal(0, scale, (nin, nout))
+    else :
+        data[:nin] = rng.uniform(-scale, scale, (nin, nout))
+
+    if init == 'normal' :
+        data[nin] = rng.normal(0, 1, nout)
+    elif init == 'uniform' :
+        data[nin] = rng.uniform(-scale, scale, nout)
+    else :
+        data[nin] = 0.0
+
+    return data
+
+
+class ParameterBuffer :
+
+    """
+    A single flat buffer holding the data of a set of parameters, with a matching gradient buffer.
+
+    Tensor parameters of the buffer's dtype are re-pointed at views of the two buffers, so their
+    data and gradients live in the buffers with no copying: zeroing every gradient is one 'fill'
+    and an optimizer update is a handful of vectorized operations on the whole buffer. Value
+    parameters keep their Python floats, and Tensor parameters of another dtype (e.g. float32
+    parameters with float64 master weights) keep their own arrays; both are copied into the
+    buffers with pull_grad/pull_data and back with push_data/push_grad.
+
+    Every registered Tensor keeps a weak reference to its buffer, so precision.cast can convert a
+    parameter that is already registered with recast instead of leaving the buffer updating
+    arrays the parameter no longer uses.
+
+    Attributes:
+        parameters (list): The registered parameters, in order.
+        values (numpy.ndarray): The Value parameters, in order, as an object array.
+        data (numpy.ndarray): The flat parameter data.
+        grad (numpy.ndarray): The flat gradients, aligned with 'data'.
+    """
+
+    def __init__(self, parameters, dtype=None):
+
+        """
+        Register the parameters and move the data of Tensor parameters into the buffer.
+
+        Args:
+            parameters: An iterable of Value and/or Tensor objects.
+            dtype: The dtype of the buffer (default is the master dtype of the global precision
+                policy if it has one, otherwise the widest dtype of the parameters).
+        """
+
+        self.parameters = list(parameters)
+
+        if dtype is None:
+            dtype = precision.get_policy().master_dtype
+        if dtype is None:
+            dtypes = [ p.data.dtype if isinstance(p, Tensor) else np.float64 for p in self.parameters ]
+            dtype = np.result_type(*dtypes) if dtypes else np.float64
+        self.dtype = np.dtype(dtype)
+
+        sizes = [ p.data.size if isinstance(p, Tensor) else 1 for p in self.parameters ]
+        offsets = np.concatenate(([0], np.cumsum(sizes))).astype(int)
+        self._offsets = offsets
+        self.size = int(offsets[-1])
+
+        self.data = np.zeros(self.size, dtype=self.dtype)
+        self.grad = np.zeros(self.size, dtype=self.dtype)
+
+        # Value parameters are copied in and out through their offsets
+        values = [ p for p in self.parameters if not isinstance(p, Tensor) ]
+        self.values = np.empty(len(values), dtype=object)
+        self.values[:] = values
+        self._value_index = np.array([ offsets[i] for i, p in enumerate(self.parameters) if not isinstance(p, Tensor) ], dtype=int)
+
+        # Tensor parameters of another dtype are copied in and out through their slices, the
+        # others are views of the buffers
+        self._copied = []
+        self._aliased = []
+
+        for p, start, stop in zip(self.parameters, offsets[:-1], offsets[1:]):
+            if not isinstance(p, Tensor):
+                continue
+            p._buffer = weakref.ref(self)
+            if p.data.dtype != self.dtype:
+                if not isinstance(p.grad, np.ndarray):
+                    p.grad = np.zeros_like(p.data)
+                self._copied.append((p, slice(start, stop)))
+                continue
+
+            # Re-point the tensor at views of the buffers, keeping its current values
+            self._aliased.append((p, slice(start, stop)))
+            shape = p.data.shape
+            self.data[start:stop] = p.data.ravel()
+            if isinstance(p.grad, np.ndarray):
+                self.grad[start:stop] = p.grad.ravel()
+            p.data = self.data[start:stop].reshape(shape)
+            p.grad = self.grad[start:stop].reshape(shape)
+
+        self.pull_data()
+        self.pull_grad()
+
+
+    def recast(self, p, dtype):
+
+        """
+        Convert a registered Tensor parameter to another dtype, keeping it registered.
+
+        The parameter gets its own arrays of the new dtype and is copied in and out of the buffer
+        like the parameters whose dtype differs from the buffer's; the buffer keeps its values and
+        the optimizer state is unchanged.
+
+        Args:
+            p (Tensor): A parameter of the buffer.
+            dtype: The new dtype.
+        """
+
+        i = next(i for i, q in enumerate(self.parameters) if q is p)
+        index = slice(int(self._offsets[i]), int(self._offsets[i + 1]))
+
+        p.data = p.data.astype(dtype)
+        p.grad = p.grad.astype(dtype)
+        self._aliased = [ (q, i) for q, i in self._aliased if q is not p ]
+        if not any(q is p for q, _ in self._copied):
+            self._copied.append((p, index))
+
+
+    def zero_grad(self):
+
+        """
+        Set every gradient to zero.
+        """
+
+        self.grad.fill(0.0)
+        for v in self.values:
+            v.grad = 0.0
+        for p, _ in self._copied:
+            p.grad.fill(0.0)
+
+
+    def pull_data(self):
+
+        """
+        Bring the buffer up to date with the current data of the parameters.
+
+        The data of the Value parameters is copied into the buffer. Copied Tensors are copied only
+        if they changed since the last push_data, so that a wider master copy (float64 master
+        weights of float32 parameters) keeps its precision. Tensors that were given a new array
+        (e.g. by an assignment to 'data') are copied into the buffer and re-pointed at it.
+        """
+
+        if len(self.values):
+            self.data[self._value_index] = np.fromiter((v.data for v in self.values), dtype=np.float64, count=len(self.values))
+        for p, index in self._copied:
+            if not np.array_equal(p.data.ravel(), self.data[index].astype(p.data.dtype)):
+                self.data[index] = p.data.ravel()
+        for p, index in list(self._aliased):
+            if p.data.base is self.data:
+                continue
+            if p.data.dtype != self.dtype:
+                self.recast(p, p.data.dtype)
+                self.data[index] = p.data.ravel()
+                continue
+            self.data[index] = p.data.ravel()
+            p.data = self.data[index].reshape(p.data.shape)
+
+
+    def pull_grad(self):
+
+        """
+        Copy the gradients of the Value parameters (and of the copied Tensors) into the buffer.
+        """
+
+        if len(self.values):
+            self.grad[self._value_index] = np.fromiter((v.grad for v in self.values), dtype=np.float64, count=len(self.values))
+        for p, index in self._copied:
+            self.grad[index] = p.grad.ravel()
+
+
+    def push_data(self):
+
+        """
+        Copy the buffer back into the data of the Value parameters (and of the copied Tensors).
+        """
+
+        for v, d in zip(self.values, self.data[self._value_index].tolist()):
+            v.data = d
+        for p, index in self._copied:
+            p.data[...] = self.data[index].reshape(p.data.shape)
+
+
+    def push_grad(self):
+
+        """
+        Copy the buffer back into the gradients of the Value parameters (and of the copied Tensors).
+        """
+
+        for v, g in zip(self.values, self.grad[self._value_index].tolist()):
+            v.grad = g
+        for p, index in self._copied:
+            p.grad[...] = self.grad[index].reshape(p.grad.shape)
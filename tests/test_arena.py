@@ -0,0 +1,74 @@
+import gc
+import threading
+from contextlib import nullcontext
+
+import numpy as np
+import pytest
+
+from microtorch import nn, Loss, Optimizers
+from microtorch.arena import Arena
+from microtorch.Tensor import Tensor
+
+rng = np.random.default_rng(0)
+xs = rng.normal(size=(32, 4))
+ys = np.sin(xs.sum(axis=1))
+
+
+def train(tensor, epochs, arena=None):
+    np.random.seed(0)
+    n = nn.Sequential(nn.Layer(4, 8, tensor=tensor), nn.Layer(8, 1, activation='linear', tensor=tensor))
+    optimizer = Optimizers.SGD(n.parameters, 0.05)
+    for _ in range(epochs):
+        with arena if arena is not None else nullcontext():
+            loss = Loss.MSELoss(ys, n(xs))
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+    return float(loss.data), n
+
+
+@pytest.mark.parametrize('tensor', [False, True])
+def test_arena_training_matches_eager(tensor):
+    eager, _ = train(tensor, 10)
+    arena = Arena()
+    loss, _ = train(tensor, 10, arena)
+    assert loss == eager
+
+    stats = arena.stats()
+    assert stats['steps'] == 10
+    assert stats['nodes_per_step'] > 0
+    assert gc.isenabled()
+
+
+def test_arena_leaves_no_tensor_cycles():
+    gc.collect()
+    train(True, 5, Arena())
+    assert gc.collect() == 0
+
+
+def test_nodes_outside_the_step_are_kept():
+    arena = Arena()
+    x = Tensor([1.0, 2.0])
+    with arena:
+        y = (x * x).sum()
+        y.backward()
+    assert np.allclose(x.grad, [2.0, 4.0])
+    assert y._prev == set()
+    assert x not in arena.tensors
+
+
+def test_nested_steps_are_rejected():
+    with Arena():
+        with pytest.raises(RuntimeError):
+            with Arena():
+                pass
+
+
+def test_arena_ignores_other_threads():
+    arena = Arena()
+    created = []
+    with arena:
+        thread = threading.Thread(target=lambda: created.append(Tensor([1.0]) * 2))
+        thread.start()
+        thread.join()
+        assert arena.tensors == []
@@ -0,0 +1,81 @@
+import threading
+
+import numpy as np
+
+from microtorch import autograd, dual, nn, Loss, Optimizers
+from microtorch.Tensor import Tensor
+from microtorch.Value import Value
+
+
+def test_no_grad_disables_graph():
+    with autograd.no_grad():
+        v = Value(2.0) * Value(3.0)
+        t = Tensor([1.0, 2.0]) * 2
+        assert not autograd.is_grad_enabled()
+    assert autograd.is_grad_enabled()
+    assert v._prev == () and t._prev == set()
+
+
+def test_enable_grad_inside_no_grad():
+    with autograd.no_grad():
+        with autograd.enable_grad():
+            v = Value(2.0) * Value(3.0)
+        assert not autograd.is_grad_enabled()
+    assert len(v._prev) == 2
+
+
+def test_grad_mode_is_per_thread():
+    inside = threading.Event()
+    release = threading.Event()
+    seen = []
+
+    def worker():
+        with autograd.no_grad():
+            inside.set()
+            release.wait()
+            seen.append(autograd.is_grad_enabled())
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    inside.wait()
+
+    # The no_grad block of the worker does not affect this thread
+    assert autograd.is_grad_enabled()
+    a = Value(3.0)
+    (a * a).backward()
+    release.set()
+    thread.join()
+
+    assert a.grad == 6.0
+    assert seen == [False]
+    assert autograd.is_grad_enabled()
+
+
+def test_tensors_built_under_no_grad_can_be_trained():
+    with autograd.no_grad():
+        n = nn.Sequential(nn.Layer(3, 4, rng=0, tensor=True), nn.Layer(4, 1, activation='linear', rng=1, tensor=True))
+        x = Tensor(np.ones((2, 3)))
+    assert all(p.grad is None for p in n.parameters())
+
+    # Without an optimizer: backward allocates the missing gradients
+    Loss.MSELoss(np.zeros(2), n(x)).backward()
+    assert all(p.grad is not None and np.any(p.grad != 0) for p in n.parameters())
+    assert x.grad.shape == x.shape
+
+    # With an optimizer
+    with autograd.no_grad():
+        m = nn.Sequential(nn.Layer(3, 1, rng=0, tensor=True))
+    optimizer = Optimizers.SGD(m.parameters, 0.1)
+    before = m.predict(np.ones((2, 3)))
+    optimizer.zero_grad()
+    Loss.MSELoss(np.zeros(2), m(np.ones((2, 3)))).backward()
+    optimizer.step()
+    assert not np.allclose(m.predict(np.ones((2, 3))), before)
+
+
+def test_reverse_jacobian_of_parameters_built_under_no_grad():
+    with autograd.no_grad():
+        n = nn.Sequential(nn.Layer(3, 2, rng=0, tensor=True))
+    jac = dual.jacobian(n, np.ones(3), mode='reverse')
+    assert np.allclose(jac, dual.jacobian(n, np.ones(3), mode='forward'))
+    assert all(p.grad is None for p in n.parameters())
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from microtorch import nn, Loss
+from microtorch.arena import Arena
+from microtorch.Tensor import Tensor
+from microtorch.Value import Value
+
+
+def test_deep_graph_does_not_recurse():
+    x = Value(1.0)
+    y = x
+    for _ in range(20000):
+        y = y + 1.0
+    y.backward()
+    assert x.grad == 1.0
+
+
+@pytest.mark.parametrize('kind', [Value, Tensor])
+def test_retained_graph_can_be_backpropagated_twice(kind):
+    x = kind(3.0)
+    y = x * x
+    (y * 2).backward()
+    assert np.isclose(x.grad, 12.0)
+    (y * 4).backward()
+    assert x.grad > 12.0
+
+
+@pytest.mark.parametrize('kind', [Value, Tensor])
+def test_released_graph_raises(kind):
+    x = kind(3.0)
+    y = x * x
+    (y * 2).backward(retain_graph=False)
+    assert np.isclose(x.grad, 12.0)
+
+    # The shared subgraph 'y' was released by the first backward
+    with pytest.raises(RuntimeError, match='retain_graph=True'):
+        (y * 4).backward()
+
+    # Leaves stay usable
+    (x * 5).backward()
+    assert np.isclose(x.grad, 17.0)
+
+
+@pytest.mark.parametrize('retain_graph', [True, False])
+def test_released_graph_gives_the_same_gradients(retain_graph):
+    xs = np.random.default_rng(0).normal(size=(5, 3))
+    ys = np.random.default_rng(1).normal(size=5)
+    grads = []
+    for tensor in (False, True):
+        np.random.seed(0)
+        n = nn.Sequential(nn.Layer(3, 4, tensor=tensor), nn.Layer(4, 1, tensor=tensor))
+        Loss.MSELoss(ys, n(xs)).backward(retain_graph=retain_graph)
+        grads.append(sorted(np.concatenate([ np.ravel(p.grad) for p in n.parameters() ])))
+    assert np.allclose(grads[0], grads[1])
+
+
+@pytest.mark.parametrize('kind', [Value, Tensor])
+def test_arena_released_nodes_raise(kind):
+    x = kind(2.0)
+    with Arena():
+        y = x * x
+    with pytest.raises(RuntimeError):
+        (y * 2).backward()
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from microtorch import nn, checkpoint
+
+
+def make_model(tensor):
+    return nn.Sequential(nn.Layer(3, 5, rng=0, tensor=tensor), nn.Layer(5, 2, activation='linear', rng=1, tensor=tensor))
+
+
+@pytest.mark.parametrize('tensor', [False, True])
+@pytest.mark.parametrize('mmap_mode', [None, 'r'])
+def test_roundtrip(tmp_path, tensor, mmap_mode):
+    n = make_model(tensor)
+    path = tmp_path / 'model.ck'
+    checkpoint.save(n, path)
+    xs = np.random.default_rng(0).normal(size=(4, 3))
+
+    rebuilt = checkpoint.load(path, mmap_mode=mmap_mode)
+    assert np.allclose(rebuilt.predict(xs), n.predict(xs))
+    assert [ layer.activation for layer in rebuilt.layers ] == [ 'tanh', 'linear' ]
+
+    other = nn.Sequential(nn.Layer(3, 5, rng=5, tensor=tensor), nn.Layer(5, 2, activation='linear', rng=6, tensor=tensor))
+    loaded = checkpoint.load(path, model=other, mmap_mode=mmap_mode)
+    assert loaded is other
+    assert np.allclose(other.predict(xs), n.predict(xs))
+
+
+def test_rebuild_does_not_initialize(tmp_path, monkeypatch):
+    path = tmp_path / 'model.ck'
+    checkpoint.save(make_model(True), path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("parameters were sampled")
+    monkeypatch.setattr(nn, 'initialize', fail)
+
+    model = checkpoint.load(path, mmap_mode='r')
+
+    # The tensors are views of the memory-mapped file
+    assert all(isinstance(p.data.base, np.memmap) or isinstance(p.data, np.memmap) for p in model.parameters())
+
+
+def test_lazy_layer_cannot_be_saved(tmp_path):
+    with pytest.raises(RuntimeError, match='lazily initialized'):
+        checkpoint.save(nn.Sequential(nn.Layer(None, 2)), tmp_path / 'model.ck')
+
+
+def test_mismatched_model_is_rejected(tmp_path):
+    path = tmp_path / 'model.ck'
+    checkpoint.save(make_model(True), path)
+    with pytest.raises(ValueError):
+        checkpoint.load(path, model=nn.Sequential(nn.Layer(3, 4, tensor=True), nn.Layer(4, 2, tensor=True)))
+    with pytest.raises(ValueError):
+        checkpoint.load(path, model=nn.Sequential(nn.Layer(3, 5, tensor=True)))
+
+
+@pytest.mark.parametrize('tensor', [False, True])
+@pytest.mark.parametrize('mmap_mode', [None, 'r'])
+def test_load_into_a_model_being_trained(tmp_path, tensor, mmap_mode):
+    from microtorch import Optimizers, Loss
+
+    path = tmp_path / 'model.ck'
+    checkpoint.save(make_model(tensor), path)
+    rng = np.random.default_rng(0)
+    xs, ys = rng.normal(size=(8, 3)), rng.normal(size=(8, 2))
+
+    def train(n, optimizer):
+        for step in range(5):
+            loss = Loss.MSELoss(ys, n(xs))
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+    # Reference: an optimizer built after the load
+    reference = checkpoint.load(path, model=make_model(tensor))
+    train(reference, Optimizers.SGD(reference.parameters, 0.1))
+
+    other = nn.Sequential(nn.Layer(3, 5, rng=5, tensor=tensor), nn.Layer(5, 2, activation='linear', rng=6, tensor=tensor))
+    optimizer = Optimizers.SGD(other.parameters, 0.1)
+    train(other, optimizer)
+    checkpoint.load(path, model=other, mmap_mode=mmap_mode)
+    if tensor:
+        # The loaded weights are written into the arrays the optimizer updates
+        assert all(np.shares_memory(p.data, optimizer.buffer.data) for p in other.parameters())
+    # The optimizer has no state for plain SGD, so training from the loaded weights matches
+    train(other, optimizer)
+
+    assert np.allclose(other.predict(xs), reference.predict(xs))
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from microtorch import nn, Loss, compiler
+
+
+def make_model(fused):
+    return nn.Sequential(
+        nn.Layer(3, 4, activation='tanh', rng=0, fused=fused),
+        nn.Layer(4, 3, activation='relu', rng=1, fused=fused),
+        nn.Layer(3, 1, activation='sigmoid', rng=2, fused=fused),
+    )
+
+
+@pytest.mark.parametrize('fused', [False, True])
+def test_compiled_gradients_are_identical(tmp_path, fused):
+    rng = np.random.default_rng(0)
+    xs, ys = rng.normal(size=(5, 3)), rng.normal(size=5)
+
+    n = make_model(fused)
+    loss = Loss.MSELoss(ys, n(xs))
+    loss.backward()
+    expected = [ p.grad for p in n.parameters() ]
+
+    m = make_model(fused)
+    step = compiler.compile(m, xs, cache_dir=str(tmp_path))
+    assert step(xs, ys) == loss.data
+    assert [ p.grad for p in m.parameters() ] == expected
+    assert step.forward(xs).tolist() == [ v.data for v in n(xs) ]
+
+
+def test_generated_module_is_cached(tmp_path):
+    xs = np.zeros((2, 3))
+    first = compiler.compile(make_model(True), xs, cache_dir=str(tmp_path))
+    second = compiler.compile(make_model(True), xs, cache_dir=str(tmp_path))
+    assert not first.cached and second.cached
+    assert first.path == second.path
+
+    # Another input shape is another module
+    assert compiler.compile(make_model(True), np.zeros((4, 3)), cache_dir=str(tmp_path)).path != first.path
+
+
+def test_compiled_model_rejects_other_shapes(tmp_path):
+    step = compiler.compile(make_model(True), np.zeros((2, 3)), cache_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        step(np.zeros((3, 3)), np.zeros(3))
+
+
+def test_tensor_models_are_rejected(tmp_path):
+    with pytest.raises(TypeError):
+        compiler.compile(nn.Sequential(nn.Layer(3, 1, tensor=True)), np.zeros((2, 3)), cache_dir=str(tmp_path))
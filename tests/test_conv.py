@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from microtorch import nn, conv
+from microtorch.Tensor import Tensor
+
+
+def numeric_grad(f, x, eps=1e-6):
+    grad = np.zeros_like(x)
+    for index in np.ndindex(x.shape):
+        old = x[index]
+        x[index] = old + eps
+        up = f()
+        x[index] = old - eps
+        down = f()
+        x[index] = old
+        grad[index] = (up - down) / (2 * eps)
+    return grad
+
+
+def reference_conv2d(x, w, b, stride, padding, dilation):
+    # Direct loops over the output positions
+    (sh, sw), (ph, pw), (dh, dw) = stride, padding, dilation
+    n, c, h, wd = x.shape
+    o, _, kh, kw = w.shape
+    xp = np.pad(x, ((0, 0), (0, 0), (ph, ph), (pw, pw)))
+    oh = (h + 2 * ph - dh * (kh - 1) - 1) // sh + 1
+    ow = (wd + 2 * pw - dw * (kw - 1) - 1) // sw + 1
+    out = np.zeros((n, o, oh, ow))
+    for i in range(oh):
+        for j in range(ow):
+            window = xp[:, :, i * sh:i * sh + dh * (kh - 1) + 1:dh, j * sw:j * sw + dw * (kw - 1) + 1:dw]
+            out[:, :, i, j] = np.tensordot(window, w, axes=([1, 2, 3], [1, 2, 3])) + b
+    return out
+
+
+CONFIGS = [ ((1, 1), (0, 0), (1, 1)), ((2, 1), (1, 2), (1, 2)), ((2, 2), (1, 1), (2, 1)) ]
+
+
+@pytest.mark.parametrize('stride, padding, dilation', CONFIGS)
+def test_conv2d_matches_loops_and_finite_differences(stride, padding, dilation):
+    rng = np.random.default_rng(0)
+    x, w, b = rng.normal(size=(2, 3, 7, 6)), rng.normal(size=(4, 3, 3, 2)), rng.normal(size=4)
+    out = conv.conv2d(x, w, b, stride, padding, dilation)
+    assert np.allclose(out, reference_conv2d(x, w, b, stride, padding, dilation))
+
+    tx, tw, tb = Tensor(x.copy()), Tensor(w.copy()), Tensor(b.copy())
+    r = rng.normal(size=out.shape)
+    (conv.conv2d(tx, tw, tb, stride, padding, dilation) * r).sum().backward()
+    f = lambda: float(np.sum(conv.conv2d(x, w, b, stride, padding, dilation) * r))
+    assert np.allclose(tx.grad, numeric_grad(f, x), atol=1e-5)
+    assert np.allclose(tw.grad, numeric_grad(f, w), atol=1e-5)
+    assert np.allclose(tb.grad, numeric_grad(f, b), atol=1e-5)
+
+
+def test_conv1d_is_conv2d_of_height_one():
+    rng = np.random.default_rng(0)
+    x, w, b = rng.normal(size=(2, 3, 10)), rng.normal(size=(4, 3, 3)), rng.normal(size=4)
+    out = conv.conv1d(x, w, b, 2, 1, 2)
+    expected = reference_conv2d(x[:, :, None], w[:, :, None], b, (1, 2), (0, 1), (1, 2))[:, :, 0]
+    assert np.allclose(out, expected)
+
+
+@pytest.mark.parametrize('pool', [conv.max_pool2d, conv.avg_pool2d])
+@pytest.mark.parametrize('args', [ (2, ), (3, 2, 1), ((2, 3), (1, 2), (1, 1), (2, 1)) ])
+def test_pooling_gradients(pool, args):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(2, 3, 7, 8))
+    tx = Tensor(x.copy())
+    out = pool(tx, *args)
+    r = rng.normal(size=out.shape)
+    (out * r).sum().backward()
+    assert np.allclose(tx.grad, numeric_grad(lambda: float(np.sum(pool(x, *args) * r)), x), atol=1e-5)
+
+
+def test_layers_predict_like_training_forward():
+    np.random.seed(0)
+    n = nn.Sequential(nn.Conv2d(1, 4, 3, padding=1), nn.MaxPool2d(2), nn.Conv2d(4, 2, 3, activation='tanh'),
+                      nn.AvgPool2d(1), nn.Flatten(), nn.Layer(2, 3, activation='linear', rng=0, tensor=True))
+    xs = np.random.default_rng(0).normal(size=(5, 1, 6, 6))
+    assert np.allclose(n.predict(xs), n(xs).data)
+
+
+@pytest.mark.parametrize('init', ['uniform', 'xavier', 'he'])
+def test_seeded_initialization_is_reproducible(init):
+    a = nn.Conv2d(2, 3, 3, init=init, rng=7)
+    b = nn.Conv2d(2, 3, 3, init=init, rng=7)
+    assert np.array_equal(a.w.data, b.w.data) and np.array_equal(a.b.data, b.b.data)
+
+    # The kernels are a dense layer over the 2 * 3 * 3 inputs of a window
+    layer = nn.Layer(18, 3, init=init, rng=7, tensor=True)
+    assert np.array_equal(a.w.data.reshape(3, -1), layer.w.data.T)
+    assert np.array_equal(a.b.data, layer.b.data)
+
+    c = nn.Conv1d(2, 3, 3, init=init, rng=7)
+    d = nn.Conv1d(2, 3, 3, init=init, rng=7)
+    assert np.array_equal(c.w.data, d.w.data) and np.array_equal(c.b.data, d.b.data)
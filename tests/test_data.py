@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from microtorch.data import ArrayDataset, NpyDataset, CSVDataset, DataLoader, IterableDataset
+
+
+def make_arrays(n=103):
+    xs = np.arange(n * 2, dtype=np.float64).reshape(n, 2)
+    return xs, xs[:, 0] * 10
+
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_batches_cover_the_dataset_in_order(prefetch):
+    xs, ys = make_arrays()
+    loader = DataLoader(ArrayDataset(xs, ys), batch_size=10, chunk_size=7, prefetch=prefetch)
+    batches = list(loader)
+    assert [ len(bx) for bx, _ in batches ] == [ 10 ] * 10 + [ 3 ]
+    assert np.array_equal(np.concatenate([ bx for bx, _ in batches ]), xs)
+    assert np.array_equal(np.concatenate([ by for _, by in batches ]), ys)
+
+
+def test_shuffle_is_a_seeded_permutation_that_keeps_pairs():
+    xs, ys = make_arrays()
+    first = list(DataLoader(ArrayDataset(xs, ys), batch_size=16, shuffle=True, buffer_size=20, chunk_size=8, seed=0))
+    second = list(DataLoader(ArrayDataset(xs, ys), batch_size=16, shuffle=True, buffer_size=20, chunk_size=8, seed=0))
+
+    seen = np.concatenate([ bx for bx, _ in first ])
+    assert not np.array_equal(seen, xs)
+    assert np.array_equal(np.sort(seen[:, 0]), xs[:, 0])
+    assert all(np.array_equal(by, bx[:, 0] * 10) for bx, by in first)
+    assert all(np.array_equal(a[0], b[0]) for a, b in zip(first, second))
+
+
+def test_drop_last():
+    xs, ys = make_arrays()
+    batches = list(DataLoader(ArrayDataset(xs, ys), batch_size=10, drop_last=True))
+    assert len(batches) == 10 and all(len(bx) == 10 for bx, _ in batches)
+
+
+def test_file_datasets(tmp_path):
+    xs, ys = make_arrays(20)
+    np.save(tmp_path / 'x.npy', xs)
+    np.save(tmp_path / 'y.npy', ys)
+    pd.DataFrame({ 'a': xs[:, 0], 'b': xs[:, 1], 'y': ys }).to_csv(tmp_path / 'data.csv', index=False)
+
+    for dataset in (NpyDataset(tmp_path / 'x.npy', tmp_path / 'y.npy'), CSVDataset(tmp_path / 'data.csv', target='y')):
+        batches = list(DataLoader(dataset, batch_size=6, chunk_size=4))
+        assert np.array_equal(np.concatenate([ bx for bx, _ in batches ]), xs)
+        assert np.array_equal(np.concatenate([ by for _, by in batches ]), ys)
+
+    features_only = list(DataLoader(CSVDataset(tmp_path / 'data.csv', features=['b']), batch_size=20))
+    assert np.array_equal(features_only[0], xs[:, 1:])
+
+
+class Failing(IterableDataset):
+    def chunks(self, chunk_size, rng=None):
+        yield (np.zeros((4, 2)), )
+        raise OSError("disk error")
+
+
+def test_producer_errors_reach_the_consumer():
+    with pytest.raises(OSError, match='disk error'):
+        list(DataLoader(Failing(), batch_size=2, prefetch=2))
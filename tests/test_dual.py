@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from microtorch import nn, dual
+
+
+def cnn(pool):
+    np.random.seed(0)
+    return nn.Sequential(
+        nn.Conv2d(2, 3, 3, padding=1, activation='tanh'),
+        pool(2),
+        nn.Flatten(),
+        nn.Layer(12, 2, activation='linear', rng=0, tensor=True),
+    )
+
+
+@pytest.mark.parametrize('pool', [nn.MaxPool2d, nn.AvgPool2d])
+def test_jvp_through_convolutions(pool):
+    n = cnn(pool)
+    rng = np.random.default_rng(0)
+    x, v = rng.normal(size=(2, 2, 4, 4)), rng.normal(size=(2, 2, 4, 4))
+
+    out, tangent = dual.jvp(n, x, v)
+    eps = 1e-6
+    numeric = (n.predict(x + eps * v) - n.predict(x - eps * v)) / (2 * eps)
+    assert np.allclose(out, n.predict(x))
+    assert np.allclose(tangent, numeric, atol=1e-6)
+
+    # Several directions at once
+    _, tangents = dual.jvp(n, x, np.stack([v, 2 * v]))
+    assert np.allclose(tangents, np.stack([tangent, 2 * tangent]))
+
+
+@pytest.mark.parametrize('pool', [nn.MaxPool2d, nn.AvgPool2d])
+def test_forward_and_reverse_jacobians_agree(pool):
+    n = cnn(pool)
+    x = np.random.default_rng(1).normal(size=(1, 2, 4, 4))
+    forward = dual.jacobian(n, x, mode='forward')
+    assert forward.shape == (1, 2, 1, 2, 4, 4)
+    assert np.allclose(forward, dual.jacobian(n, x, mode='reverse'))
+
+
+def test_recurrent_layers_name_themselves():
+    n = nn.Sequential(nn.LSTM(3, 4, return_sequences=False))
+    x = np.random.default_rng(0).normal(size=(2, 5, 3))
+    with pytest.raises(TypeError, match='LSTM'):
+        dual.jvp(n, x, np.ones_like(x))
+    assert dual.jacobian(n, x, mode='reverse').shape == (2, 4, 2, 5, 3)
+
+
+@pytest.mark.parametrize('tensor', [False, True])
+@pytest.mark.parametrize('mode', ['forward', 'reverse'])
+def test_jacobian_of_a_single_sample(tensor, mode):
+    x = np.array([0.5, -1.0, 2.0])
+    n = nn.Sequential(nn.Layer(3, 4, rng=0, tensor=tensor), nn.Layer(4, 2, rng=1, tensor=tensor))
+    assert dual.jacobian(n, x, mode=mode).shape == (2, 3)
+    single = nn.Sequential(nn.Layer(3, 1, rng=0, tensor=tensor))
+    assert dual.jacobian(single, x, mode=mode).shape == (3, )
+    assert np.allclose(dual.jacobian(single, x, mode=mode), dual.jacobian(single, x[None], mode=mode)[0, 0])
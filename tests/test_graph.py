@@ -0,0 +1,84 @@
+import numpy as np
+
+from microtorch import nn, Loss, Optimizers
+from microtorch.graph import capture
+
+xs = [
+  [2.0, 3.0, -1.0],
+  [3.0, -1.0, 0.5],
+  [0.5, 1.0, 1.0],
+  [1.0, 1.0, -1.0],
+]
+ys = [1.0, -1.0, -1.0, 1.0]
+
+
+def make_model(fused=True):
+    np.random.seed(3)
+    return nn.Sequential(nn.Layer(3, 4, fused=fused), nn.Layer(4, 3, fused=fused), nn.Layer(3, 1, fused=fused))
+
+
+def train_eager(n, epochs):
+    optimizer = Optimizers.SGD(n.parameters, 0.05)
+    for _ in range(epochs):
+        loss = Loss.MSELoss(ys, n(xs))
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+    return loss.data
+
+
+def train_static(n, epochs, optimize=False):
+    optimizer = Optimizers.SGD(n.parameters, 0.05)
+    step = capture(lambda x, y: Loss.MSELoss(y, n(x)), xs, ys, optimize=optimize)
+    for _ in range(epochs):
+        loss = step(xs, ys)
+        optimizer.zero_grad()
+        step.backward()
+        optimizer.step()
+    return loss.data
+
+
+def test_replay_matches_eager():
+    for fused in (True, False):
+        eager = train_eager(make_model(fused), 20)
+        assert np.isclose(train_static(make_model(fused), 20), eager)
+        assert np.isclose(train_static(make_model(fused), 20, optimize=True), eager)
+
+
+def test_replay_on_new_inputs():
+    n = make_model()
+    step = capture(lambda x, y: Loss.MSELoss(y, n(x)), xs, ys)
+    other = (np.array(xs) * 0.5).tolist()
+    assert np.isclose(step(other, ys).data, Loss.MSELoss(ys, n(other)).data)
+
+
+
+def test_optimize_folds_literal_constants():
+    n = make_model(fused=False)
+
+    def fn(x, y):
+        errors = [ (p - t) * (p - t) for p, t in zip(n(x), y) ]
+        return sum(errors) / len(errors)
+
+    step = capture(fn, xs, ys)
+    counts = step.optimize()
+    assert sum(counts['after'].values()) < sum(counts['before'].values())
+    assert np.isclose(step(xs, ys).data, Loss.MSELoss(ys, n(xs)).data)
+
+
+def test_lazy_parameters_created_while_capturing_are_trained():
+    np.random.seed(0)
+    n = nn.Sequential(nn.Layer(None, 4, init='xavier'), nn.Layer(4, 1, init='xavier'))
+    optimizer = Optimizers.SGD(n.parameters, 0.05)
+    step = capture(lambda x, y: Loss.MSELoss(y, n(x)), xs, ys, optimize=True)
+
+    # The parameters are leaves outside the captured graph, not trace-time constants
+    params = set(n.parameters())
+    assert not params & set(step.nodes)
+
+    for _ in range(20):
+        step(xs, ys)
+        optimizer.zero_grad()
+        step.backward()
+        optimizer.step()
+    assert np.all(np.array([ b.data for b in n.layers[0].b ]) != 0)
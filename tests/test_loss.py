@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from microtorch import nn, Loss, Optimizers
+from microtorch.Tensor import Tensor
+from microtorch.Value import Value
+
+
+def values(x):
+    out = np.empty(np.shape(x), dtype=object)
+    for index, v in np.ndenumerate(x):
+        out[index] = Value(float(v))
+    return out
+
+
+def grads(vs):
+    return np.vectorize(lambda v: v.grad, otypes=[float])(vs)
+
+
+def unfused_cross_entropy(ys, logits):
+    # The textbook graph: softmax from exp and sum nodes, then the log of the target probability
+    total = 0.0
+    for row, y in zip(logits, ys):
+        exps = [ v.exp() for v in row ]
+        total = total - (exps[y] / sum(exps)).log()
+    return total / len(ys)
+
+
+rng = np.random.default_rng(0)
+PRED = rng.normal(size=6)
+TRUE = rng.normal(size=6)
+LOGITS = rng.normal(size=(4, 3))
+CLASSES = np.array([0, 2, 1, 2])
+
+UNFUSED = {
+    'mse': (Loss.MSELoss, lambda ys, xs: sum((x - y) ** 2 for x, y in zip(xs, ys)) / len(ys), TRUE),
+    'huber': (lambda ys, xs: Loss.HuberLoss(ys, xs, delta=0.5),
+              lambda ys, xs: sum(0.5 * (x - y) ** 2 if abs(x.data - y) <= 0.5 else 0.5 * ((x - y).relu() + (y - x).relu() - 0.25)
+                                 for x, y in zip(xs, ys)) / len(ys), TRUE),
+    'bce': (Loss.BCEWithLogitsLoss,
+            lambda ys, xs: sum(-(y * x.sigmoid().log() + (1 - y) * (1 - x.sigmoid()).log()) for x, y in zip(xs, ys)) / len(ys),
+            (TRUE > 0).astype(float)),
+}
+
+
+@pytest.mark.parametrize('name', UNFUSED)
+def test_fused_losses_match_unfused_graphs(name):
+    fused, unfused, ys = UNFUSED[name]
+    a, b = values(PRED), values(PRED)
+    fa, fb = fused(ys, a), unfused(ys, b)
+    fa.backward()
+    fb.backward()
+    assert fa.data == pytest.approx(fb.data)
+    assert np.allclose(grads(a), grads(b))
+
+
+def test_cross_entropy_matches_unfused_graph():
+    a, b = values(LOGITS), values(LOGITS)
+    fa, fb = Loss.CrossEntropyLoss(CLASSES, a), unfused_cross_entropy(CLASSES, b)
+    fa.backward()
+    fb.backward()
+    assert fa.data == pytest.approx(fb.data)
+    assert np.allclose(grads(a), grads(b))
+
+
+@pytest.mark.parametrize('loss, ys, x', [
+    (Loss.MSELoss, TRUE, PRED),
+    (Loss.CrossEntropyLoss, CLASSES, LOGITS),
+    (Loss.BCEWithLogitsLoss, (TRUE > 0).astype(float), PRED),
+    (Loss.HuberLoss, TRUE, PRED),
+])
+def test_value_and_tensor_losses_agree(loss, ys, x):
+    v, t = values(x), Tensor(x.copy())
+    lv, lt = loss(ys, v), loss(ys, t)
+    lv.backward()
+    lt.backward()
+    assert float(lv.data) == pytest.approx(float(lt.data))
+    assert np.allclose(grads(v), t.grad)
+
+
+def test_cross_entropy_is_stable_for_large_logits():
+    logits = Tensor(np.array([[1000.0, 0.0, -1000.0], [0.0, 2000.0, 0.0]]))
+    loss = Loss.CrossEntropyLoss(np.array([0, 2]), logits)
+    loss.backward()
+    assert np.isfinite(loss.data) and np.all(np.isfinite(logits.grad))
+    assert float(loss.data) == pytest.approx(1000.0)
+
+
+def test_l2_term_of_value_and_tensor_parameters():
+    w = rng.normal(size=5)
+    v, t = values(w), Tensor(w.copy())
+    lv, lt = Loss.L2(v, 0.1), Loss.L2([ t ], 0.1)
+    lv.backward()
+    lt.backward()
+    assert float(lv.data) == pytest.approx(0.1 * np.sum(w ** 2)) == float(lt.data)
+    assert np.allclose(grads(v), 0.2 * w) and np.allclose(t.grad, 0.2 * w)
+
+
+@pytest.mark.parametrize('tensor', [False, True])
+def test_l2_term_from_the_optimizer_buffer(tensor):
+    n = nn.Sequential(nn.Layer(3, 4, rng=0, tensor=tensor), nn.Layer(4, 1, rng=1, tensor=tensor))
+    optimizer = Optimizers.SGD(n.parameters, 0.1)
+    xs, ys = rng.normal(size=(5, 3)), rng.normal(size=5)
+
+    for i, source in enumerate([ n.parameters, optimizer.buffer, optimizer ]):
+        optimizer.zero_grad()
+        loss = Loss.MSELossL2(ys, n(xs), source, 0.1)
+        loss.backward()
+        optimizer.buffer.pull_grad()
+        if i == 0:
+            reference = float(loss.data), optimizer.buffer.grad.copy()
+        assert float(loss.data) == pytest.approx(reference[0])
+        assert np.allclose(optimizer.buffer.grad, reference[1])
+
+
+@pytest.mark.parametrize('tensor', [False, True])
+def test_cross_entropy_of_a_single_sample(tensor):
+    x = LOGITS[1]
+    single = Tensor(x.copy()) if tensor else values(x)
+    batch = Tensor(x[None].copy()) if tensor else values(x[None])
+    ls, lb = Loss.CrossEntropyLoss(2, single), Loss.CrossEntropyLoss([2], batch)
+    ls.backward()
+    lb.backward()
+    assert float(ls.data) == pytest.approx(float(lb.data))
+    if tensor:
+        assert np.allclose(single.grad, batch.grad[0])
+    else:
+        assert np.allclose(grads(single), grads(batch)[0])
+
+    with pytest.raises(ValueError):
+        Loss.CrossEntropyLoss(3, Tensor(x.copy()))
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from microtorch import nn, Loss, Optimizers
+from microtorch.Tensor import Tensor
+
+
+@pytest.mark.parametrize('tensor', [False, True])
+def test_lazy_layer_infers_inputs(tensor):
+    layer = nn.Layer(None, 4, tensor=tensor)
+    with pytest.raises(RuntimeError):
+        layer.parameters()
+    out = nn.Sequential(layer).predict(np.ones((2, 3)))
+    assert out.shape == (2, 4)
+    assert np.shape(layer.w) == (3, 4)
+
+
+def test_lazy_tensor_layer_initialized_by_predict_trains():
+    n = nn.Sequential(nn.Layer(None, 4, tensor=True), nn.Layer(4, 1, activation='linear', tensor=True))
+    xs = np.ones((2, 3))
+    n.predict(xs)
+    loss = Loss.MSELoss([1.0, 0.0], n(xs))
+    loss.backward()
+    assert all(isinstance(p.grad, np.ndarray) for p in n.parameters())
+
+
+@pytest.mark.parametrize('init', ['normal', 'uniform', 'xavier', 'he'])
+def test_seeded_initialization_is_reproducible(init):
+    a = nn.Layer(5, 3, init=init, rng=7, tensor=True)
+    b = nn.Layer(5, 3, init=init, rng=7, tensor=True)
+    v = nn.Layer(5, 3, init=init, rng=7)
+    assert np.array_equal(a.w.data, b.w.data)
+    assert np.array_equal(a.w.data, [ [ w.data for w in row ] for row in v.w ])
+
+
+def _grads(layer):
+    if isinstance(layer.w, Tensor):
+        return layer.w.grad, layer.b.grad
+    return np.array([ [ w.grad for w in row ] for row in layer.w ]), np.array([ b.grad for b in layer.b ])
+
+
+@pytest.mark.parametrize('fused', [True, False])
+def test_value_and_tensor_layers_agree(fused):
+    xs = np.random.default_rng(0).normal(size=(6, 5))
+    ys = np.random.default_rng(1).normal(size=6)
+    results = []
+    for tensor in (False, True):
+        n = nn.Sequential(nn.Layer(5, 4, rng=0, tensor=tensor, fused=fused), nn.Layer(4, 1, activation='linear', rng=1, tensor=tensor, fused=fused))
+        loss = Loss.MSELoss(ys, n(xs))
+        loss.backward()
+        results.append((float(loss.data), [ g for layer in n.layers for g in _grads(layer) ]))
+
+    (value_loss, value_grads), (tensor_loss, tensor_grads) = results
+    assert np.isclose(value_loss, tensor_loss)
+    for a, b in zip(value_grads, tensor_grads):
+        assert np.allclose(a, b)
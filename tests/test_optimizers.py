@@ -0,0 +1,131 @@
+import math
+
+import numpy as np
+import pytest
+
+from microtorch import Optimizers
+from microtorch.Tensor import Tensor
+from microtorch.Value import Value
+
+
+def reference_sgd(lr, momentum=0.0, nesterov=False, weight_decay=0.0):
+    velocity = {}
+    def step(i, w, g):
+        g = g + weight_decay * w
+        if momentum:
+            velocity[i] = momentum * velocity.get(i, 0.0) + g
+            g = g + momentum * velocity[i] if nesterov else velocity[i]
+        return w - lr * g
+    return step
+
+
+def reference_rmsprop(lr, alpha=0.99, eps=1e-8, momentum=0.0):
+    square, velocity = {}, {}
+    def step(i, w, g):
+        square[i] = alpha * square.get(i, 0.0) + (1 - alpha) * g * g
+        s = g / (math.sqrt(square[i]) + eps)
+        if momentum:
+            velocity[i] = momentum * velocity.get(i, 0.0) + s
+            s = velocity[i]
+        return w - lr * s
+    return step
+
+
+def reference_adam(lr, betas=(0.9, 0.999), eps=1e-8, weight_decay=0.0, decoupled=False):
+    m, v, t = {}, {}, {}
+    def step(i, w, g):
+        if weight_decay and not decoupled:
+            g = g + weight_decay * w
+        if decoupled:
+            w = w * (1 - lr * weight_decay)
+        t[i] = t.get(i, 0) + 1
+        m[i] = betas[0] * m.get(i, 0.0) + (1 - betas[0]) * g
+        v[i] = betas[1] * v.get(i, 0.0) + (1 - betas[1]) * g * g
+        m_hat, v_hat = m[i] / (1 - betas[0] ** t[i]), v[i] / (1 - betas[1] ** t[i])
+        return w - lr * m_hat / (math.sqrt(v_hat) + eps)
+    return step
+
+
+CASES = [
+    (lambda p: Optimizers.SGD(p, 0.1), reference_sgd(0.1)),
+    (lambda p: Optimizers.SGD(p, 0.1, momentum=0.9, weight_decay=0.01), reference_sgd(0.1, 0.9, weight_decay=0.01)),
+    (lambda p: Optimizers.SGD(p, 0.1, momentum=0.9, nesterov=True), reference_sgd(0.1, 0.9, nesterov=True)),
+    (lambda p: Optimizers.RMSProp(p, 0.01, momentum=0.5), reference_rmsprop(0.01, momentum=0.5)),
+    (lambda p: Optimizers.Adam(p, 0.01, weight_decay=0.1), reference_adam(0.01, weight_decay=0.1)),
+    (lambda p: Optimizers.AdamW(p, 0.01, weight_decay=0.1), reference_adam(0.01, weight_decay=0.1, decoupled=True)),
+]
+
+
+@pytest.mark.parametrize('make, reference', CASES)
+def test_vectorized_updates_match_scalar_reference(make, reference):
+    rng = np.random.default_rng(0)
+    start = rng.normal(size=5)
+
+    # Value and Tensor parameters registered in one buffer
+    values = [ Value(float(x)) for x in start[:2] ]
+    tensor = Tensor(start[2:].copy())
+    params = lambda: values + [ tensor ]
+    optimizer = make(params)
+    expected = start.tolist()
+
+    for step in range(5):
+        grads = rng.normal(size=5)
+        optimizer.zero_grad()
+        for v, g in zip(values, grads[:2]):
+            v.grad += g
+        tensor.grad += grads[2:]
+        optimizer.step()
+        expected = [ reference(i, w, g) for i, (w, g) in enumerate(zip(expected, grads)) ]
+
+    assert np.allclose([ v.data for v in values ] + tensor.data.tolist(), expected)
+
+
+def test_zero_grad_clears_every_parameter():
+    values = [ Value(1.0), Value(2.0) ]
+    tensor = Tensor(np.ones(3))
+    optimizer = Optimizers.SGD(lambda: values + [ tensor ], 0.1)
+    optimizer.zero_grad()
+    for v in values:
+        v.grad = 5.0
+    tensor.grad += 5.0
+    optimizer.zero_grad()
+    assert [ v.grad for v in values ] == [ 0.0, 0.0 ] and not tensor.grad.any()
+
+
+def test_tensor_parameters_alias_the_buffer():
+    tensor = Tensor(np.arange(4.0))
+    optimizer = Optimizers.SGD(lambda: [ tensor ], 0.5)
+    buffer = optimizer.buffer
+    assert np.shares_memory(tensor.data, buffer.data)
+    tensor.grad += 1.0
+    optimizer.step()
+    assert np.allclose(tensor.data, np.arange(4.0) - 0.5)
+
+
+@pytest.mark.parametrize('tensor', [False, True])
+def test_step_keeps_parameters_written_after_registration(tmp_path, tensor):
+    from microtorch import nn, checkpoint, Loss
+
+    xs, ys = np.ones((4, 3)), np.zeros(4)
+    saved = nn.Sequential(nn.Layer(3, 2, rng=0, tensor=tensor), nn.Layer(2, 1, rng=1, tensor=tensor))
+    checkpoint.save(saved, tmp_path / 'model.ck')
+
+    n = nn.Sequential(nn.Layer(3, 2, rng=5, tensor=tensor), nn.Layer(2, 1, rng=6, tensor=tensor))
+    optimizer = Optimizers.SGD(n.parameters, 0.0)
+    optimizer.zero_grad()
+    checkpoint.load(tmp_path / 'model.ck', model=n)
+
+    # A step with a zero learning rate leaves the loaded weights in place
+    Loss.MSELoss(ys, n(xs)).backward()
+    optimizer.step()
+    assert np.allclose(n.predict(xs), saved.predict(xs))
+
+
+def test_step_keeps_manual_edits():
+    values = [ Value(1.0), Value(2.0) ]
+    optimizer = Optimizers.SGD(lambda: values, 0.5)
+    optimizer.zero_grad()
+    values[0].data = 10.0
+    values[1].grad = 1.0
+    optimizer.step()
+    assert [ v.data for v in values ] == [ 10.0, 1.5 ]
@@ -0,0 +1,66 @@
+import gc
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from microtorch import nn, Optimizers, Loss
+from microtorch.parallel import DataParallelTrainer
+
+
+def make_model():
+    return nn.Sequential(nn.Layer(3, 4, rng=0), nn.Layer(4, 1, activation='linear', rng=1))
+
+
+def checked_loss(ys, out):
+    if np.isnan(ys).any():
+        raise ValueError("nan target")
+    return Loss.MSELoss(ys, out)
+
+
+def make_data():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(8, 3)), rng.normal(size=8)
+
+
+def test_step_matches_serial_training():
+    xs, ys = make_data()
+    serial = make_model()
+    optimizer = Optimizers.SGD(serial.parameters, 0.1)
+    loss = Loss.MSELoss(ys, serial(xs))
+    optimizer.zero_grad()
+    loss.backward()
+    optimizer.step()
+
+    n = make_model()
+    with DataParallelTrainer(n, Loss.MSELoss, Optimizers.SGD(n.parameters, 0.1), workers=2) as trainer:
+        assert trainer.step(xs, ys) == pytest.approx(float(loss.data))
+    assert np.allclose([ p.data for p in n.parameters() ], [ p.data for p in serial.parameters() ])
+
+
+def test_worker_exception_is_reraised():
+    xs, ys = make_data()
+    n = make_model()
+    with DataParallelTrainer(n, checked_loss, Optimizers.SGD(n.parameters, 0.1), workers=2) as trainer:
+        bad = ys.copy()
+        bad[-1] = np.nan
+        with pytest.raises(ValueError, match='nan target') as info:
+            trainer.step(xs, bad)
+        assert 'checked_loss' in str(info.value.__cause__)
+
+        # The workers keep serving after a failed step
+        assert np.isfinite(trainer.step(xs, ys))
+
+
+def test_shared_memory_is_released():
+    n = make_model()
+    trainer = DataParallelTrainer(n, Loss.MSELoss, Optimizers.SGD(n.parameters, 0.1), workers=2)
+    names = [ trainer._params_shm.name, trainer._grads_shm.name ]
+    processes = list(trainer._processes)
+    del trainer
+    gc.collect()
+
+    assert not any(p.is_alive() for p in processes)
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
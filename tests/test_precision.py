@@ -0,0 +1,92 @@
+import numpy as np
+
+from microtorch import nn, Optimizers, Loss, precision
+
+
+def make_model():
+    return nn.Sequential(nn.Layer(3, 8, rng=0, tensor=True), nn.Layer(8, 1, activation='linear', rng=1, tensor=True))
+
+
+def train(n, optimizer, xs, ys, epochs):
+    for epoch in range(epochs):
+        loss = Loss.MSELoss(ys, n(xs))
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+
+
+def test_cast_before_optimizer():
+    n = precision.cast(make_model(), 'float32')
+    optimizer = Optimizers.SGD(n.parameters, 0.1)
+    assert optimizer.buffer.dtype == np.float32
+    assert all(p.data.dtype == np.float32 and p.grad.dtype == np.float32 for p in n.parameters())
+
+
+def test_cast_after_optimizer_keeps_training():
+    rng = np.random.default_rng(0)
+    xs, ys = rng.normal(size=(16, 3)), rng.normal(size=16)
+
+    reference = make_model()
+    reference_optimizer = Optimizers.SGD(reference.parameters, 0.1)
+    train(reference, reference_optimizer, xs, ys, 5)
+
+    n = make_model()
+    optimizer = Optimizers.SGD(n.parameters, 0.1)
+    train(n, optimizer, xs, ys, 1)
+    precision.cast(n.layers[0], 'float32')
+    before = [ p.data.copy() for p in n.parameters() ]
+    train(n, optimizer, xs, ys, 4)
+
+    assert n.layers[0].w.data.dtype == np.float32
+    # The cast parameters are still updated by the optimizer
+    assert all(not np.array_equal(p.data, b) for p, b in zip(n.parameters(), before))
+    for p, q in zip(n.parameters(), reference.parameters()):
+        assert np.allclose(p.data, q.data, atol=1e-4)
+
+
+def test_loss_scaler_steps_like_the_optimizer():
+    rng = np.random.default_rng(0)
+    xs, ys = rng.normal(size=(16, 3)), rng.normal(size=16)
+
+    reference = make_model()
+    train(reference, Optimizers.Adam(reference.parameters, 0.01), xs, ys, 3)
+
+    n = make_model()
+    optimizer = Optimizers.Adam(n.parameters, 0.01)
+    scaler = precision.LossScaler(init_scale=1024.0)
+    for epoch in range(3):
+        loss = Loss.MSELoss(ys, n(xs))
+        optimizer.zero_grad()
+        scaler.scale(loss).backward()
+        assert scaler.step(optimizer)
+    for p, q in zip(n.parameters(), reference.parameters()):
+        assert np.allclose(p.data, q.data)
+
+
+def test_loss_scaler_keeps_parameters_written_between_steps():
+    with precision.policy('mixed'):
+        n = make_model()
+        optimizer = Optimizers.SGD(n.parameters, 0.1)
+        optimizer.zero_grad()
+    scaler = precision.LossScaler()
+    xs, ys = np.ones((4, 3)), np.zeros(4)
+    scaler.scale(Loss.MSELoss(ys, n(xs))).backward()
+    scaler.step(optimizer)
+
+    # A write into the parameters (e.g. checkpoint.load) is not reverted by the next step
+    n.layers[0].w.data[...] = 0.0
+    optimizer.zero_grad()
+    scaler.step(optimizer)
+    assert np.array_equal(n.layers[0].w.data, np.zeros_like(n.layers[0].w.data))
+
+
+def test_loss_scaler_skips_overflowing_steps():
+    n = make_model()
+    optimizer = Optimizers.SGD(n.parameters, 0.1)
+    scaler = precision.LossScaler(init_scale=8.0)
+    before = [ p.data.copy() for p in n.parameters() ]
+    optimizer.zero_grad()
+    n.layers[0].w.grad[0, 0] = np.inf
+    assert not scaler.step(optimizer)
+    assert scaler.skipped == 1 and scaler.scale_factor == 4.0
+    assert all(np.array_equal(p.data, b) for p, b in zip(n.parameters(), before))
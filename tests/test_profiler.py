@@ -0,0 +1,37 @@
+import json
+
+import numpy as np
+
+from microtorch import nn, Loss, Optimizers
+from microtorch.Value import Value
+from microtorch.profiler import Profiler
+
+
+def test_profiles_a_training_step_and_uninstalls(tmp_path):
+    n = nn.Sequential(nn.Layer(3, 4, rng=0, fused=False), nn.Layer(4, 1, rng=1, fused=False))
+    optimizer = Optimizers.SGD(n.parameters, 0.1)
+    xs, ys = np.ones((2, 3)), np.ones(2)
+    add, backward = Value.__add__, Value.backward
+
+    with Profiler() as prof:
+        loss = Loss.MSELoss(ys, n(xs))
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+
+    assert Value.__add__ is add and Value.backward is backward
+    assert prof.node_counts and sum(prof.node_counts.values()) > 0
+    assert prof.stats() and 'nodes created' in prof.report()
+
+    path = tmp_path / 'trace.json'
+    prof.export_chrome_trace(path)
+    trace = json.load(open(path))
+    assert trace['traceEvents'] and all(e['ph'] == 'X' for e in trace['traceEvents'])
+
+    # Gradients are unchanged by the instrumentation
+    m = nn.Sequential(nn.Layer(3, 4, rng=0, fused=False), nn.Layer(4, 1, rng=1, fused=False))
+    Loss.MSELoss(ys, m(xs)).backward()
+    n2 = nn.Sequential(nn.Layer(3, 4, rng=0, fused=False), nn.Layer(4, 1, rng=1, fused=False))
+    with Profiler():
+        Loss.MSELoss(ys, n2(xs)).backward()
+    assert [ p.grad for p in m.parameters() ] == [ p.grad for p in n2.parameters() ]
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from microtorch import nn, quantization
+
+
+@pytest.mark.parametrize('k', [1, 7, 1024, 1025, 3000])
+def test_int8_matmul_is_exact(k):
+    rng = np.random.default_rng(k)
+    a = rng.integers(-128, 128, size=(5, k), dtype=np.int8)
+    b = rng.integers(-128, 128, size=(k, 3), dtype=np.int8)
+    # Worst case: every product is 128 * 128
+    a[0], b[:, 0] = -128, -128
+
+    out = quantization.int8_matmul(a, b)
+    assert out.dtype == np.int32
+    assert np.array_equal(out, a.astype(np.int32) @ b.astype(np.int32))
+
+
+def test_quantize_roundtrip_error_is_within_half_a_step():
+    x = np.random.default_rng(0).normal(size=(16, 4))
+    scale, zero_point = quantization.quantize_params(x, axis=1)
+    q = quantization.quantize_array(x, scale, zero_point)
+    assert q.dtype == np.int8
+    assert np.all(np.abs(quantization.dequantize_array(q, scale, zero_point) - x) <= scale / 2 + 1e-12)
+
+    # Zero is represented exactly
+    assert np.all(quantization.dequantize_array(quantization.quantize_array(np.zeros(4), scale, zero_point), scale, zero_point) == 0)
+
+
+@pytest.mark.parametrize('calibrated', [False, True])
+def test_quantized_model_tracks_the_float_model(calibrated):
+    rng = np.random.default_rng(0)
+    xs = rng.normal(size=(64, 64))
+    n = nn.Sequential(nn.Layer(64, 64, activation='relu', rng=0, tensor=True), nn.Layer(64, 4, activation='linear', rng=1, tensor=True))
+    q = quantization.quantize(n, calibration=xs if calibrated else None)
+
+    report = quantization.drift_report(n, q, xs)
+    assert report['relative_error'] < 0.05
+    assert report['agreement'] > 0.9
+    assert report['quantized_bytes'] < report['float_bytes'] / 4
+
+    # Single samples and batches give the same outputs
+    assert np.allclose(q.predict(xs[0]), q.predict(xs[:1])[0])
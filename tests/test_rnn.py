@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from microtorch import nn, rnn, Loss, Optimizers
+from microtorch.Tensor import Tensor
+
+
+def numeric_grad(f, x, eps=1e-6):
+    grad = np.zeros_like(x)
+    for index in np.ndindex(x.shape):
+        old = x[index]
+        x[index] = old + eps
+        up = f()
+        x[index] = old - eps
+        down = f()
+        x[index] = old
+        grad[index] = (up - down) / (2 * eps)
+    return grad
+
+
+LAYERS = [ nn.RNN, nn.GRU, nn.LSTM ]
+
+
+@pytest.mark.parametrize('layer_class', LAYERS)
+def test_gradients_match_finite_differences(layer_class):
+    np.random.seed(0)
+    layer = layer_class(3, 4)
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(2, 5, 3))
+    r = rng.normal(size=(2, 5, 4))
+
+    tx = Tensor(x.copy())
+    (layer(tx) * r).sum().backward()
+    f = lambda: float(np.sum(layer(x).data * r))
+    assert np.allclose(tx.grad, numeric_grad(f, x), atol=1e-5)
+    assert np.allclose(layer.w_hh.grad, numeric_grad(f, layer.w_hh.data), atol=1e-5)
+    assert np.allclose(layer.b_ih.grad, numeric_grad(f, layer.b_ih.data), atol=1e-5)
+
+
+@pytest.mark.parametrize('layer_class', LAYERS)
+def test_packed_sequences_match_separate_runs(layer_class):
+    np.random.seed(0)
+    layer = layer_class(3, 4)
+    rng = np.random.default_rng(1)
+    sequences = [ rng.normal(size=(length, 3)) for length in (2, 5, 3) ]
+    batch, lengths = rnn.pad_sequences(sequences)
+
+    packed = layer(batch, lengths=lengths)
+    packed.sum().backward()
+    packed_grads = [ p.grad.copy() for p in layer.parameters() ]
+
+    for p in layer.parameters():
+        p.grad[...] = 0.0
+    for i, s in enumerate(sequences):
+        out = layer(s[None])
+        assert np.allclose(packed.data[i, :len(s)], out.data[0])
+        assert np.allclose(packed.data[i, len(s):], 0.0)
+        out.sum().backward()
+    assert all(np.allclose(a, p.grad) for a, p in zip(packed_grads, layer.parameters()))
+
+
+@pytest.mark.parametrize('layer_class', LAYERS)
+def test_last_output_of_packed_sequences(layer_class):
+    np.random.seed(0)
+    layer = layer_class(3, 4, return_sequences=False)
+    sequences = [ np.random.default_rng(i).normal(size=(length, 3)) for i, length in enumerate((4, 1, 3)) ]
+    batch, lengths = rnn.pad_sequences(sequences)
+    last = layer(batch, lengths=lengths)
+    for i, s in enumerate(sequences):
+        assert np.allclose(last.data[i], layer(s[None]).data[0])
+
+
+def test_truncated_bptt_trains():
+    np.random.seed(0)
+    model = nn.Sequential(nn.GRU(2, 8), nn.Layer(8, 1, activation='linear', rng=0, tensor=True))
+    rng = np.random.default_rng(0)
+    xs = rng.normal(size=(4, 12, 2))
+    ys = np.cumsum(xs[:, :, 0], axis=1)[:, :, None] / 4
+    optimizer = Optimizers.Adam(model.parameters, learning_rate=0.01)
+
+    first = np.mean(nn.truncated_bptt(model, xs, ys, Loss.MSELoss, window=4, optimizer=optimizer))
+    for epoch in range(30):
+        last = np.mean(nn.truncated_bptt(model, xs, ys, Loss.MSELoss, window=4, optimizer=optimizer))
+    assert last < first
+
+
+@pytest.mark.parametrize('layer_class', LAYERS)
+def test_seeded_initialization_is_reproducible(layer_class):
+    a = layer_class(3, 4, init='xavier', rng=7)
+    b = layer_class(3, 4, init='xavier', rng=7)
+    for name in ('w_ih', 'w_hh', 'b_ih', 'b_hh'):
+        assert np.array_equal(getattr(a, name).data, getattr(b, name).data)
+    assert not np.array_equal(a.w_ih.data[:3], a.w_hh.data[:3])
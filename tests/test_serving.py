@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from microtorch import nn, Loss, Optimizers
+from microtorch.serving import InferenceServer
+
+
+def make_model():
+    np.random.seed(0)
+    return nn.Sequential(nn.Layer(3, 8, tensor=True), nn.Layer(8, 1, activation='linear', tensor=True))
+
+
+def test_predict_on_worker_thread_does_not_disable_training():
+    n = make_model()
+    optimizer = Optimizers.SGD(n.parameters, 0.01)
+    xs = np.random.default_rng(0).normal(size=(16, 3))
+    ys = np.sin(xs.sum(axis=1))
+
+    stop = threading.Event()
+    def serve():
+        while not stop.is_set():
+            n.predict(xs)
+
+    worker = threading.Thread(target=serve)
+    worker.start()
+    try:
+        for _ in range(300):
+            loss = Loss.MSELoss(ys, n(xs))
+            optimizer.zero_grad()
+            loss.backward()
+            assert loss._prev
+            assert all(np.any(p.grad != 0) for p in n.parameters())
+            optimizer.step()
+    finally:
+        stop.set()
+        worker.join()
+
+
+def test_server_matches_predict():
+    n = make_model()
+    xs = np.random.default_rng(1).normal(size=(20, 3))
+
+    async def run():
+        async with InferenceServer(n, max_batch_size=8) as server:
+            return await asyncio.gather(*[ server.predict(x) for x in xs ]), server.stats()
+
+    outs, stats = asyncio.run(asyncio.wait_for(run(), 10))
+    assert np.allclose(outs, n.predict(xs))
+    assert stats['requests'] == len(xs)
+
+
+def test_requests_after_stop_are_rejected():
+    n = make_model()
+    x = np.zeros(3)
+
+    async def run():
+        server = InferenceServer(n, max_wait=0.01)
+        await server.start()
+        pending = asyncio.ensure_future(server.predict(x))
+        await asyncio.sleep(0)
+        stopping = asyncio.ensure_future(server.stop())
+        await asyncio.sleep(0)
+        with pytest.raises(RuntimeError):
+            await server.predict(x)
+        await stopping
+        with pytest.raises(RuntimeError):
+            await server.predict(x)
+        return await pending
+
+    assert np.allclose(asyncio.run(asyncio.wait_for(run(), 10)), n.predict(x))
+
+
+def test_malformed_requests_fail_alone():
+    n = make_model()
+    xs = np.random.default_rng(2).normal(size=(4, 3))
+
+    async def run():
+        async with InferenceServer(n, max_batch_size=8, max_wait=0.01) as server:
+            results = await asyncio.gather(*[ server.predict(x) for x in xs[:2] ], server.predict(np.zeros(4)),
+                                           *[ server.predict(x) for x in xs[2:] ], return_exceptions=True)
+            later = await server.predict(xs[0])
+            return results, later
+
+    results, later = asyncio.run(asyncio.wait_for(run(), 10))
+    assert isinstance(results[2], ValueError) and '(3,)' in str(results[2])
+    good = [ r for i, r in enumerate(results) if i != 2 ]
+    assert np.allclose(good, n.predict(xs))
+    assert np.isclose(later, n.predict(xs[:1])[0])
+
+
+def test_batch_of_mismatched_images_does_not_stop_the_server():
+    np.random.seed(0)
+    n = nn.Sequential(nn.Conv2d(1, 2, 3), nn.Flatten())
+    small, large = np.ones((1, 5, 5)), np.ones((1, 6, 6))
+
+    async def run():
+        async with InferenceServer(n, max_batch_size=8, max_wait=0.05) as server:
+            with pytest.raises(ValueError):
+                await server.predict(np.ones((2, 5, 5)))
+            mixed = await asyncio.gather(server.predict(small), server.predict(large), return_exceptions=True)
+            return mixed, await server.predict(small)
+
+    mixed, later = asyncio.run(asyncio.wait_for(run(), 10))
+    assert all(isinstance(r, ValueError) for r in mixed)
+    assert np.allclose(later, n.predict(small[None])[0])
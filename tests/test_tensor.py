@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from microtorch.Tensor import Tensor
+
+
+def numeric_grad(f, x, eps=1e-6):
+    grad = np.zeros_like(x)
+    for index in np.ndindex(x.shape):
+        old = x[index]
+        x[index] = old + eps
+        up = f()
+        x[index] = old - eps
+        down = f()
+        x[index] = old
+        grad[index] = (up - down) / (2 * eps)
+    return grad
+
+
+rng = np.random.default_rng(0)
+A = rng.normal(size=(3, 4))
+B = rng.normal(size=(4, ))
+M = rng.normal(size=(4, 2))
+
+OPS = {
+    'add_broadcast': lambda a, b: a + b,
+    'sub': lambda a, b: 1.0 - a - b,
+    'mul_broadcast': lambda a, b: a * b * 2.0,
+    'div': lambda a, b: a / (b * b + 1.0),
+    'pow': lambda a, b: a ** 2 + b ** 3,
+    'exp': lambda a, b: (a * 0.5).exp() * b,
+    'log': lambda a, b: (a * a + 1.0).log() + b,
+    'tanh': lambda a, b: (a + b).tanh(),
+    'relu': lambda a, b: (a - b).relu(),
+    'sigmoid': lambda a, b: (a * b).sigmoid(),
+    'sum_axis': lambda a, b: a.sum(axis=0) * b,
+    'mean_keepdims': lambda a, b: a.mean(axis=1, keepdims=True) * b,
+    'index_reshape': lambda a, b: a[1:, ::2].reshape(-1) * b[:4],
+    'concatenate': lambda a, b: Tensor.concatenate([a, b.reshape(1, -1)], axis=0) * 3.0,
+}
+
+
+@pytest.mark.parametrize('name', OPS)
+def test_gradients_match_finite_differences(name):
+    f = OPS[name]
+    a, b = Tensor(A.copy()), Tensor(B.copy())
+    r = np.random.default_rng(1).normal(size=f(a, b).shape)
+    (f(a, b) * r).sum().backward()
+
+    ad, bd = A.copy(), B.copy()
+    scalar = lambda: float(np.sum(f(Tensor(ad), Tensor(bd)).data * r))
+    assert np.allclose(a.grad, numeric_grad(scalar, ad), atol=1e-5)
+    assert np.allclose(b.grad, numeric_grad(scalar, bd), atol=1e-5)
+
+
+def test_matmul_gradients():
+    a, m = Tensor(A.copy()), Tensor(M.copy())
+    (a @ m).sum().backward()
+    assert np.allclose(a.grad, np.ones((3, 2)) @ M.T)
+    assert np.allclose(m.grad, A.T @ np.ones((3, 2)))
+
+    # Vector @ matrix
+    v = Tensor(B.copy())
+    (v @ m).sum().backward()
+    assert np.allclose(v.grad, M.sum(axis=1))
+
+
+def test_astype_keeps_gradient_dtype():
+    a = Tensor(A.copy())
+    (a.astype(np.float32) * 2.0).sum().backward()
+    assert a.grad.dtype == np.float64
+    assert np.allclose(a.grad, 2.0)
+
+
+@pytest.mark.parametrize('f', [
+    lambda a: 1.0 - a, lambda a: 2.0 / a, lambda a: 3.0 * a, lambda a: 3.0 + a, lambda a: -a, lambda a: a ** 2,
+])
+def test_operators_match_numpy(f):
+    assert np.allclose(f(Tensor(B.copy())).data, f(B))
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from microtorch import nn
+from microtorch.Value import Value
+
+
+def numeric_grad(f, xs, eps=1e-6):
+    grads = []
+    for i in range(len(xs)):
+        up, down = list(xs), list(xs)
+        up[i] += eps
+        down[i] -= eps
+        grads.append((f(*up) - f(*down)) / (2 * eps))
+    return grads
+
+
+OPS = {
+    'add': lambda a, b: a + b + 2.0,
+    'sub': lambda a, b: 3.0 - a - b,
+    'mul': lambda a, b: a * b * -1.5,
+    'div': lambda a, b: a / b + 2.0 / b,
+    'pow': lambda a, b: a ** 3 + b ** -2,
+    'rpow': lambda a, b: 2.0 ** a * b,
+    'exp': lambda a, b: (a * b).exp(),
+    'log': lambda a, b: (a * a + b * b).log(),
+    'tanh': lambda a, b: (a - b).tanh(),
+    'relu': lambda a, b: (a - b).relu() + (b - a).relu() * 2,
+    'sigmoid': lambda a, b: (a * b).sigmoid(),
+}
+
+
+def as_float(f):
+    # Evaluate the same expression on plain floats through Value leaves
+    return lambda *xs: f(*[ Value(x) for x in xs ]).data
+
+
+@pytest.mark.parametrize('name', OPS)
+def test_gradients_match_finite_differences(name):
+    f = OPS[name]
+    a, b = Value(0.7), Value(-1.3)
+    f(a, b).backward()
+    assert np.allclose([ a.grad, b.grad ], numeric_grad(as_float(f), [ 0.7, -1.3 ]), atol=1e-6)
+
+
+def test_gradients_accumulate_through_shared_nodes():
+    a = Value(2.0)
+    b = a * a
+    (b + b * a).backward()
+    # d/da (a^2 + a^3) = 2a + 3a^2
+    assert a.grad == pytest.approx(2 * 2.0 + 3 * 2.0 ** 2)
+
+
+@pytest.mark.parametrize('activation', ['tanh', 'relu', 'sigmoid', 'linear'])
+def test_fused_and_unfused_layers_agree(activation):
+    xs = np.random.default_rng(0).normal(size=(5, 3))
+    fused = nn.Layer(3, 4, activation=activation, rng=0, fused=True)
+    unfused = nn.Layer(3, 4, activation=activation, rng=0, fused=False)
+
+    outs = [ layer(xs) for layer in (fused, unfused) ]
+    assert np.allclose(nn._data(outs[0]), nn._data(outs[1]))
+
+    for out in outs:
+        sum(out.ravel()).backward()
+    assert np.allclose([ p.grad for p in fused.parameters() ], [ p.grad for p in unfused.parameters() ])
+
+
+@pytest.mark.parametrize('f', [
+    lambda a, b: a + b, lambda a, b: a - b, lambda a, b: a * b, lambda a, b: a / b,
+    lambda a, b: 2.5 + a, lambda a, b: 2.5 - a, lambda a, b: 2.5 * a, lambda a, b: 2.5 / a,
+    lambda a, b: a ** 2, lambda a, b: 2.5 ** a, lambda a, b: -a,
+])
+def test_operators_match_float_arithmetic(f):
+    assert f(Value(0.7), Value(-1.3)).data == pytest.approx(f(0.7, -1.3))
+
+
+@pytest.mark.parametrize('base, exponent, grad', [
+    (2.0, 1.5, 2.0 ** 1.5 * np.log(2.0)),
+    (0.0, 2.0, 0.0),
+    (0, 0.0, 0.0),
+    (-2.0, 2.0, 4.0 * np.log(2.0)),
+    (-2.0, 3.0, -8.0 * np.log(2.0)),
+])
+def test_constant_base_powers(base, exponent, grad):
+    x = Value(exponent)
+    y = base ** x
+    y.backward()
+    assert y.data == pytest.approx(base ** exponent)
+    assert x.grad == pytest.approx(grad)
+
+
+def test_constant_base_powers_without_a_real_value():
+    with pytest.raises(ValueError):
+        (-2.0) ** Value(2.5)
+    with pytest.raises(ZeroDivisionError):
+        0.0 ** Value(-1.0)